@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自動操作用のChromeを起動する共通の関数
+
+スクリプトごとに ChromeOptions を組み立てると、GUIのChromeが
+800x800で開いたり、ウィンドウが裏に回るとタイマーが間引かれたりと
+起動時間やフレームごとのコストがまちまちになる。create_driver は
+既定でヘッドレス（--headless=new）にし、自動操作に向いたフラグを付けて起動する。
+
+    driver = create_driver()                          # ヘッドレス、800x800
+    driver = create_driver(logs=('browser',))         # コンソールログを取得できる
+    driver = create_driver(eager=True)                # DOMの構築まで待って get() から戻る
+    driver = create_driver(headless=False, detach=True)  # 画面を表示したまま残す
+    driver = create_driver(no_sandbox=True)           # ローカルのゲームだけを開くとき
+
+headless を省略したときは環境変数 BROWSER_HEADLESS で決める
+（BROWSER_HEADLESS=0 で画面を表示。動きを目で確認したいとき用）。
+
+レンダラーのサンドボックスは既定で有効のまま。ローカルのゲームだけを開く
+スクリプトは no_sandbox=True で外せる。省略したときは BROWSER_NO_SANDBOX=1
+のとき、または root で動かしているとき（コンテナなど。サンドボックス付きでは
+Chrome が起動しない）だけ外す。
+
+eager=True はページの読み込み戦略を 'eager' にする。画像などの読み込み完了を
+待たずに driver.get() から戻るので、page_events.wait_for_game のように
+ゲームの準備をページ内で待つスクリプトで使う。
+"""
+
+import os
+
+# 自動操作で不要な処理と、裏に回ったときの間引きを止めるフラグ
+AUTOMATION_ARGS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    # タブが裏にある・ウィンドウが隠れているときのタイマーと描画の間引きを止める
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    # 拡張機能や起動時のバックグラウンド通信
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-background-networking',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--mute-audio'
+]
+
+
+def headless_default():
+    """headless を省略したときの値（BROWSER_HEADLESS=0 なら画面を表示）"""
+    return os.environ.get('BROWSER_HEADLESS', '1').lower() not in ('0', 'false', 'no')
+
+
+def no_sandbox_default():
+    """no_sandbox を省略したときの値（BROWSER_NO_SANDBOX=1 か root なら外す）"""
+    value = os.environ.get('BROWSER_NO_SANDBOX')
+    if value is not None:
+        return value.lower() in ('1', 'true', 'yes')
+    return hasattr(os, 'geteuid') and os.geteuid() == 0
+
+
+def chrome_options(headless=None, window_size=(800, 800), eager=False, logs=(),
+                   detach=False, extra_args=(), no_sandbox=None):
+    """自動操作用の ChromeOptions を作る
+
+    logs に 'browser' / 'performance' / 'driver' を渡すと
+    driver.get_log() で取得できるようにする。
+    """
+    from selenium import webdriver
+
+    if headless is None:
+        headless = headless_default()
+    if no_sandbox is None:
+        no_sandbox = no_sandbox_default()
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    for arg in AUTOMATION_ARGS:
+        options.add_argument(arg)
+    if no_sandbox:
+        options.add_argument('--no-sandbox')
+    if window_size:
+        options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+    for arg in extra_args:
+        options.add_argument(arg)
+    options.add_experimental_option('excludeSwitches', ['enable-logging', 'enable-automation'])
+    if eager:
+        options.page_load_strategy = 'eager'
+    if logs:
+        options.set_capability('goog:loggingPrefs', {log_type: 'ALL' for log_type in logs})
+    if detach and not headless:
+        # スクリプトが終わってもブラウザを開いたまま残す
+        options.add_experimental_option('detach', True)
+    return options
+
+
+def create_driver(headless=None, window_size=(800, 800), eager=False, logs=(),
+                  detach=False, extra_args=(), no_sandbox=None, service=None):
+    """自動操作用のChromeを起動して返す（引数は chrome_options と同じ）"""
+    from selenium import webdriver
+
+    options = chrome_options(headless=headless, window_size=window_size, eager=eager,
+                             logs=logs, detach=detach, extra_args=extra_args,
+                             no_sandbox=no_sandbox)
+    if service is not None:
+        return webdriver.Chrome(service=service, options=options)
+    return webdriver.Chrome(options=options)
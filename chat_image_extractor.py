@@ -4,13 +4,12 @@
 チャット画像抽出ツール - Seleniumでブラウザから画像を保存
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import requests
 import os
 from urllib.parse import urlparse
+from browser_factory import create_driver
 
 class ChatImageExtractor:
     def __init__(self):
@@ -18,14 +17,8 @@ class ChatImageExtractor:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        # チャット画面の準備は手で行うので表示する
+        self.driver = create_driver(headless=False)
         print("[INFO] 画像抽出用ブラウザ起動！")
         
     def extract_chat_images(self, chat_url):
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+敵の危険度マップ
+
+迷路用の DangerField は敵の位置から全マスの危険度を一度に計算し、
+経路探索からは cost(x, y) で O(1) に参照できるようにする。危険度は
+maze_pathfinding.danger_costs と同じ max(0, radius - 距離) * weight。
+
+距離の測り方は2種類:
+    'manhattan' - 壁を無視したマンハッタン距離（従来のソルバーと同じ）
+    'path'      - 通路を通った歩数（壁の向こうの敵は危険ではない）
+
+NumPy があれば敵の位置から radius - 1 回の膨張（4近傍シフト）で
+全グリッドを一括計算する。ない場合は同じ結果を純Pythonで計算する。
+
+ピクセル座標のRPG用に、ユークリッド距離で最も近い敵を探す
+nearest_enemy と、方向ごとの脅威度を出す direction_threats もある。
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 敵の数がこれ未満なら NumPy を使わない（配列化のコストの方が大きい）
+VECTORIZE_MIN_ENEMIES = 16
+
+
+class DangerField:
+    """迷路全体の危険度マップ"""
+
+    def __init__(self, maze, radius=3, weight=5, metric='manhattan'):
+        if metric not in ('manhattan', 'path'):
+            raise ValueError(f"不明な距離: {metric}")
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0])
+        self.radius = radius
+        self.weight = weight
+        self.metric = metric
+        self.enemies = []
+        # grid[y][x] が危険度（Pythonのリストなので参照が速い）
+        self.grid = [[0] * self.width for _ in range(self.height)]
+        self.open_mask = None
+        if np is not None and metric == 'path':
+            self.open_mask = np.array(maze) == 0
+
+    def update(self, enemies):
+        """敵の位置 [(x, y), ...] から危険度を計算し直す"""
+        self.enemies = [(x, y) for x, y in enemies
+                        if 0 <= x < self.width and 0 <= y < self.height]
+        if np is not None:
+            self.grid = self._compute_numpy().tolist()
+        else:
+            self.grid = self._compute_python()
+        return self
+
+    def _compute_numpy(self):
+        field = np.zeros((self.height, self.width), dtype=np.int64)
+        if not self.enemies or self.radius <= 0:
+            return field
+
+        reached = np.zeros((self.height, self.width), dtype=bool)
+        xs, ys = zip(*self.enemies)
+        reached[list(ys), list(xs)] = True
+        field[reached] = self.radius * self.weight
+
+        for distance in range(1, self.radius):
+            # 4近傍に1マス広げる
+            grown = reached.copy()
+            grown[1:, :] |= reached[:-1, :]
+            grown[:-1, :] |= reached[1:, :]
+            grown[:, 1:] |= reached[:, :-1]
+            grown[:, :-1] |= reached[:, 1:]
+            if self.open_mask is not None:
+                grown &= self.open_mask
+            new = grown & ~reached
+            field[new] = (self.radius - distance) * self.weight
+            reached = grown
+        return field
+
+    def _compute_python(self):
+        grid = [[0] * self.width for _ in range(self.height)]
+        if not self.enemies or self.radius <= 0:
+            return grid
+
+        # 距離ごとに敵の位置から一斉に広げる（多始点BFS）
+        frontier = set(self.enemies)
+        seen = set(frontier)
+        for distance in range(self.radius):
+            value = (self.radius - distance) * self.weight
+            for x, y in frontier:
+                grid[y][x] = value
+            next_frontier = set()
+            for x, y in frontier:
+                for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if not (0 <= nx < self.width and 0 <= ny < self.height):
+                        continue
+                    if (nx, ny) in seen:
+                        continue
+                    if self.metric == 'path' and self.maze[ny][nx] != 0:
+                        continue
+                    seen.add((nx, ny))
+                    next_frontier.add((nx, ny))
+            frontier = next_frontier
+        return grid
+
+    def cost(self, x, y):
+        """(x, y) の危険度（find_path の cost としてそのまま使える）"""
+        return self.grid[y][x]
+
+    def costs(self):
+        """危険度が0でないマスの辞書（IncrementalPlanner.update_costs 用）"""
+        # 危険なマスは敵から radius - 1 マス以内にしかないので、その範囲だけ見る
+        reach = self.radius - 1
+        costs = {}
+        for ex, ey in self.enemies:
+            for y in range(max(0, ey - reach), min(self.height, ey + reach + 1)):
+                row = self.grid[y]
+                for x in range(max(0, ex - reach), min(self.width, ex + reach + 1)):
+                    if row[x]:
+                        costs[(x, y)] = row[x]
+        return costs
+
+    def local_costs(self, enemies):
+        """敵の位置から、危険度が0でないマスの辞書だけを計算する
+
+        update().costs() と同じ結果を、全グリッドを作らずに敵ごとの
+        radius - 1 マス以内の探索だけで求める（再計画のたびに呼んでも
+        迷路の大きさによらない）。grid と enemies は更新しない。
+        """
+        costs = {}
+        if self.radius <= 0:
+            return costs
+        for ex, ey in enemies:
+            if not (0 <= ex < self.width and 0 <= ey < self.height):
+                continue
+            frontier = [(ex, ey)]
+            seen = {(ex, ey)}
+            for distance in range(self.radius):
+                value = (self.radius - distance) * self.weight
+                next_frontier = []
+                for x, y in frontier:
+                    if costs.get((x, y), 0) < value:
+                        costs[(x, y)] = value
+                    for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                        if not (0 <= nx < self.width and 0 <= ny < self.height):
+                            continue
+                        if (nx, ny) in seen:
+                            continue
+                        if self.metric == 'path' and self.maze[ny][nx] != 0:
+                            continue
+                        seen.add((nx, ny))
+                        next_frontier.append((nx, ny))
+                frontier = next_frontier
+        return costs
+
+
+def nearest_enemy(player, enemies):
+    """ユークリッド距離で最も近い敵と距離を返す（敵がいなければ (None, inf)）"""
+    if not enemies:
+        return None, float('inf')
+
+    if np is not None and len(enemies) >= VECTORIZE_MIN_ENEMIES:
+        positions = np.array([(e['x'], e['y']) for e in enemies], dtype=float)
+        distances = np.hypot(positions[:, 0] - player['x'], positions[:, 1] - player['y'])
+        index = int(distances.argmin())
+        return enemies[index], float(distances[index])
+
+    nearest = None
+    min_dist = float('inf')
+    for enemy in enemies:
+        dist = math.hypot(enemy['x'] - player['x'], enemy['y'] - player['y'])
+        if dist < min_dist:
+            min_dist = dist
+            nearest = enemy
+    return nearest, min_dist
+
+
+def direction_threats(player, enemies, scale=100):
+    """上下左右それぞれの脅威度（近い敵ほど大きい）
+
+    各敵について scale / (距離 + 1) を、敵のいる側の左右と上下に加算する。
+    """
+    danger = {'up': 0, 'down': 0, 'left': 0, 'right': 0}
+    if not enemies:
+        return danger
+
+    if np is not None and len(enemies) >= VECTORIZE_MIN_ENEMIES:
+        positions = np.array([(e['x'], e['y']) for e in enemies], dtype=float)
+        dx = positions[:, 0] - player['x']
+        dy = positions[:, 1] - player['y']
+        threat = scale / (np.hypot(dx, dy) + 1)
+        danger['right'] = float(threat[dx > 0].sum())
+        danger['left'] = float(threat[dx <= 0].sum())
+        danger['down'] = float(threat[dy > 0].sum())
+        danger['up'] = float(threat[dy <= 0].sum())
+        return danger
+
+    for enemy in enemies:
+        dx = enemy['x'] - player['x']
+        dy = enemy['y'] - player['y']
+        threat = scale / (math.hypot(dx, dy) + 1)
+
+        if dx > 0:
+            danger['right'] += threat
+        else:
+            danger['left'] += threat
+
+        if dy > 0:
+            danger['down'] += threat
+        else:
+            danger['up'] += threat
+    return danger
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+alert / confirm / prompt をページ内のキューで受け取る
+
+window.alert などを記録用の関数に差し替え、ダイアログを自動で閉じた
+ことにしてメッセージをキューに積む。ページが止まらないので、移動ごとに
+driver.switch_to.alert を試す必要がなくなる。
+
+キューの中身は GameSnapshot のフィールドとして状態と一緒に受け取れるので
+（DialogListener.EXPRESSION）、イベントのための追加の呼び出しは不要:
+
+    dialogs = DialogListener(driver, callback=on_dialog)
+    dialogs.install()
+    snapshot = GameSnapshot(driver, {..., 'dialogs': DialogListener.EXPRESSION})
+
+    state = snapshot.get()
+    dialogs.feed(state['dialogs'])
+    event = dialogs.pop()      # {'type': 'alert', 'message': 'クリア！...', ...} または None
+
+スナップショットを使わない場合は poll()（1回の呼び出し）か、
+イベントが来るまでページ内で待つ wait(timeout) を使う。
+
+Chromeでは Page.addScriptToEvaluateOnNewDocument で登録するので、
+ページを再読み込みしても差し替えは維持される。登録はドライバーごとに1回だけで、
+同じドライバーで DialogListener を作り直して install() しても増えない
+（uninstall() で登録を外す）。
+"""
+
+from collections import deque
+
+INSTALL_SCRIPT = """
+(function() {
+    if (window.__dialogs) return;
+    const queue = [];
+    const page = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    let seq = 0;
+    const dialogs = {
+        waiters: [],
+        take: () => queue.splice(0),
+        size: () => queue.length
+    };
+    const record = (type, message) => {
+        queue.push({
+            page: page,
+            seq: ++seq,
+            type: type,
+            message: message === undefined ? '' : String(message),
+            time: Date.now()
+        });
+        // ゲーム側の処理（nextStage など）が終わってから待機中の呼び出しに返す
+        const waiters = dialogs.waiters.splice(0);
+        setTimeout(() => waiters.forEach(w => w()), 0);
+    };
+    window.alert = message => { record('alert', message); };
+    window.confirm = message => { record('confirm', message); return true; };
+    window.prompt = (message, value) => {
+        record('prompt', message);
+        return value === undefined ? '' : value;
+    };
+    window.__dialogs = dialogs;
+})();
+"""
+
+TAKE_SCRIPT = "return window.__dialogs ? window.__dialogs.take() : null;"
+
+WAIT_SCRIPT = """
+    const timeoutMs = arguments[0];
+    const done = arguments[arguments.length - 1];
+    const dialogs = window.__dialogs;
+    if (!dialogs) {
+        done(null);
+        return;
+    }
+    if (dialogs.size()) {
+        done(dialogs.take());
+        return;
+    }
+    const notify = () => {
+        clearTimeout(timer);
+        done(dialogs.take());
+    };
+    const timer = setTimeout(() => {
+        dialogs.waiters.splice(dialogs.waiters.indexOf(notify), 1);
+        done([]);
+    }, timeoutMs);
+    dialogs.waiters.push(notify);
+"""
+
+# execute_async_script のタイムアウトはページ側の待ち時間より少し長くする
+SCRIPT_TIMEOUT_MARGIN = 5
+
+# 登録したスクリプトの識別子を覚えておくドライバーの属性
+SCRIPT_ID_ATTR = '_dialog_listener_script_id'
+
+
+class DialogListener:
+    """ページ内のダイアログイベントを受け取る"""
+
+    # GameSnapshot のフィールドに使う式
+    EXPRESSION = "window.__dialogs ? window.__dialogs.take() : null"
+
+    def __init__(self, driver, callback=None):
+        self.driver = driver
+        # callback(event) は新しいイベントごとに呼ばれる
+        self.callback = callback
+        self.events = deque()
+        self.page = None
+        self.last_seq = 0
+
+    @property
+    def persistent(self):
+        """以降のページ読み込みにも差し替えが適用されるか"""
+        return getattr(self.driver, SCRIPT_ID_ATTR, None) is not None
+
+    def install(self):
+        """ダイアログの差し替えを注入（Chromeなら以降のページ読み込みにも適用）"""
+        if not self.persistent:
+            try:
+                result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                                     {'source': INSTALL_SCRIPT})
+                # 同じドライバーで作り直した DialogListener が登録を重ねないようにする
+                setattr(self.driver, SCRIPT_ID_ATTR, result['identifier'])
+            except Exception:
+                # CDP が使えないドライバーでは読み込みごとに install() を呼ぶ
+                pass
+        self.driver.execute_script(INSTALL_SCRIPT)
+
+    def uninstall(self):
+        """以降のページ読み込みへの注入をやめる（今のページの差し替えはそのまま）"""
+        identifier = getattr(self.driver, SCRIPT_ID_ATTR, None)
+        if identifier is None:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': identifier})
+        except Exception:
+            pass
+        setattr(self.driver, SCRIPT_ID_ATTR, None)
+
+    def feed(self, events):
+        """ページから受け取ったイベントをキューに追加し、新しいものを返す
+
+        スナップショットは変化がないと前回の値を返すので、ページごとの
+        通し番号で重複を除く。
+        """
+        new_events = []
+        for event in events or []:
+            if event['page'] != self.page:
+                # ページが再読み込みされた
+                self.page = event['page']
+                self.last_seq = 0
+            if event['seq'] <= self.last_seq:
+                continue
+            self.last_seq = event['seq']
+            self.events.append(event)
+            new_events.append(event)
+            if self.callback:
+                self.callback(event)
+        return new_events
+
+    def poll(self):
+        """ページのキューを1回の呼び出しで取り出す"""
+        events = self.driver.execute_script(TAKE_SCRIPT)
+        if events is None:
+            # 未注入（CDPなしで再読み込みされた場合など）
+            self.install()
+            return []
+        return self.feed(events)
+
+    def wait(self, timeout=0.5):
+        """イベントが来るまで最大 timeout 秒ページ内で待ち、最初のイベントを返す"""
+        if not self.events:
+            self.driver.set_script_timeout(timeout + SCRIPT_TIMEOUT_MARGIN)
+            events = self.driver.execute_async_script(WAIT_SCRIPT, timeout * 1000)
+            if events is None:
+                self.install()
+            else:
+                self.feed(events)
+        return self.pop()
+
+    def pending(self):
+        """未処理のイベントがあるか"""
+        return bool(self.events)
+
+    def pop(self):
+        """最も古い未処理のイベント（なければ None）"""
+        return self.events.popleft() if self.events else None
+
+    def clear(self):
+        self.events.clear()
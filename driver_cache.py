@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChromeDriver をChromeのメジャーバージョンごとにローカルへキャッシュする
+
+Chrome for Testing の JSON API を引いて zip を tempfile.mkdtemp() に
+落とす処理を毎回実行すると、起動のたびに数秒〜数分かかり、ネットワークが
+なければ起動できない。get_driver は一度取得したドライバーを
+
+    <キャッシュ>/<メジャーバージョン>/chromedriver(.exe)
+
+に置き、次からはこのファイルの存在確認（stat 1回）だけで返す。
+
+    path = get_driver()                  # キャッシュになければ一度だけダウンロード
+    path = get_driver(offline=True)      # ネットワークを使わない（なければ None）
+    driver = create_driver(service=chrome_service())
+
+キャッシュの場所は環境変数 CHROMEDRIVER_CACHE（既定 ~/.cache/chromedriver）、
+CHROMEDRIVER_OFFLINE=1 で常にオフライン、CHROME_VERSION でバージョン検出を
+省略できる。ドライバーを別途用意した場合は、このディレクトリ構成で置けばよい。
+"""
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+CACHE_DIR = os.environ.get('CHROMEDRIVER_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'chromedriver'))
+
+# メジャーバージョンごとの最新版（known-good-versions より小さい）
+MILESTONES_URL = ("https://googlechromelabs.github.io/chrome-for-testing/"
+                  "latest-versions-per-milestone-with-downloads.json")
+
+DRIVER_NAME = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+# 検出できなかったときのバージョン（各スクリプトの既定値と同じ）
+DEFAULT_CHROME_VERSION = "139.0.7258.155"
+
+# Chromeの実行ファイル（--version でバージョンを取る）
+CHROME_BINARIES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser"
+]
+
+_chrome_version = None
+
+
+def platform_name():
+    """Chrome for Testing のプラットフォーム名"""
+    if sys.platform.startswith('win'):
+        return 'win64' if platform.machine().endswith('64') else 'win32'
+    if sys.platform == 'darwin':
+        return 'mac-arm64' if platform.machine() == 'arm64' else 'mac-x64'
+    return 'linux64'
+
+
+def chrome_version():
+    """インストールされているChromeのバージョン（プロセス内で1回だけ調べる）"""
+    global _chrome_version
+    if _chrome_version:
+        return _chrome_version
+
+    version = os.environ.get('CHROME_VERSION')
+    if not version and sys.platform.startswith('win'):
+        try:
+            result = subprocess.run([
+                'reg', 'query',
+                'HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon',
+                '/v', 'version'
+            ], capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                for line in result.stdout.split('\n'):
+                    if 'version' in line:
+                        version = line.split()[-1]
+                        break
+        except:
+            pass
+    if not version:
+        for binary in CHROME_BINARIES:
+            try:
+                result = subprocess.run([binary, '--version'],
+                                        capture_output=True, text=True, timeout=10)
+                if result.returncode == 0:
+                    # "Google Chrome 139.0.7258.155" から "139.0.7258.155" を取り出す
+                    version = result.stdout.strip().split()[-1]
+                    break
+            except:
+                pass
+
+    _chrome_version = version or DEFAULT_CHROME_VERSION
+    return _chrome_version
+
+
+def major_version(version=None):
+    return (version or chrome_version()).split('.')[0]
+
+
+def driver_path(major=None):
+    """キャッシュ上のドライバーのパス（存在するとは限らない）"""
+    return os.path.join(CACHE_DIR, str(major or major_version()), DRIVER_NAME)
+
+
+def cached_driver(major=None):
+    """キャッシュにあればそのパス、なければ None（ネットワークは使わない）"""
+    path = driver_path(major)
+    return path if os.path.isfile(path) else None
+
+
+def download_driver(major=None, timeout=30):
+    """メジャーバージョンに合うドライバーをダウンロードしてキャッシュに置く
+
+    展開はキャッシュと同じディレクトリで行い、最後に os.replace で置くので、
+    途中で止まっても壊れたドライバーが残ることはない。
+    """
+    import requests
+
+    major = str(major or major_version())
+    response = requests.get(MILESTONES_URL, timeout=15)
+    response.raise_for_status()
+    milestone = response.json()['milestones'].get(major)
+    if not milestone or 'chromedriver' not in milestone.get('downloads', {}):
+        raise RuntimeError(f"Chrome {major} 対応のChromeDriverが見つかりません")
+
+    target = platform_name()
+    url = None
+    for download in milestone['downloads']['chromedriver']:
+        if download['platform'] == target:
+            url = download['url']
+            break
+    if not url:
+        raise RuntimeError(f"{target} 版のChromeDriverが見つかりません")
+
+    path = driver_path(major)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    work_dir = tempfile.mkdtemp(dir=directory)
+    try:
+        zip_path = os.path.join(work_dir, 'chromedriver.zip')
+        with requests.get(url, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            with open(zip_path, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=65536):
+                    f.write(chunk)
+
+        extracted = None
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            for name in zip_ref.namelist():
+                if os.path.basename(name) == DRIVER_NAME:
+                    extracted = zip_ref.extract(name, work_dir)
+                    break
+        if not extracted:
+            raise RuntimeError(f"{DRIVER_NAME} がアーカイブに含まれていません")
+
+        os.chmod(extracted, 0o755)
+        os.replace(extracted, path)
+        with open(os.path.join(directory, 'version.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': milestone['version'], 'platform': target, 'url': url}, f)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return path
+
+
+def get_driver(major=None, offline=None):
+    """使えるChromeDriverのパスを返す
+
+    キャッシュにあればネットワークを使わずに返す。なければ（offline でなければ）
+    一度だけダウンロードしてキャッシュする。取得できなければ None。
+    """
+    path = cached_driver(major)
+    if path:
+        return path
+
+    if offline is None:
+        offline = os.environ.get('CHROMEDRIVER_OFFLINE', '0').lower() not in ('0', 'false', 'no', '')
+    if offline:
+        return None
+
+    try:
+        return download_driver(major)
+    except Exception as e:
+        print(f"[ERROR] ChromeDriverダウンロード失敗: {e}")
+        return None
+
+
+def chrome_service(major=None, offline=None):
+    """キャッシュのドライバーを使う Service（なければ None = Seleniumに任せる）"""
+    from selenium.webdriver.chrome.service import Service
+
+    path = get_driver(major, offline)
+    return Service(path) if path else None
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エピソード履歴の追記型ストア
+
+学習履歴を JSON 配列として毎回まるごと書き直すと、エピソードが
+増えるほど保存が遅くなる。EpisodeStore は1エピソード1行の JSON Lines
+ファイルに追記するだけなので、保存のコストはエピソード数によらない。
+
+    store = EpisodeStore("rpg_learning_log.jsonl", legacy_file="rpg_learning_log.json")
+    store.append(episode_result)
+    store.recent(5)                 # 直近5エピソード
+    store.best(3)                   # スコア上位3エピソード
+    for record in store.iter_records():   # グラフ用に1件ずつ読む
+        ...
+
+エピソード番号・スコア・ファイル内の位置は別の索引ファイル（.idx）に
+追記しておくので、起動時に大きな履歴（state_history など）を
+読み直さずに get / recent / best ができる。索引が壊れていたり
+履歴ファイルとずれていたりした場合は履歴ファイルから作り直す。
+
+コンストラクターはファイルを読むだけで書き込まない（並列実行のワーカーが
+同時に作っても親の履歴や索引を書き換えない）。従来形式の取り込みと
+索引・途中で切れた最後の行の修復は、履歴を書き込むプロセスが
+migrate() で1回だけ行う（append は最初の書き込みの前に自動で呼ぶ）:
+
+    store = EpisodeStore("rpg_learning_log.jsonl", legacy_file="rpg_learning_log.json")
+    store.migrate()                 # 親プロセスで、読む前に
+
+戦略のように毎回まるごと保存するものは save_checkpoint で
+一時ファイルに書いてから置き換えるので、途中で止まっても壊れない。
+"""
+
+import heapq
+import json
+import os
+import tempfile
+
+
+def save_checkpoint(path, data):
+    """data を JSON で path にアトミックに保存"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path, default=None):
+    """save_checkpoint で保存したデータを読む（なければ default）"""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class EpisodeStore:
+    """1エピソード1行の JSON Lines ファイル＋索引"""
+
+    def __init__(self, path, key='episode', score_key='final_score', legacy_file=None):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.key = key
+        self.score_key = score_key
+        # 索引: {"key", "score", "offset", "length"} をファイル順に並べたもの
+        self.index = []
+        self.positions = {}
+        self.legacy_file = legacy_file
+        # 索引ファイルが履歴ファイルとずれている（migrate で書き直す）
+        self.needs_repair = False
+        self.migrated = False
+        self._load_index()
+
+    # --- 書き込み ---
+
+    def migrate(self):
+        """従来形式の履歴を取り込み、索引と途中で切れた最後の行を直す
+
+        履歴を書き込むプロセスで1回だけ呼ぶ（2回目以降は何もしない）。
+        """
+        if self.migrated:
+            return
+        self.migrated = True
+        if not os.path.exists(self.path) and os.path.exists(self.index_path):
+            # 履歴ファイルが消されたあとに残った索引
+            os.remove(self.index_path)
+        if not os.path.exists(self.path) and self.legacy_file and os.path.exists(self.legacy_file):
+            self.import_json(self.legacy_file)
+        elif self.needs_repair:
+            self.rebuild_index()
+
+    def append(self, record):
+        """1エピソードを追記"""
+        self.migrate()
+        self._write(record)
+
+    def _write(self, record):
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(data)
+        entry = {
+            "key": record.get(self.key),
+            "score": record.get(self.score_key),
+            "offset": offset,
+            "length": len(data)
+        }
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+        self._add_entry(entry)
+
+    def import_json(self, legacy_file):
+        """従来の JSON 配列形式の履歴を取り込む（元のファイルは残す）"""
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        for record in records:
+            self._write(record)
+
+    # --- 読み込み ---
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def last_key(self):
+        """最後に追記したエピソードのキー（空なら None）"""
+        return self.index[-1]["key"] if self.index else None
+
+    def scores(self):
+        """(キー, スコア) の一覧（索引だけで返す）"""
+        return [(entry["key"], entry["score"]) for entry in self.index]
+
+    def get(self, key):
+        """キーでエピソードを1件読む（なければ None）"""
+        position = self.positions.get(key)
+        if position is None:
+            return None
+        return self._read([self.index[position]])[0]
+
+    def recent(self, n):
+        """直近 n エピソード（古い順）"""
+        return self._read(self.index[-n:] if n > 0 else [])
+
+    def best(self, n=1):
+        """スコア上位 n エピソード（高い順）"""
+        scored = [entry for entry in self.index if entry["score"] is not None]
+        return self._read(heapq.nlargest(n, scored, key=lambda entry: entry["score"]))
+
+    def iter_records(self):
+        """全エピソードを先頭から1件ずつ読む（全体をメモリに載せない）"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for line in f:
+                record = _decode(line)
+                if record is not None:
+                    yield record
+
+    def _read(self, entries):
+        if not entries:
+            return []
+        records = []
+        with open(self.path, 'rb') as f:
+            for entry in entries:
+                f.seek(entry["offset"])
+                records.append(json.loads(f.read(entry["length"]).decode('utf-8')))
+        return records
+
+    # --- 索引 ---
+
+    def _add_entry(self, entry):
+        self.positions[entry["key"]] = len(self.index)
+        self.index.append(entry)
+
+    def _load_index(self):
+        self.index = []
+        self.positions = {}
+        if not os.path.exists(self.path):
+            return
+
+        size = os.path.getsize(self.path)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            self._add_entry(json.loads(line))
+                end = self.index[-1]["offset"] + self.index[-1]["length"] if self.index else 0
+                if end == size:
+                    return
+            except (ValueError, KeyError):
+                pass
+        # 索引はメモリ上で作り直し、ファイルは migrate で直す
+        self._scan()
+        self.needs_repair = True
+
+    def _scan(self):
+        """履歴ファイルを読み直して索引を作り、正しく書き終わった部分の長さを返す
+
+        途中の読めない行は飛ばして先を読み続ける（改行のない最後の行は含めない）。
+        """
+        self.index = []
+        self.positions = {}
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = _decode(line)
+                if record is not None:
+                    self._add_entry({
+                        "key": record.get(self.key),
+                        "score": record.get(self.score_key),
+                        "offset": offset,
+                        "length": len(line)
+                    })
+                offset += len(line)
+        return offset
+
+    def rebuild_index(self):
+        """履歴ファイルを読み直して索引ファイルを書き直す
+
+        書き込み途中で止まった（改行のない）最後の行だけを切り捨てる。
+        途中の読めない行はファイルに残したまま索引から外す。
+        """
+        offset = self._scan()
+        if offset != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            for entry in self.index:
+                f.write(json.dumps(entry) + "\n")
+        self.needs_repair = False
+
+
+def _decode(line):
+    """1行を読む（空行や読めない行は None）"""
+    if not line.strip():
+        return None
+    try:
+        return json.loads(line.decode('utf-8'))
+    except ValueError:
+        return None
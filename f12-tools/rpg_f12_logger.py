@@ -4,17 +4,20 @@
 Minimal RPGゲームのF12コンソールログ自動取得スクリプト
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import json
 import os
+import sys
 from datetime import datetime
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from browser_factory import create_driver
+
 class RPGF12Logger:
     def __init__(self):
         self.driver = None
@@ -23,14 +26,7 @@ class RPGF12Logger:
     def setup_driver(self):
         """コンソールログ取得可能なブラウザを設定"""
         # ログ取得を有効にする
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL', 'performance': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(logs=('browser',))
         print("[INFO] Chrome起動完了（F12ログ取得モード）")
         
     def capture_console_logs(self):
@@ -3,13 +3,16 @@
 Seleniumを使ってF12のコンソールログを取得するデモ
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 import json
 import time
 import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from browser_factory import create_driver
+from driver_cache import chrome_service
 
 class F12LogCollector:
     def __init__(self, headless=True):
@@ -24,22 +27,17 @@ class F12LogCollector:
         
     def setup_browser(self):
         """ブラウザを起動してログ収集の準備をする"""
-        options = Options()
-        
-        if self.headless:
-            options.add_argument('--headless')
+        # ChromeDriverはローカルのキャッシュから（なければ一度だけダウンロード）
+        service = chrome_service()
         
         # F12のコンソールログを取得可能にする設定
-        options.set_capability('goog:loggingPrefs', {
-            'browser': 'ALL',        # コンソールログ
-            'performance': 'ALL',    # ネットワークログ
-            'driver': 'ALL'          # Seleniumドライバログ
-        })
-        
-        # 自動でChromeDriverをダウンロードして設定
-        from selenium.webdriver.chrome.service import Service
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+        self.driver = create_driver(
+            headless=self.headless,
+            logs=('browser',        # コンソールログ
+                  'performance',    # ネットワークログ
+                  'driver'),        # Seleniumドライバログ
+            service=service
+        )
         
         print("✅ ブラウザ起動完了")
         
@@ -4,11 +4,8 @@
 F12ログが確実に取得できるかテスト
 """
 
-import requests
-import zipfile
 import os
-import tempfile
-import subprocess
+import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -16,66 +13,15 @@ from selenium.webdriver.common.by import By
 import json
 import time
 
-def get_chrome_version():
-    """Chromeバージョン取得"""
-    try:
-        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-        result = subprocess.run([chrome_path, '--version'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version = result.stdout.strip().split()[-1]
-            return version
-    except:
-        pass
-    return "139.0.7258.155"
-
-def download_chromedriver():
-    """ChromeDriverをダウンロード"""
-    chrome_version = get_chrome_version()
-    major_version = chrome_version.split('.')[0]
-    
-    try:
-        api_url = "https://googlechromelabs.github.io/chrome-for-testing/known-good-versions-with-downloads.json"
-        response = requests.get(api_url, timeout=15)
-        data = response.json()
-        
-        for version_info in data['versions']:
-            if version_info['version'].startswith(f"{major_version}."):
-                if 'chromedriver' in version_info['downloads']:
-                    for download in version_info['downloads']['chromedriver']:
-                        if download['platform'] == 'win64':
-                            # ダウンロードと展開
-                            temp_dir = tempfile.mkdtemp()
-                            zip_path = os.path.join(temp_dir, 'chromedriver.zip')
-                            
-                            with requests.get(download['url'], stream=True, timeout=30) as r:
-                                r.raise_for_status()
-                                with open(zip_path, 'wb') as f:
-                                    for chunk in r.iter_content(chunk_size=8192):
-                                        f.write(chunk)
-                            
-                            extract_path = os.path.join(temp_dir, 'extracted')
-                            os.makedirs(extract_path, exist_ok=True)
-                            
-                            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                                zip_ref.extractall(extract_path)
-                            
-                            # chromedriver.exeを探す
-                            for root, dirs, files in os.walk(extract_path):
-                                for file in files:
-                                    if file == 'chromedriver.exe':
-                                        return os.path.join(root, file)
-                            break
-                    break
-    except Exception as e:
-        print(f"[ERROR] ChromeDriverダウンロード失敗: {e}")
-    return None
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from driver_cache import get_driver, chrome_version
 
 def test_f12_collection():
     """F12ログ収集の詳細テスト"""
     print("=== F12ログ収集詳細テスト ===")
     
-    driver_path = download_chromedriver()
+    driver_path = get_driver()
     if not driver_path:
         print("[ERROR] ChromeDriverが取得できません")
         return False
@@ -249,7 +195,7 @@ def test_f12_collection():
         result = {
             'test_type': 'detailed_f12_collection',
             'success': len(console_logs) > 0,
-            'chrome_version': get_chrome_version(),
+            'chrome_version': chrome_version(),
             'chromedriver_path': driver_path,
             'html_file': html_file,
             'test_timestamp': time.time(),
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ゲームのフレームを Python から進めるロックステップモードと加速モード
+
+time.sleep で待つと、1フレームの間に何回判断できるかが WebDriver の
+遅延次第で変わる。FrameStepper はページの requestAnimationFrame を
+差し替えてゲームループを止め、step(K) で K フレームだけ進める。
+止めている間は performance.now / Date.now も仮想時刻（1フレーム = 1/60秒）
+を返すので、クールダウンなどもフレーム数どおりに進む。
+
+    stepper = FrameStepper(driver, seed=1)
+    stepper.install()          # 以降に読み込むページは最初のフレームから停止状態
+    driver.refresh()
+    stepper.step(6, keys=DIRECTION_KEYS['up'])            # 上を押したまま6フレーム
+    state = stepper.step(1, expression="game.player.hp")  # 1フレーム進めて値を返す
+    stepper.elapsed()          # 仮想の経過秒数
+
+判断と実時間が切り離されるので、エピソードは CPU の許す限り速く進み、
+seed を指定すれば Math.random も固定されて毎回同じ展開になる。
+
+止めずに実時間の speed 倍で回し続ける加速モード（タイムワープ）もある。
+ゲームループはページ内で回り、エージェントはいつも通り状態を読んで
+操作するだけでよい（フレームの途中の状態が見えることはない）:
+
+    stepper = FrameStepper(driver, speed=20)
+    stepper.install(paused=False)   # 60秒のエピソードが実時間3秒ほどで終わる
+    stepper.elapsed()               # ゲーム内の経過秒数
+    stepper.wait(0.1)               # ゲーム内で0.1秒分だけ待つ（実時間は 0.1 / speed 秒）
+
+setTimeout / setInterval と引数なしの new Date() は実時間のまま。
+"""
+
+import json
+import time
+
+# requestAnimationFrame と時計の差し替え（最後の呼び出しに設定を渡す）
+# 時計のモード:
+#   通常   (speed = 1)  実時間の rAF で1フレームずつ。時刻は実時間
+#   停止   (paused)     step() で進めた分だけ。時刻は1フレーム = frameMs
+#   加速   (speed > 1)  setTimeout で実時間の speed 倍のペースまでフレームを回す。
+#                       時刻はフレーム数から決めるので、処理が追いつかなくても
+#                       ゲームから見た時間とフレームは常に一致する
+INSTALL_SCRIPT = """
+(function(config) {
+    if (!window.__lockstep) {
+        const realRAF = window.requestAnimationFrame.bind(window);
+        const realSetTimeout = window.setTimeout.bind(window);
+        const realDateNow = Date.now;
+        const realPerfNow = performance.now.bind(performance);
+        const realRandom = Math.random;
+        const dateBase = realDateNow() - realPerfNow();
+
+        const ls = {
+            paused: false,
+            speed: 1,
+            frameMs: 1000 / 60,
+            frames: 0,
+            // 停止・加速中の仮想時刻
+            time: 0,
+            // 通常モードの時刻 = anchorTime + (実時間 - anchorReal)
+            anchorTime: 0,
+            anchorReal: realPerfNow(),
+            // 加速モードで anchorReal 以降に回したフレーム数
+            warpFrames: 0,
+            callbacks: new Map(),
+            nextId: 1,
+            pumping: false,
+            // 加速モードで1回のタスクに回す最大フレーム数（WebDriver の呼び出しを挟めるように）
+            maxBatch: 30
+        };
+        ls.anchorTime = ls.anchorReal;
+        const virtual = () => ls.paused || ls.speed !== 1;
+        const now = () => virtual() ? ls.time : ls.anchorTime + (realPerfNow() - ls.anchorReal);
+        const runFrame = timestamp => {
+            const callbacks = ls.callbacks;
+            ls.callbacks = new Map();
+            ls.frames++;
+            callbacks.forEach(cb => cb(timestamp));
+        };
+        const pump = () => {
+            ls.pumping = false;
+            if (ls.paused) return;
+            if (ls.speed === 1) {
+                runFrame(now());
+                return;
+            }
+            const due = Math.floor((realPerfNow() - ls.anchorReal) * ls.speed / ls.frameMs);
+            let batch = Math.min(due - ls.warpFrames, ls.maxBatch);
+            while (batch-- > 0 && ls.callbacks.size) {
+                ls.time += ls.frameMs;
+                ls.warpFrames++;
+                runFrame(ls.time);
+            }
+            schedule();
+        };
+        const schedule = () => {
+            if (!ls.paused && !ls.pumping && ls.callbacks.size) {
+                ls.pumping = true;
+                if (ls.speed === 1) realRAF(pump);
+                else realSetTimeout(pump, 0);
+            }
+        };
+        // モードを切り替える前に現在の時刻を引き継ぐ
+        const anchor = () => {
+            const t = now();
+            ls.time = t;
+            ls.anchorTime = t;
+            ls.anchorReal = realPerfNow();
+            ls.warpFrames = 0;
+        };
+
+        window.requestAnimationFrame = cb => {
+            const id = ls.nextId++;
+            ls.callbacks.set(id, cb);
+            schedule();
+            return id;
+        };
+        window.cancelAnimationFrame = id => { ls.callbacks.delete(id); };
+        performance.now = now;
+        Date.now = () => Math.floor(dateBase + now());
+
+        ls.pause = () => {
+            if (!ls.paused) {
+                anchor();
+                ls.paused = true;
+            }
+            return ls.frames;
+        };
+        ls.resume = () => {
+            if (ls.paused) {
+                ls.paused = false;
+                anchor();
+                schedule();
+            }
+            return ls.frames;
+        };
+        ls.setSpeed = speed => {
+            anchor();
+            ls.speed = speed;
+            schedule();
+            return ls.frames;
+        };
+        ls.step = count => {
+            if (!ls.paused) anchor();
+            for (let i = 0; i < count; i++) {
+                ls.time += ls.frameMs;
+                runFrame(ls.time);
+            }
+            if (!ls.paused) anchor();
+            return ls.frames;
+        };
+        ls.seed = seed => {
+            if (seed === null || seed === undefined) {
+                Math.random = realRandom;
+                return;
+            }
+            // mulberry32
+            let s = seed >>> 0;
+            Math.random = () => {
+                s = (s + 0x6D2B79F5) >>> 0;
+                let t = s;
+                t = Math.imul(t ^ (t >>> 15), t | 1);
+                t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+                return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+            };
+        };
+        window.__lockstep = ls;
+    }
+    const ls = window.__lockstep;
+    if (config) {
+        ls.frameMs = 1000 / config.fps;
+        ls.seed(config.seed);
+        ls.setSpeed(config.speed);
+        if (config.paused) ls.pause();
+    }
+})
+"""
+
+# keys を押したまま count フレーム進め、expression の値を返す
+STEP_SCRIPT = """
+    const count = arguments[0];
+    const keys = arguments[1];
+    const expression = arguments[2];
+    const ls = window.__lockstep;
+    if (!ls) return null;
+    if (keys) keys.forEach(k => { game.keys[k] = true; });
+    ls.step(count);
+    if (keys) keys.forEach(k => { game.keys[k] = false; });
+    return {
+        frames: ls.frames,
+        value: expression ? (new Function('return (' + expression + ');'))() : null
+    };
+"""
+
+
+class FrameStepper:
+    """ページのゲームループをフレーム単位で進める"""
+
+    def __init__(self, driver, fps=60, seed=None, speed=1):
+        self.driver = driver
+        self.fps = fps
+        # Math.random のシード（None なら本来の乱数）
+        self.seed = seed
+        # 停止していないときの実時間に対する速さ
+        self.speed = speed
+        self.paused = False
+        self.frames = 0
+        self.script_id = None
+
+    def _source(self, paused):
+        config = {'fps': self.fps, 'seed': self.seed, 'speed': self.speed, 'paused': paused}
+        return f"{INSTALL_SCRIPT}({json.dumps(config)});"
+
+    def install(self, paused=True):
+        """差し替えを注入する
+
+        Chromeでは以降に読み込むページにも最初から適用されるので、
+        install() の後に再読み込みすればゲームの初期化から決定的になる。
+        今開いているページも、その時点から停止（paused=False なら speed 倍）する。
+        """
+        self.paused = paused
+        source = self._source(paused)
+        try:
+            result = self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument',
+                                                 {'source': source})
+            self.script_id = result.get('identifier')
+        except Exception:
+            # CDP が使えないドライバーでは読み込みごとに install() を呼ぶ
+            pass
+        self.driver.execute_script(source)
+        self.frames = self.driver.execute_script("return window.__lockstep.frames;")
+
+    def uninstall(self):
+        """以降のページ読み込みで差し替えないようにし、今のページは再開する"""
+        if self.script_id is not None:
+            self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                        {'identifier': self.script_id})
+            self.script_id = None
+        self.resume()
+
+    def pause(self):
+        self.paused = True
+        self.frames = self.driver.execute_script(
+            "return window.__lockstep ? window.__lockstep.pause() : null;")
+
+    def resume(self):
+        self.paused = False
+        self.frames = self.driver.execute_script(
+            "return window.__lockstep ? window.__lockstep.resume() : null;")
+
+    def set_speed(self, speed):
+        """停止していないときの速さを変える（1 で実時間）"""
+        self.speed = speed
+        self.frames = self.driver.execute_script(
+            "return window.__lockstep ? window.__lockstep.setSpeed(arguments[0]) : null;", speed)
+
+    def step(self, frames=1, keys=None, expression=None):
+        """keys を押したまま frames フレーム進めて expression の値を返す（1回の呼び出し）"""
+        result = self.driver.execute_script(STEP_SCRIPT, frames, keys, expression)
+        if result is None:
+            raise RuntimeError("ロックステップが注入されていません（install() を呼んでください）")
+        self.frames = result['frames']
+        return result['value']
+
+    def frames_for(self, seconds):
+        """秒数をフレーム数に換算（最低1フレーム）"""
+        return max(1, round(seconds * self.fps))
+
+    def wait(self, seconds):
+        """ゲーム内で seconds 秒待つ（time.sleep の代わり）
+
+        停止中はその分のフレームを進め、加速中は実時間で seconds / speed 秒待つ。
+        """
+        if self.paused:
+            self.step(self.frames_for(seconds))
+        else:
+            time.sleep(seconds / self.speed)
+
+    def hold(self, keys, seconds):
+        """keys を seconds 秒分押したまま進める"""
+        self.step(self.frames_for(seconds), keys=keys)
+
+    def elapsed(self):
+        """ゲーム内の経過秒数（ページを読み込んでからのフレーム数から計算）
+
+        停止中は手元のフレーム数を使い、動いている間はページに問い合わせる。
+        """
+        if not self.paused:
+            self.frames = self.driver.execute_script(
+                "return window.__lockstep ? window.__lockstep.frames : 0;")
+        return self.frames / self.fps
@@ -4,73 +4,83 @@
 スコア追跡型RPGプレイヤー - プレイごとにスコアを記録・表示
 """
 
-import json
 import os
 from datetime import datetime
 import time
 import random
-import math
-from selenium import webdriver
+import sys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
+from game_snapshot import GameSnapshot
+from danger_map import nearest_enemy
+from page_events import load_game
+from episode_store import EpisodeStore
+from input_controller import InputController
+from frame_stepper import FrameStepper
+
 # 日本語フォント設定
 plt.rcParams['font.sans-serif'] = ['MS Gothic', 'Yu Gothic', 'Hiragino Sans', 'Meiryo']
 plt.rcParams['axes.unicode_minus'] = False
 
 class ScoreTrackingRPGPlayer:
-    def __init__(self):
+    def __init__(self, speed=1):
         self.driver = None
-        self.score_file = "rpg_score_history.json"
+        self.snapshot = None
+        self.controls = None
+        # 加速モード: ゲームを実時間の speed 倍で進める（1 なら通常）
+        self.speed = speed
+        self.stepper = None
+        self.score_file = "rpg_score_history.jsonl"
+        # 以前の JSON 配列形式の履歴があれば最初に取り込む
+        self.store = EpisodeStore(self.score_file, key='play_number', score_key='score',
+                                  legacy_file="rpg_score_history.json")
+        self.store.migrate()
         self.score_history = self.load_score_history()
         self.session_scores = []
         self.last_attack_time = 0
         self.attack_cooldown = 0.25
         
     def load_score_history(self):
-        """スコア履歴をロード"""
-        if os.path.exists(self.score_file):
-            with open(self.score_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        """スコア履歴をロード（1プレイ分は小さいので全件メモリに載せる）"""
+        return list(self.store.iter_records())
         
     def save_score_history(self):
-        """スコア履歴を保存"""
-        with open(self.score_file, 'w', encoding='utf-8') as f:
-            json.dump(self.score_history, f, ensure_ascii=False, indent=2)
+        """最新のプレイを履歴に追記"""
+        result = self.score_history[-1]
+        if result['play_number'] not in self.store:
+            self.store.append(result)
             
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
+        self.driver = create_driver(eager=True)
+        self.controls = InputController(self.driver)
+        self.stepper = None
+        self.snapshot = None
         
-        self.driver = webdriver.Chrome(options=options)
+    def now(self):
+        """経過時間の基準（加速中はゲーム内の時刻）"""
+        return self.stepper.elapsed() if self.stepper else time.time()
         
+    def wait(self, seconds):
+        """ゲーム内で seconds 秒待つ"""
+        if self.stepper:
+            self.stepper.wait(seconds)
+        else:
+            time.sleep(seconds)
+            
     def move(self, direction, duration=0.2):
         """移動"""
-        key_map = {
-            'up': ['w', 'W', 'ArrowUp'],
-            'down': ['s', 'S', 'ArrowDown'],
-            'left': ['a', 'A', 'ArrowLeft'],
-            'right': ['d', 'D', 'ArrowRight']
-        }
-        
-        keys = key_map[direction]
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = true;")
-        time.sleep(duration)
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = false;")
+        # 押下から解放までページ側で行う（呼び出しは1回）
+        self.controls.move(direction, ms=duration * 1000, wait=True)
             
     def attack(self):
         """通常攻撃"""
-        current_time = time.time()
+        current_time = self.now()
         if current_time - self.last_attack_time < self.attack_cooldown:
             return False
             
@@ -98,46 +108,29 @@ class ScoreTrackingRPGPlayer:
         """)
         
     def get_game_state(self):
-        """ゲーム状態を取得"""
-        return self.driver.execute_script("""
-            const enemies = game.enemies.map(e => ({
-                x: e.x + e.width/2,
-                y: e.y + e.height/2,
-                hp: e.hp
-            }));
-            
-            return {
-                player: {
+        """ゲーム状態を取得（1回の呼び出しで変化分だけ受け取る）"""
+        if self.snapshot is None:
+            self.snapshot = GameSnapshot(self.driver, {
+                'player': """({
                     x: game.player.x + 16,
                     y: game.player.y + 16,
                     hp: game.player.hp,
                     mp: game.player.mp,
                     score: game.player.score,
                     facing: game.player.facing
-                },
-                enemies: enemies,
-                projectiles: game.projectiles.length
-            };
-        """)
+                })""",
+                'enemies': """game.enemies.map(e => ({
+                    x: e.x + e.width/2,
+                    y: e.y + e.height/2,
+                    hp: e.hp
+                }))""",
+                'projectiles': 'game.projectiles.length'
+            })
+        return self.snapshot.get()
         
     def find_nearest_enemy(self, player, enemies):
         """最も近い敵を見つける"""
-        if not enemies:
-            return None, float('inf')
-            
-        nearest = None
-        min_dist = float('inf')
-        
-        for enemy in enemies:
-            dx = enemy['x'] - player['x']
-            dy = enemy['y'] - player['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-                
-        return nearest, min_dist
+        return nearest_enemy(player, enemies)
         
     def get_direction_to_target(self, player, target):
         """ターゲットへの方向を計算"""
@@ -231,8 +224,14 @@ class ScoreTrackingRPGPlayer:
         try:
             # ゲームを開く
             game_path = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
-            self.driver.get(f"file:///{game_path}")
-            time.sleep(2)
+            load_game(self.driver, f"file:///{game_path}")
+            
+            if self.speed != 1:
+                # ページ内の時計を差し替えて speed 倍で進める
+                self.stepper = FrameStepper(self.driver, speed=self.speed)
+                self.stepper.install(paused=False)
+                self.controls.stepper = self.stepper
+                self.last_attack_time = 0
             
             # キャンバスにフォーカス
             canvas = self.driver.find_element(By.ID, "gameCanvas")
@@ -241,14 +240,14 @@ class ScoreTrackingRPGPlayer:
             play_number = len(self.score_history) + 1
             print(f"\n🎮 プレイ #{play_number} 開始！")
             
-            start_time = time.time()
+            start_time = self.now()
             last_score = 0
             max_score = 0
             
             # リアルタイムスコア表示の準備
             print("スコア: ", end="", flush=True)
             
-            while time.time() - start_time < duration:
+            while self.now() - start_time < duration:
                 # ゲーム状態を取得
                 game_state = self.get_game_state()
                 player = game_state['player']
@@ -289,11 +288,11 @@ class ScoreTrackingRPGPlayer:
                     direction = random.choice(['up', 'down', 'left', 'right'])
                     self.move(direction, 0.3)
                     
-                time.sleep(0.05)
+                self.wait(0.05)
                 
             # プレイ結果を記録
             final_state = self.get_game_state()
-            play_time = time.time() - start_time
+            play_time = self.now() - start_time
             
             result = {
                 'play_number': play_number,
@@ -344,7 +343,9 @@ def main():
     print("=== スコア追跡型RPGプレイヤー ===")
     print("毎回のスコアを記録し、進捗を可視化します\n")
     
-    player = ScoreTrackingRPGPlayer()
+    # --warp N: ゲームを実時間の N 倍で進める
+    speed = float(sys.argv[sys.argv.index('--warp') + 1]) if '--warp' in sys.argv else 1
+    player = ScoreTrackingRPGPlayer(speed=speed)
     
     # 初期スコアボード表示
     if player.score_history:
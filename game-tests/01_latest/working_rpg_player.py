@@ -4,46 +4,36 @@
 動作確認済みRPGプレイヤー - 攻撃クールダウンを考慮
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+import os
+import sys
 import time
 import random
-import math
 from datetime import datetime
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
+from danger_map import nearest_enemy
+from page_events import load_game
+from input_controller import InputController
+
 class WorkingRPGPlayer:
     def __init__(self):
         self.driver = None
+        self.controls = None
         self.last_attack_time = 0
         self.attack_cooldown = 0.25  # 攻撃間隔（秒）
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(eager=True)
+        self.controls = InputController(self.driver)
         
     def move(self, direction, duration=0.2):
         """移動"""
-        key_map = {
-            'up': ['w', 'W', 'ArrowUp'],
-            'down': ['s', 'S', 'ArrowDown'],
-            'left': ['a', 'A', 'ArrowLeft'],
-            'right': ['d', 'D', 'ArrowRight']
-        }
-        
-        keys = key_map[direction]
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = true;")
-        time.sleep(duration)
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = false;")
+        # 押下から解放までページ側で行う（呼び出しは1回）
+        self.controls.move(direction, ms=duration * 1000, wait=True)
             
     def attack(self):
         """通常攻撃（クールダウンを考慮）"""
@@ -102,22 +92,7 @@ class WorkingRPGPlayer:
         
     def find_nearest_enemy(self, player, enemies):
         """最も近い敵を見つける"""
-        if not enemies:
-            return None, float('inf')
-            
-        nearest = None
-        min_dist = float('inf')
-        
-        for enemy in enemies:
-            dx = enemy['x'] - player['x']
-            dy = enemy['y'] - player['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-                
-        return nearest, min_dist
+        return nearest_enemy(player, enemies)
         
     def get_direction_to_target(self, player, target):
         """ターゲットへの方向を計算"""
@@ -134,8 +109,7 @@ class WorkingRPGPlayer:
         try:
             # ゲームを開く
             game_path = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
-            self.driver.get(f"file:///{game_path}")
-            time.sleep(2)
+            load_game(self.driver, f"file:///{game_path}")
             
             # キャンバスにフォーカス
             canvas = self.driver.find_element(By.ID, "gameCanvas")
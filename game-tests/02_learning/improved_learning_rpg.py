@@ -4,30 +4,57 @@
 改良版学習型RPGプレイヤー - より賢く、より強く
 """
 
-import json
 import os
 import time
 import random
 import math
+import sys
 from datetime import datetime
-from selenium import webdriver
+from pathlib import PureWindowsPath
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver as create_browser
+from session_pool import SessionPool
+from page_events import wait_for_game
+from danger_map import nearest_enemy, direction_threats
+from episode_store import EpisodeStore, save_checkpoint, load_checkpoint
+from state_recorder import StateRecorder
+from input_controller import InputController
+from frame_stepper import FrameStepper
+
+GAME_PATH = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
+# Chromeの current_url と同じ形（file:///C:/...）
+GAME_URL = PureWindowsPath(GAME_PATH).as_uri()
 
 class ImprovedLearningRPG:
-    def __init__(self):
+    def __init__(self, lockstep=False, seed=None, speed=1):
         self.driver = None
-        self.log_file = "improved_rpg_log.json"
+        self.controls = None
+        # ロックステップモード: 実時間ではなくゲームのフレーム単位で進める
+        self.lockstep = lockstep
+        # ロックステップ中のページの Math.random のシード
+        self.seed = seed
+        # 加速モード: ゲームを実時間の speed 倍で進める（1 なら通常）
+        self.speed = speed
+        self.stepper = None
+        self.log_file = "improved_rpg_log.jsonl"
         self.strategy_file = "improved_rpg_strategy.json"
+        # ティックごとの状態はエピソードごとに列形式で別ファイルに保存
+        self.state_dir = "improved_rpg_state_history"
+        self.state_every = 5
+        # 以前の JSON 配列形式の履歴は、履歴を書き込むプロセスが store.migrate() で取り込む
+        self.store = EpisodeStore(self.log_file, legacy_file="improved_rpg_log.json")
         self.play_history = []
         self.current_strategy = self.load_strategy()
         self.episode = 0
         
     def load_strategy(self):
         """戦略をロード"""
-        if os.path.exists(self.strategy_file):
-            with open(self.strategy_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        strategy = load_checkpoint(self.strategy_file)
+        if strategy:
+            return strategy
         else:
             # より賢い初期戦略
             return {
@@ -44,17 +71,49 @@ class ImprovedLearningRPG:
                 "reaction_time": 0.05        # 反応速度
             }
     
+    def create_driver(self):
+        """ブラウザを起動して返す（セッションプールからも使う）"""
+        return create_browser(eager=True)
+        
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
+        self.driver = self.create_driver()
+        
+    def open_game(self):
+        """ゲームを開いて準備ができるまで待つ（セッションプールが開いた後なら待つだけ）"""
+        if self.lockstep or self.speed != 1:
+            self.start_virtual_clock()
+        else:
+            self.stepper = None
+            if self.driver.current_url != GAME_URL:
+                self.driver.get(GAME_URL)
+            wait_for_game(self.driver)
+        # ドライバーはセッションプールから渡されるのでここで作る
+        self.controls = InputController(self.driver, self.stepper)
         
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
+    def start_virtual_clock(self):
+        """ゲームの時計を差し替えて開き直す
+
+        ロックステップなら止めた状態で開き、以降は wait / 押下の分だけフレームが進む。
+        加速モードならページ内で speed 倍の速さで進み続ける。
+        """
+        self.stepper = FrameStepper(self.driver, seed=self.seed, speed=self.speed)
+        self.stepper.install(paused=self.lockstep)
+        # 差し替えをゲームの初期化より前に効かせるため読み込み直す
+        self.driver.get(GAME_URL)
+        wait_for_game(self.driver, frames=0)
         
-        self.driver = webdriver.Chrome(options=options)
+    def now(self):
+        """経過時間の基準（ロックステップ・加速中はゲーム内の時刻）"""
+        return self.stepper.elapsed() if self.stepper else time.time()
         
+    def wait(self, seconds):
+        """ゲーム内で seconds 秒待つ（ロックステップ中はその分のフレームを進める）"""
+        if self.stepper:
+            self.stepper.wait(seconds)
+        else:
+            time.sleep(seconds)
+            
     def get_game_state(self):
         """ゲーム状態を取得"""
         return self.driver.execute_script("""
@@ -125,68 +184,25 @@ class ImprovedLearningRPG:
         
     def execute_aimed_attack(self, target_direction):
         """狙いをつけて攻撃"""
-        # まず向きを変える
-        key_map = {
-            'up': ['w', 'W', 'ArrowUp'],
-            'down': ['s', 'S', 'ArrowDown'],
-            'left': ['a', 'A', 'ArrowLeft'],
-            'right': ['d', 'D', 'ArrowRight']
-        }
-        
         # 短く方向キーを押して向きだけ変える
-        keys = key_map[target_direction]
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = true;")
-        time.sleep(0.02)
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = false;")
+        self.controls.move(target_direction, ms=20, wait=True)
         
-        time.sleep(0.02)
+        self.wait(0.02)
         
         # 攻撃
-        self.driver.execute_script("game.keys[' '] = true;")
-        time.sleep(0.05)
-        self.driver.execute_script("game.keys[' '] = false;")
+        self.controls.tap('attack', ms=50, wait=True)
         
     def smart_move(self, direction, duration):
         """賢い移動（壁を避ける）"""
-        key_map = {
-            'up': ['w', 'W', 'ArrowUp'],
-            'down': ['s', 'S', 'ArrowDown'],
-            'left': ['a', 'A', 'ArrowLeft'],
-            'right': ['d', 'D', 'ArrowRight']
-        }
-        
-        keys = key_map[direction]
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = true;")
-        
-        time.sleep(duration)
-        
-        for key in keys:
-            self.driver.execute_script(f"game.keys['{key}'] = false;")
+        self.controls.move(direction, ms=duration * 1000, wait=True)
             
     def dodge_enemies(self, player, enemies):
         """複数の敵から回避する方向を計算"""
         if not enemies:
             return random.choice(['up', 'down', 'left', 'right'])
             
-        # 各方向への危険度を計算
-        danger = {'up': 0, 'down': 0, 'left': 0, 'right': 0}
-        
-        for enemy in enemies[:5]:  # 最も近い5体を考慮
-            dx = enemy['x'] - player['x']
-            dy = enemy['y'] - player['y']
-            dist = math.sqrt(dx*dx + dy*dy) + 1
-            
-            # 距離が近いほど危険度が高い
-            threat = 100 / dist
-            
-            if dx > 0: danger['right'] += threat
-            else: danger['left'] += threat
-            
-            if dy > 0: danger['down'] += threat
-            else: danger['up'] += threat
+        # 各方向への危険度を計算（最も近い5体を考慮）
+        danger = direction_threats(player, enemies[:5])
             
         # 最も安全な方向を選択
         safest = min(danger.items(), key=lambda x: x[1])
@@ -196,9 +212,7 @@ class ImprovedLearningRPG:
         """1エピソードをプレイ（改良版）"""
         try:
             # ゲームを開く
-            game_path = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
-            self.driver.get(f"file:///{game_path}")
-            time.sleep(2)
+            self.open_game()
             
             # キャンバスにフォーカス
             canvas = self.driver.find_element(By.ID, "gameCanvas")
@@ -209,14 +223,22 @@ class ImprovedLearningRPG:
             print(f"現在の最高スコア: {self.current_strategy['best_score']}")
             print(f"累計キル数: {self.current_strategy['total_kills']}")
             
-            start_time = time.time()
+            start_time = self.now()
             action_log = []
-            state_history = []
+            states = StateRecorder({
+                'time': 'd',
+                'hp': 'f',
+                'mp': 'f',
+                'score': 'i',
+                'enemies': 'i',
+                'x': 'f',
+                'y': 'f'
+            }, every=self.state_every)
             kills = 0
             last_score = 0
             
             # ゲームプレイ
-            while time.time() - start_time < duration:
+            while self.now() - start_time < duration:
                 # 現在の状態を取得
                 game_state = self.get_game_state()
                 player = game_state['player']
@@ -228,17 +250,16 @@ class ImprovedLearningRPG:
                     last_score = player['score']
                     print(f"  敵撃破！ スコア: {player['score']}")
                 
-                # 状態を記録
-                if len(state_history) % 5 == 0:  # 5フレームごとに記録
-                    state_history.append({
-                        'time': time.time() - start_time,
-                        'hp': player['hp'],
-                        'mp': player['mp'],
-                        'score': player['score'],
-                        'enemies': len(enemies),
-                        'x': player['x'],
-                        'y': player['y']
-                    })
+                # 状態を記録（state_every フレームごと）
+                states.record(
+                    time=self.now() - start_time,
+                    hp=player['hp'],
+                    mp=player['mp'],
+                    score=player['score'],
+                    enemies=len(enemies),
+                    x=player['x'],
+                    y=player['y']
+                )
                 
                 # HPが0になったら終了
                 if player['hp'] <= 0:
@@ -246,14 +267,7 @@ class ImprovedLearningRPG:
                     break
                     
                 # 最も近い敵を見つける
-                if enemies:
-                    nearest = min(enemies, key=lambda e: 
-                        math.sqrt((e['x']-player['x'])**2 + (e['y']-player['y'])**2))
-                    distance = math.sqrt((nearest['x']-player['x'])**2 + 
-                                       (nearest['y']-player['y'])**2)
-                else:
-                    nearest = None
-                    distance = float('inf')
+                nearest, distance = nearest_enemy(player, enemies)
                     
                 # 行動決定
                 if distance < self.current_strategy['dodge_threshold'] and len(enemies) > 3:
@@ -291,22 +305,23 @@ class ImprovedLearningRPG:
                 # 特殊攻撃の判断
                 if (player['mp'] >= 30 and len(enemies) >= 4 and 
                     random.random() < self.current_strategy['special_frequency']):
-                    self.driver.execute_script("game.keys['e'] = true; game.keys['E'] = true;")
-                    time.sleep(0.05)
-                    self.driver.execute_script("game.keys['e'] = false; game.keys['E'] = false;")
+                    self.controls.tap('special', ms=50, wait=True)
                     action_log.append('special')
                     print("  必殺技発動！")
                     
-                time.sleep(self.current_strategy['reaction_time'])
+                self.wait(self.current_strategy['reaction_time'])
                 
             # 最終状態
             final_state = self.get_game_state()
+            if self.stepper:
+                # 次のページ読み込みには差し替えを残さない
+                self.stepper.uninstall()
             
             # 結果を記録
             episode_result = {
                 'episode': self.episode,
                 'timestamp': datetime.now().isoformat(),
-                'duration': time.time() - start_time,
+                'duration': self.now() - start_time,
                 'final_score': final_state['player']['score'],
                 'kills': kills,
                 'final_hp': final_state['player']['hp'],
@@ -320,7 +335,10 @@ class ImprovedLearningRPG:
                     'explore': action_log.count('explore'),
                     'adjust': action_log.count('adjust'),
                     'special': action_log.count('special')
-                }
+                },
+                # 状態の推移は load_states(state_file) で読む
+                'state_file': states.save(os.path.join(self.state_dir, f"ep{self.episode}")),
+                'state_samples': len(states)
             }
             
             self.play_history.append(episode_result)
@@ -333,33 +351,6 @@ class ImprovedLearningRPG:
                   f"回避{episode_result['action_breakdown']['dodge']}回、"
                   f"追跡{episode_result['action_breakdown']['chase']}回")
             
-            # 学習：戦略を更新
-            if episode_result['final_score'] > self.current_strategy['best_score']:
-                self.current_strategy['best_score'] = episode_result['final_score']
-                print(f"[INFO] 最高スコア更新！")
-                
-            self.current_strategy['total_kills'] += kills
-            self.current_strategy['episode'] = self.episode
-            
-            # 戦略の微調整
-            if kills == 0 and episode_result['duration'] < 20:
-                # 攻撃が当たっていない
-                self.current_strategy['attack_accuracy'] *= 0.95
-                self.current_strategy['preferred_distance'] *= 1.1
-                
-            if episode_result['final_hp'] == 0 and episode_result['duration'] < 30:
-                # 生存時間が短い
-                self.current_strategy['dodge_threshold'] *= 1.1
-                self.current_strategy['movement_speed'] = min(0.2, 
-                    self.current_strategy['movement_speed'] * 1.05)
-                    
-            # 保存
-            with open(self.strategy_file, 'w', encoding='utf-8') as f:
-                json.dump(self.current_strategy, f, ensure_ascii=False, indent=2)
-                
-            with open(self.log_file, 'w', encoding='utf-8') as f:
-                json.dump(self.play_history, f, ensure_ascii=False, indent=2)
-                
             return episode_result
             
         except Exception as e:
@@ -368,6 +359,34 @@ class ImprovedLearningRPG:
             traceback.print_exc()
             return None
             
+    def update_strategy(self, episode_result):
+        """エピソード結果から戦略を更新して保存"""
+        kills = episode_result['kills']
+        
+        # 学習：戦略を更新
+        if episode_result['final_score'] > self.current_strategy['best_score']:
+            self.current_strategy['best_score'] = episode_result['final_score']
+            print(f"[INFO] 最高スコア更新！")
+            
+        self.current_strategy['total_kills'] += kills
+        self.current_strategy['episode'] = self.episode
+        
+        # 戦略の微調整
+        if kills == 0 and episode_result['duration'] < 20:
+            # 攻撃が当たっていない
+            self.current_strategy['attack_accuracy'] *= 0.95
+            self.current_strategy['preferred_distance'] *= 1.1
+            
+        if episode_result['final_hp'] == 0 and episode_result['duration'] < 30:
+            # 生存時間が短い
+            self.current_strategy['dodge_threshold'] *= 1.1
+            self.current_strategy['movement_speed'] = min(0.2, 
+                self.current_strategy['movement_speed'] * 1.05)
+                
+        # 保存（履歴は追記、戦略は一時ファイル経由で置き換え）
+        self.store.append(episode_result)
+        save_checkpoint(self.strategy_file, self.current_strategy)
+        
     def cleanup(self):
         if self.driver:
             self.driver.quit()
@@ -380,23 +399,26 @@ def main():
     print("- 状況に応じた行動選択")
     print("- キル数を追跡\n")
     
-    player = ImprovedLearningRPG()
+    # --lockstep: フレーム単位で進めて実時間より速く、毎回同じ条件でプレイする
+    # --warp N: ゲームを実時間の N 倍で進める
+    speed = float(sys.argv[sys.argv.index('--warp') + 1]) if '--warp' in sys.argv else 1
+    player = ImprovedLearningRPG(lockstep='--lockstep' in sys.argv, speed=speed)
+    # ブラウザはエピソード間で使い回し、ページの再読み込みだけでリセットする
+    pool = SessionPool(player.create_driver, size=1, max_uses=20)
     
-    # 履歴をロード
-    if os.path.exists(player.log_file):
-        with open(player.log_file, 'r', encoding='utf-8') as f:
-            player.play_history = json.load(f)
+    # 直近の履歴をロード（全履歴は player.store にある）
+    player.store.migrate()
+    player.play_history = player.store.recent(3)
     
     try:
         # 3エピソード実行
         for i in range(3):
-            player.setup_driver()
-            result = player.play_episode(duration=60)
-            player.cleanup()
-            
-            if i < 2:
-                print("\n次のエピソードまで3秒待機...")
-                time.sleep(3)
+            with pool.session(GAME_URL) as driver:
+                player.driver = driver
+                result = player.play_episode(duration=60)
+                
+            if result:
+                player.update_strategy(result)
                 
         # サマリー表示
         print("\n=== セッションサマリー ===")
@@ -413,7 +435,7 @@ def main():
     except KeyboardInterrupt:
         print("\n[INFO] 学習を中断しました")
     finally:
-        player.cleanup()
+        pool.close()
         
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,38 +4,67 @@
 学習型RPGゲームプレイヤー - プレイを重ねるごとに上達していく
 """
 
-import json
 import os
 import time
 import random
 import math
+import sys
 from datetime import datetime
-from selenium import webdriver
+from pathlib import PureWindowsPath
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver as create_browser
+from session_pool import SessionPool
+from page_events import wait_for_game
+from danger_map import nearest_enemy
+from episode_store import EpisodeStore, save_checkpoint, load_checkpoint
+from state_recorder import StateRecorder
+from input_controller import InputController
+from frame_stepper import FrameStepper
+
 # 日本語フォント設定
 plt.rcParams['font.sans-serif'] = ['MS Gothic', 'Yu Gothic', 'Hiragino Sans', 'Meiryo']
 plt.rcParams['axes.unicode_minus'] = False
 
+GAME_PATH = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
+# Chromeの current_url と同じ形（file:///C:/...）
+GAME_URL = PureWindowsPath(GAME_PATH).as_uri()
+
+# 戦略の更新やサマリーに使う直近のエピソード数（それより古いものはストアにだけ残す）
+HISTORY_WINDOW = 20
+
 class LearningRPGPlayer:
-    def __init__(self):
+    def __init__(self, lockstep=False, seed=None, speed=1):
         self.driver = None
-        self.log_file = "rpg_learning_log.json"
+        self.controls = None
+        # ロックステップモード: 実時間ではなくゲームのフレーム単位で進める
+        self.lockstep = lockstep
+        # ロックステップ中のページの Math.random のシード
+        self.seed = seed
+        # 加速モード: ゲームを実時間の speed 倍で進める（1 なら通常）
+        self.speed = speed
+        self.stepper = None
+        self.log_file = "rpg_learning_log.jsonl"
         self.strategy_file = "rpg_strategy.json"
+        # ティックごとの状態はエピソードごとに列形式で別ファイルに保存
+        self.state_dir = "rpg_state_history"
+        self.state_every = 1
+        # 以前の JSON 配列形式の履歴は、履歴を書き込むプロセスが store.migrate() で取り込む
+        self.store = EpisodeStore(self.log_file, legacy_file="rpg_learning_log.json")
         self.play_history = []
         self.current_strategy = self.load_strategy()
         self.episode = 0
         
     def load_strategy(self):
         """戦略をロード、なければ初期戦略を作成"""
-        if os.path.exists(self.strategy_file):
-            with open(self.strategy_file, 'r', encoding='utf-8') as f:
-                strategy = json.load(f)
-                print(f"[INFO] 既存の戦略をロード (エピソード: {strategy['episode']})")
-                return strategy
+        strategy = load_checkpoint(self.strategy_file)
+        if strategy:
+            print(f"[INFO] 既存の戦略をロード (エピソード: {strategy['episode']})")
+            return strategy
         else:
             # 初期戦略
             return {
@@ -56,33 +85,64 @@ class LearningRPGPlayer:
             }
     
     def save_strategy(self):
-        """現在の戦略を保存"""
-        with open(self.strategy_file, 'w', encoding='utf-8') as f:
-            json.dump(self.current_strategy, f, ensure_ascii=False, indent=2)
+        """現在の戦略を保存（書き込み途中で止まっても前の戦略が残る）"""
+        save_checkpoint(self.strategy_file, self.current_strategy)
             
     def load_history(self):
-        """過去のプレイ履歴をロード"""
-        if os.path.exists(self.log_file):
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
+        """直近のプレイ履歴をロード"""
+        return self.store.recent(HISTORY_WINDOW)
     
     def save_history(self):
-        """プレイ履歴を保存"""
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(self.play_history, f, ensure_ascii=False, indent=2)
-            
+        """まだ保存していないエピソードを履歴に追記"""
+        for episode in self.play_history:
+            if episode['episode'] not in self.store:
+                self.store.append(episode)
+        # メモリには直近の分だけ残す
+        del self.play_history[:-HISTORY_WINDOW]
+            
+    def create_driver(self):
+        """ブラウザを起動して返す（セッションプールからも使う）"""
+        return create_browser(eager=True)
+        
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
+        self.driver = self.create_driver()
         
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
+    def open_game(self):
+        """ゲームを開いて準備ができるまで待つ（セッションプールが開いた後なら待つだけ）"""
+        if self.lockstep or self.speed != 1:
+            self.start_virtual_clock()
+        else:
+            self.stepper = None
+            if self.driver.current_url != GAME_URL:
+                self.driver.get(GAME_URL)
+            wait_for_game(self.driver)
+        # ドライバーはセッションプールから渡されるのでここで作る
+        self.controls = InputController(self.driver, self.stepper)
         
-        self.driver = webdriver.Chrome(options=options)
+    def start_virtual_clock(self):
+        """ゲームの時計を差し替えて開き直す
+
+        ロックステップなら止めた状態で開き、以降は wait / 押下の分だけフレームが進む。
+        加速モードならページ内で speed 倍の速さで進み続ける。
+        """
+        self.stepper = FrameStepper(self.driver, seed=self.seed, speed=self.speed)
+        self.stepper.install(paused=self.lockstep)
+        # 差し替えをゲームの初期化より前に効かせるため読み込み直す
+        self.driver.get(GAME_URL)
+        wait_for_game(self.driver, frames=0)
+        
+    def now(self):
+        """経過時間の基準（ロックステップ・加速中はゲーム内の時刻）"""
+        return self.stepper.elapsed() if self.stepper else time.time()
         
+    def wait(self, seconds):
+        """ゲーム内で seconds 秒待つ（ロックステップ中はその分のフレームを進める）"""
+        if self.stepper:
+            self.stepper.wait(seconds)
+        else:
+            time.sleep(seconds)
+            
     def get_game_state(self):
         """現在のゲーム状態を取得"""
         return self.driver.execute_script("""
@@ -111,21 +171,7 @@ class LearningRPGPlayer:
         
     def calculate_nearest_enemy(self, player_pos, enemies):
         """最も近い敵を見つける"""
-        if not enemies:
-            return None, float('inf')
-            
-        min_dist = float('inf')
-        nearest = None
-        
-        for enemy in enemies:
-            dx = enemy['x'] - player_pos['x']
-            dy = enemy['y'] - player_pos['y']
-            dist = math.sqrt(dx*dx + dy*dy)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-                
-        return nearest, min_dist
+        return nearest_enemy(player_pos, enemies)
         
     def decide_action(self, game_state):
         """ゲーム状態から次の行動を決定"""
@@ -220,37 +266,21 @@ class LearningRPGPlayer:
             
     def execute_action(self, action, direction=None):
         """行動を実行"""
+        # どの行動も押下から解放まで1回の呼び出しで行う
         if action == 'move' and direction:
-            key_map = {
-                'up': ['w', 'W', 'ArrowUp'],
-                'down': ['s', 'S', 'ArrowDown'],
-                'left': ['a', 'A', 'ArrowLeft'],
-                'right': ['d', 'D', 'ArrowRight']
-            }
-            keys = key_map[direction]
-            for key in keys:
-                self.driver.execute_script(f"game.keys['{key}'] = true;")
-            time.sleep(0.1)
-            for key in keys:
-                self.driver.execute_script(f"game.keys['{key}'] = false;")
+            self.controls.move(direction, ms=100, wait=True)
                 
         elif action == 'attack':
-            self.driver.execute_script("game.keys[' '] = true;")
-            time.sleep(0.05)
-            self.driver.execute_script("game.keys[' '] = false;")
+            self.controls.tap('attack', ms=50, wait=True)
             
         elif action == 'special':
-            self.driver.execute_script("game.keys['e'] = true; game.keys['E'] = true;")
-            time.sleep(0.05)
-            self.driver.execute_script("game.keys['e'] = false; game.keys['E'] = false;")
+            self.controls.tap('special', ms=50, wait=True)
             
     def play_episode(self, duration=60):
         """1エピソードをプレイ"""
         try:
             # ゲームを開く
-            game_path = r"C:\Users\user\Desktop\work\90_cc\20250910\minimal-rpg-game\custom_bg_game.html"
-            self.driver.get(f"file:///{game_path}")
-            time.sleep(2)
+            self.open_game()
             
             # キャンバスにフォーカス
             canvas = self.driver.find_element(By.ID, "gameCanvas")
@@ -260,21 +290,27 @@ class LearningRPGPlayer:
             print(f"\n=== エピソード {self.episode} 開始 ===")
             print(f"現在の最高スコア: {self.current_strategy['best_score']}")
             
-            start_time = time.time()
+            start_time = self.now()
             action_log = []
-            state_history = []
+            states = StateRecorder({
+                'time': 'd',
+                'hp': 'f',
+                'mp': 'f',
+                'score': 'i',
+                'enemies': 'i'
+            }, every=self.state_every)
             
             # ゲームプレイ
-            while time.time() - start_time < duration:
+            while self.now() - start_time < duration:
                 # 現在の状態を取得
                 game_state = self.get_game_state()
-                state_history.append({
-                    'time': time.time() - start_time,
-                    'hp': game_state['player']['hp'],
-                    'mp': game_state['player']['mp'],
-                    'score': game_state['player']['score'],
-                    'enemies': len(game_state['enemies'])
-                })
+                states.record(
+                    time=self.now() - start_time,
+                    hp=game_state['player']['hp'],
+                    mp=game_state['player']['mp'],
+                    score=game_state['player']['score'],
+                    enemies=len(game_state['enemies'])
+                )
                 
                 # HPが0になったら終了
                 if game_state['player']['hp'] <= 0:
@@ -297,16 +333,19 @@ class LearningRPGPlayer:
                     self.execute_action(action)
                     action_log.append(action)
                     
-                time.sleep(0.1)
+                self.wait(0.1)
                 
             # 最終状態を取得
             final_state = self.get_game_state()
+            if self.stepper:
+                # 次のページ読み込みには差し替えを残さない
+                self.stepper.uninstall()
             
             # エピソード結果を記録
             episode_result = {
                 'episode': self.episode,
                 'timestamp': datetime.now().isoformat(),
-                'duration': time.time() - start_time,
+                'duration': self.now() - start_time,
                 'final_score': final_state['player']['score'],
                 'final_hp': final_state['player']['hp'],
                 'final_mp': final_state['player']['mp'],
@@ -317,7 +356,9 @@ class LearningRPGPlayer:
                     'attack': action_log.count('attack'),
                     'special': action_log.count('special')
                 },
-                'state_history': state_history
+                # 状態の推移は load_states(state_file) で読む
+                'state_file': states.save(os.path.join(self.state_dir, f"ep{self.episode}")),
+                'state_samples': len(states)
             }
             
             self.play_history.append(episode_result)
@@ -383,15 +424,18 @@ class LearningRPGPlayer:
         
     def visualize_progress(self):
         """学習の進捗を可視化"""
-        if len(self.play_history) < 2:
+        if len(self.store) < 2:
             return
             
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 10))
         fig.suptitle(f'RPG学習プレイヤー - エピソード {self.episode}', fontsize=16)
         
-        episodes = [h['episode'] for h in self.play_history]
-        scores = [h['final_score'] for h in self.play_history]
-        durations = [h['duration'] for h in self.play_history]
+        # 全エピソードを1件ずつ読んで必要な値だけ取り出す
+        episodes, scores, durations = [], [], []
+        for h in self.store.iter_records():
+            episodes.append(h['episode'])
+            scores.append(h['final_score'])
+            durations.append(h['duration'])
         
         # スコアの推移
         ax1.plot(episodes, scores, 'b-o', markersize=6)
@@ -440,19 +484,26 @@ def main():
     print("=== 学習型RPGプレイヤー ===\n")
     print("プレイを重ねるごとに戦略を改善し、スコアを向上させます。\n")
     
-    player = LearningRPGPlayer()
+    # --lockstep: フレーム単位で進めて実時間より速く、毎回同じ条件でプレイする
+    # --warp N: ゲームを実時間の N 倍で進める
+    speed = float(sys.argv[sys.argv.index('--warp') + 1]) if '--warp' in sys.argv else 1
+    player = LearningRPGPlayer(lockstep='--lockstep' in sys.argv, speed=speed)
+    player.store.migrate()
     player.play_history = player.load_history()
+    # ブラウザはエピソード間で使い回し、ページの再読み込みだけでリセットする
+    pool = SessionPool(player.create_driver, size=1, max_uses=20)
     
     try:
         # 複数エピソードを実行
         num_episodes = 5
         
         for i in range(num_episodes):
-            player.setup_driver()
-            
-            # 1エピソードプレイ
-            result = player.play_episode(duration=45)
-            
+            with pool.session(GAME_URL) as driver:
+                player.driver = driver
+                
+                # 1エピソードプレイ
+                result = player.play_episode(duration=45)
+                
             if result:
                 # 戦略を更新
                 player.update_strategy()
@@ -463,12 +514,6 @@ def main():
                 if (i + 1) % 5 == 0:  # 5エピソードごと
                     player.visualize_progress()
                     
-            player.cleanup()
-            
-            if i < num_episodes - 1:
-                print("\n次のエピソードまで3秒待機...")
-                time.sleep(3)
-                
         # 最終結果を表示
         print("\n=== 学習結果サマリー ===")
         if player.play_history:
@@ -483,7 +528,7 @@ def main():
     except KeyboardInterrupt:
         print("\n[INFO] 学習を中断しました")
     finally:
-        player.cleanup()
+        pool.close()
         print("\n[INFO] 学習セッション終了")
         
 if __name__ == "__main__":
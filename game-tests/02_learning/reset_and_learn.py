@@ -2,7 +2,8 @@ import os
 import subprocess
 
 # ファイルを削除
-files_to_delete = ['rpg_strategy.json', 'rpg_learning_log.json']
+files_to_delete = ['rpg_strategy.json', 'rpg_learning_log.json',
+                   'rpg_learning_log.jsonl', 'rpg_learning_log.jsonl.idx']
 for file in files_to_delete:
     if os.path.exists(file):
         os.remove(file)
@@ -4,11 +4,15 @@
 デバッグ版RPGプレイヤー - 何が起きているか詳しく見る
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import math
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class DebugRPGPlayer:
     def __init__(self):
@@ -16,14 +20,7 @@ class DebugRPGPlayer:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(logs=('browser',))
         print("[INFO] ブラウザ起動完了")
         
     def test_basic_mechanics(self):
@@ -4,12 +4,16 @@
 シンプルRPGプレイヤー - 1回プレイしてブラウザを開いたままにする
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import random
 import math
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class SimpleRPGPlayer:
     def __init__(self):
@@ -19,14 +23,7 @@ class SimpleRPGPlayer:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver()
         
     def play_game(self, duration=45):
         """ゲームをプレイ"""
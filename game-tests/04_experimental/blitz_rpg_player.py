@@ -4,26 +4,26 @@
 ブリッツRPGプレイヤー - 開始直後に特殊攻撃で一掃
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+import os
+import sys
 import time
 import random
 import math
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
+from input_controller import InputController
+
 class BlitzRPGPlayer:
     def __init__(self):
         self.driver = None
+        self.controls = None
         
     def setup_driver(self):
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver()
+        self.controls = InputController(self.driver)
         
     def play_game(self):
         # ゲームを開く
@@ -111,11 +111,8 @@ class BlitzRPGPlayer:
                     if escape_y > 0: keys.append('s')
                     else: keys.append('w')
                     
-                    for key in keys:
-                        self.driver.execute_script(f"game.keys['{key}'] = true;")
-                    time.sleep(0.1)
-                    for key in keys:
-                        self.driver.execute_script(f"game.keys['{key}'] = false;")
+                    # 押下から解放までページ側で行う（呼び出しは1回）
+                    self.controls.press(keys, ms=100, wait=True)
                         
                 elif nearest['dist'] < 300:
                     # 攻撃範囲
@@ -125,9 +122,7 @@ class BlitzRPGPlayer:
                         facing = 's' if dy > 0 else 'w'
                         
                     # 向きを変えて攻撃
-                    self.driver.execute_script(f"game.keys['{facing}'] = true;")
-                    time.sleep(0.02)
-                    self.driver.execute_script(f"game.keys['{facing}'] = false;")
+                    self.controls.press([facing], ms=20, wait=True)
                     
                     if state['canAttack']:
                         self.driver.execute_script("playerAttack();")
@@ -4,30 +4,30 @@
 スマートサバイバルRPG - 円運動で回避しながら戦う
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+import os
+import sys
 import time
 import random
 import math
 
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
+from input_controller import InputController, DIRECTION_KEYS
+
 class SmartSurvivalRPG:
     def __init__(self):
         self.driver = None
+        self.controls = None
         self.last_attack_time = 0
         self.attack_cooldown = 0.3
         self.movement_angle = 0  # 円運動用の角度
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver()
+        self.controls = InputController(self.driver)
         
     def circular_movement(self):
         """円運動で回避"""
@@ -52,24 +52,14 @@ class SmartSurvivalRPG:
         # 移動方向を決定
         keys = []
         if abs(dx) > 20:
-            if dx > 0:
-                keys.extend(['d', 'D', 'ArrowRight'])
-            else:
-                keys.extend(['a', 'A', 'ArrowLeft'])
+            keys.extend(DIRECTION_KEYS['right' if dx > 0 else 'left'])
                 
         if abs(dy) > 20:
-            if dy > 0:
-                keys.extend(['s', 'S', 'ArrowDown'])
-            else:
-                keys.extend(['w', 'W', 'ArrowUp'])
+            keys.extend(DIRECTION_KEYS['down' if dy > 0 else 'up'])
         
-        # 移動実行
+        # 移動実行（押下から解放まで1回の呼び出し）
         if keys:
-            for key in keys:
-                self.driver.execute_script(f"game.keys['{key}'] = true;")
-            time.sleep(0.1)
-            for key in keys:
-                self.driver.execute_script(f"game.keys['{key}'] = false;")
+            self.controls.press(keys, ms=100, wait=True)
         
         # 角度を更新
         self.movement_angle += 0.1
@@ -96,18 +86,7 @@ class SmartSurvivalRPG:
             
             # 現在の向きと違う場合のみ方向転換
             if player.get('facing') != facing:
-                key_map = {
-                    'up': ['w', 'W', 'ArrowUp'],
-                    'down': ['s', 'S', 'ArrowDown'],
-                    'left': ['a', 'A', 'ArrowLeft'],
-                    'right': ['d', 'D', 'ArrowRight']
-                }
-                keys = key_map[facing]
-                for key in keys:
-                    self.driver.execute_script(f"game.keys['{key}'] = true;")
-                time.sleep(0.02)
-                for key in keys:
-                    self.driver.execute_script(f"game.keys['{key}'] = false;")
+                self.controls.move(facing, ms=20, wait=True)
             
             # 攻撃
             self.driver.execute_script("if(game.player.attackCooldown <= 0) playerAttack();")
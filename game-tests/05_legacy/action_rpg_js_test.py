@@ -4,10 +4,14 @@
 アクションRPG座標確認 - JavaScript直接実行版
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class PositionTestJSDemo:
     def __init__(self):
@@ -15,14 +19,8 @@ class PositionTestJSDemo:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        # 画面で確認しながら操作するので表示する
+        self.driver = create_driver(headless=False)
         print("[INFO] JavaScript座標確認デモ開始！")
         
     def test_movement(self):
@@ -4,11 +4,15 @@
 アクションRPG座標確認デモ - 移動が確実に見えるバージョン
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class PositionTestDemo:
     def __init__(self):
@@ -16,14 +20,8 @@ class PositionTestDemo:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        # 画面で確認しながら操作するので表示する
+        self.driver = create_driver(headless=False, logs=('browser',))
         print("[INFO] 座標確認デモ開始！")
         
     def test_movement(self):
@@ -4,13 +4,17 @@
 アクションRPG戦闘デモ - ゆっくり確実に動くバージョン
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import random
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class ActionRPGSlowDemo:
     def __init__(self):
@@ -18,14 +22,8 @@ class ActionRPGSlowDemo:
         
     def setup_driver(self):
         """ブラウザ起動"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        # 画面で確認しながら操作するので表示する
+        self.driver = create_driver(headless=False)
         print("[INFO] アクションRPGデモ（ゆっくり版）開始！")
         
     def show_battle(self):
@@ -4,13 +4,17 @@
 RPGゲーム戦闘デモ - 敵との激しいバトルをF12ログ付きで実演
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import time
 import json
 from datetime import datetime
+import os
+import sys
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from browser_factory import create_driver
 
 class RPGBattleDemo:
     def __init__(self):
@@ -19,14 +23,8 @@ class RPGBattleDemo:
         
     def setup_driver(self):
         """ブラウザ起動（F12ログ取得モード）"""
-        caps = DesiredCapabilities.CHROME
-        caps['goog:loggingPrefs'] = {'browser': 'ALL'}
-        
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
-        
-        self.driver = webdriver.Chrome(options=options)
+        # 画面で確認しながら操作するので表示する
+        self.driver = create_driver(headless=False, logs=('browser',))
         print("[INFO] バトルデモ用ブラウザ起動！")
         
     def capture_logs(self):
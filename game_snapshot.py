@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ページ内の game オブジェクトの状態を1回の WebDriver 呼び出しで取得する
+
+取得したいフィールドを {名前: JavaScript式} で登録すると、ページに
+アクセサ関数を1度だけ注入する。以降の get() は execute_script 1回で
+全フィールドを返す。delta=True なら前回から変化したフィールドだけが
+ページから送られ、Python側のキャッシュにマージされる。
+
+迷路のようにステージが変わるまで変化しない大きなデータは grids に
+{名前: (グリッドの式, キーの式)} で登録する。毎回送られるのはキー
+（game.stage や [game.stage, game.currentFloor]）とグリッドの識別番号
+だけで、グリッド本体はページが初めて見た配列のときだけ送られ、
+Python側でキーごとにキャッシュされる。識別番号は配列オブジェクトごとに
+振られるので、同じステージ番号で迷路が作り直された場合（ゲームオーバー後の
+resetGame など）も取り違えない。
+
+    snapshot = GameSnapshot(driver, {
+        'player': 'game.player',
+        'enemies': 'game.enemies.map(e => ({x: e.x, y: e.y}))',
+        'health': 'game.health'
+    }, grids={
+        'maze': ('game.maze', 'game.stage')
+    })
+    state = snapshot.get()
+"""
+
+import itertools
+import json
+from collections import OrderedDict
+
+# Python側に保持するグリッドの最大数
+GRID_CACHE_SIZE = 16
+
+# インスタンスごとのアクセサ名に付ける通し番号
+_instance_ids = itertools.count(1)
+
+# ページ側のアクセサ。フィールドは登録順のインデックスで返すので
+# ペイロードにはフィールド名を含まない:
+#   [[[index, value], ...], [[index, key, gridId, gridOrNull], ...]]
+INSTALL_SCRIPT = """
+    const name = arguments[0];
+    const compile = expr => new Function('return (' + expr + ');');
+    const read = getter => {
+        try {
+            const value = getter();
+            return value === undefined ? null : value;
+        } catch (e) {
+            return null;
+        }
+    };
+    window[name] = {
+        getters: arguments[1].map(compile),
+        grids: arguments[2].map(spec => ({grid: compile(spec[0]), key: compile(spec[1])})),
+        last: [],
+        lastGrid: [],
+        gridIds: new WeakMap(),
+        sentGrids: new Set(),
+        nextGridId: 1,
+        take: function(delta) {
+            const changed = [];
+            for (let i = 0; i < this.getters.length; i++) {
+                const value = read(this.getters[i]);
+                if (delta) {
+                    const serialized = JSON.stringify(value);
+                    if (serialized === this.last[i]) continue;
+                    this.last[i] = serialized;
+                }
+                changed.push([i, value]);
+            }
+
+            const grids = [];
+            for (let i = 0; i < this.grids.length; i++) {
+                const grid = read(this.grids[i].grid);
+                const key = read(this.grids[i].key);
+                let id = 0;
+                if (grid !== null && typeof grid === 'object') {
+                    id = this.gridIds.get(grid);
+                    if (!id) {
+                        id = this.nextGridId++;
+                        this.gridIds.set(grid, id);
+                    }
+                }
+                const tag = JSON.stringify([key, id]);
+                if (delta && tag === this.lastGrid[i]) continue;
+                this.lastGrid[i] = tag;
+
+                const send = id !== 0 && !this.sentGrids.has(id);
+                if (send) this.sentGrids.add(id);
+                grids.push([i, key, id, send ? grid : null]);
+            }
+            return [changed, grids];
+        }
+    };
+"""
+
+TAKE_SCRIPT = """
+    const accessor = window[arguments[0]];
+    return accessor ? accessor.take(arguments[1]) : null;
+"""
+
+
+class GameSnapshot:
+    """game オブジェクトのスナップショット取得"""
+
+    def __init__(self, driver, fields, grids=None, delta=True, name="__gameSnapshot"):
+        self.driver = driver
+        self.names = list(fields)
+        self.expressions = [fields[n] for n in self.names]
+        grids = grids or {}
+        self.grid_names = list(grids)
+        self.grid_specs = [list(grids[n]) for n in self.grid_names]
+        self.delta = delta
+        # アクセサは前回の値（差分の基準）を持つので、同じフィールド構成でも
+        # インスタンスごとに別のアクセサにする（最初の get() は必ず全フィールドになる）
+        self.name = f"{name}_{next(_instance_ids)}"
+        self.state = {}
+        # (キー, グリッド識別番号) -> グリッド
+        self.grid_cache = OrderedDict()
+
+    def install(self):
+        """アクセサをページに注入（ページ再読み込み後は再注入が必要）"""
+        self.driver.execute_script(INSTALL_SCRIPT, self.name, self.expressions, self.grid_specs)
+        self.state = {}
+        # ページ側の識別番号は振り直されるのでキャッシュも捨てる
+        self.grid_cache.clear()
+
+    def _take(self):
+        payload = self.driver.execute_script(TAKE_SCRIPT, self.name, self.delta)
+        if payload is None:
+            # 未注入またはページが再読み込みされた
+            self.install()
+            payload = self.driver.execute_script(TAKE_SCRIPT, self.name, self.delta)
+        return payload
+
+    def get(self):
+        """現在の状態を辞書で返す（変化のないフィールドはキャッシュから補完）"""
+        changed, grids = self._take()
+
+        for index, value in changed:
+            self.state[self.names[index]] = value
+
+        for index, key, grid_id, grid in grids:
+            name = self.grid_names[index]
+            if not grid_id:
+                # グリッドがまだ存在しない
+                self.state[name] = None
+                continue
+
+            cache_key = (json.dumps(key), grid_id)
+            if grid is not None:
+                self.grid_cache[cache_key] = grid
+                if len(self.grid_cache) > GRID_CACHE_SIZE:
+                    self.grid_cache.popitem(last=False)
+            elif cache_key not in self.grid_cache:
+                # キャッシュから追い出されたグリッドに戻ってきた場合は取り直す
+                self.reset()
+                return self.get()
+            self.grid_cache.move_to_end(cache_key)
+            self.state[name] = self.grid_cache[cache_key]
+
+        return dict(self.state)
+
+    def reset(self):
+        """次の get() で全フィールドとグリッドを取り直す"""
+        self.install()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+game.keys の入力状態を1回の呼び出しでまとめて設定する
+
+キーごとに execute_script で game.keys['w'] = true; と書くと、
+w / W / ArrowUp を押して離すだけで6回の往復になる。InputController は
+押すキーをまとめて1回で設定し、離すのはページ側のタイマー
+（ミリ秒 または requestAnimationFrame のフレーム数）に任せる。
+
+    controls = InputController(driver)
+    controls.move('up', ms=100)              # 押して100ms後にページが離す（1回の呼び出し）
+    controls.move('left', frames=3, wait=True)  # 3フレーム後に離れるまで待つ
+    controls.tap('attack')
+    controls.set_keys(['w', 'd'])            # 押すキーの全体を指定（他は離す）
+    controls.release_all()
+
+同じキーを離す前に押し直した場合、前の押下のタイマーではキーを離さない。
+
+ロックステップモード（frame_stepper.FrameStepper）を渡すと、wait=True の
+押下はその分のフレームを進めることで行う。加速モードでは ms をフレーム数に
+直し、ゲーム内の時間で離す。
+"""
+
+DIRECTION_KEYS = {
+    'up': ['w', 'W', 'ArrowUp'],
+    'down': ['s', 'S', 'ArrowDown'],
+    'left': ['a', 'A', 'ArrowLeft'],
+    'right': ['d', 'D', 'ArrowRight']
+}
+
+ACTION_KEYS = {
+    'attack': [' '],
+    'special': ['e', 'E']
+}
+
+# キーの押下と、タイマーまたはフレーム数による解放
+PRESS_SCRIPT = """
+    const keys = arguments[0];
+    const ms = arguments[1];
+    const frames = arguments[2];
+    const exclusive = arguments[3];
+    const done = arguments.length > 4 ? arguments[arguments.length - 1] : null;
+    const input = window.__input || (window.__input = {next: 0, owner: {}});
+    const id = ++input.next;
+
+    if (exclusive) {
+        // 指定したキー以外はすべて離す（保留中の解放も取り消す）
+        Object.keys(game.keys).forEach(k => {
+            if (!keys.includes(k)) game.keys[k] = false;
+        });
+        input.owner = {};
+    }
+    keys.forEach(k => {
+        game.keys[k] = true;
+        input.owner[k] = id;
+    });
+
+    const release = () => {
+        keys.forEach(k => {
+            // 後から押し直されたキーはそのまま
+            if (input.owner[k] === id) {
+                game.keys[k] = false;
+                delete input.owner[k];
+            }
+        });
+        if (done) done(true);
+    };
+    const afterFrames = count => {
+        if (count <= 0) release();
+        else requestAnimationFrame(() => afterFrames(count - 1));
+    };
+
+    if (frames !== null) afterFrames(frames);
+    else if (ms !== null) setTimeout(release, ms);
+    else if (done) done(true);
+"""
+
+RELEASE_ALL_SCRIPT = """
+    if (window.__input) window.__input.owner = {};
+    Object.keys(game.keys).forEach(k => { game.keys[k] = false; });
+"""
+
+# execute_async_script のタイムアウトはページ側の待ち時間より少し長くする
+SCRIPT_TIMEOUT_MARGIN = 5
+
+
+class InputController:
+    """game.keys をまとめて操作する"""
+
+    def __init__(self, driver, stepper=None):
+        self.driver = driver
+        self.stepper = stepper
+
+    def press(self, keys, ms=None, frames=None, wait=False, exclusive=False):
+        """keys を押し、ms ミリ秒 または frames フレーム後にページ側で離す
+
+        どちらも指定しなければ押したまま。wait=True なら離れるまで待って戻る
+        （それでも呼び出しは1回）。exclusive=True なら他のキーは離す。
+        """
+        keys = list(keys)
+        if self.stepper and frames is None and ms is not None:
+            # 停止・加速中はゲーム内の時間で数える
+            frames = self.stepper.frames_for(ms / 1000)
+            ms = None
+        if self.stepper and self.stepper.paused and wait and frames is not None:
+            # ロックステップ中は押したままフレームを進める
+            self.stepper.step(frames, keys=keys)
+        elif wait and (ms is not None or frames is not None):
+            timeout = (ms or 0) / 1000 + (frames or 0) / 30
+            self.driver.set_script_timeout(timeout + SCRIPT_TIMEOUT_MARGIN)
+            self.driver.execute_async_script(PRESS_SCRIPT, keys, ms, frames, exclusive)
+        else:
+            self.driver.execute_script(PRESS_SCRIPT, keys, ms, frames, exclusive)
+
+    def set_keys(self, keys):
+        """押しているキーの全体を keys にする（それ以外は離す）"""
+        self.press(keys, exclusive=True)
+
+    def release_all(self):
+        self.driver.execute_script(RELEASE_ALL_SCRIPT)
+
+    def move(self, direction, ms=100, frames=None, wait=False):
+        """'up' / 'down' / 'left' / 'right' に移動"""
+        self.press(DIRECTION_KEYS[direction], ms=None if frames is not None else ms,
+                   frames=frames, wait=wait)
+
+    def tap(self, action, ms=50, wait=False):
+        """'attack' / 'special' のキーを短く押す"""
+        self.press(ACTION_KEYS[action], ms=ms, wait=wait)
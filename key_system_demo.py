@@ -4,6 +4,8 @@ from selenium.webdriver.common.keys import Keys
 import time
 import os
 import sys
+from game_snapshot import GameSnapshot
+from dialog_listener import DialogListener
 
 def demo_with_keys():
     driver = None
@@ -23,6 +25,10 @@ def demo_with_keys():
         driver.get(f"file:///{game_file}")
         time.sleep(1)
         
+        # アラートはページ内のキューで受け取る（移動ごとの switch_to.alert は不要）
+        dialogs = DialogListener(driver)
+        dialogs.install()
+        
         body = driver.find_element(By.TAG_NAME, "body")
         
         # 初期状態
@@ -66,6 +72,22 @@ def demo_with_keys():
         ]
         pattern_index = 0
         
+        # 移動ごとの状態取得は1回の execute_script にまとめる
+        snapshot = GameSnapshot(driver, {
+            'x': 'game.player.x',
+            'y': 'game.player.y',
+            'playerKeys': 'game.player.keys',
+            'health': 'game.health',
+            'score': 'game.score',
+            'enemies': """game.enemies.map(e => ({
+                x: e.x,
+                y: e.y,
+                dist: Math.abs(e.x - game.player.x) + Math.abs(e.y - game.player.y)
+            }))""",
+            'dialogs': DialogListener.EXPRESSION
+        })
+        current = snapshot.get()
+        
         while time.time() - start_time < 20:
             # パターンに従って移動
             pattern = patterns[pattern_index % len(patterns)]
@@ -76,16 +98,9 @@ def demo_with_keys():
                     move_count += 1
                     time.sleep(0.2)
                     
-                    # 状態更新
-                    current = driver.execute_script("""
-                        return {
-                            x: game.player.x,
-                            y: game.player.y,
-                            playerKeys: game.player.keys,
-                            health: game.health,
-                            score: game.score
-                        };
-                    """)
+                    # 状態更新（敵の位置とアラートもまとめて1回で取得）
+                    current = snapshot.get()
+                    dialogs.feed(current['dialogs'])
                     
                     # 鍵を取得したか確認
                     if len(current['playerKeys']) > len(state.get('playerKeys', [])):
@@ -100,16 +115,8 @@ def demo_with_keys():
                         print(f"  所持鍵: {current['playerKeys']}")
                         print(f"  スコア: {current['score']}")
             
-            # 敵が近い場合は攻撃
-            enemies = driver.execute_script("""
-                return game.enemies.map(e => ({
-                    x: e.x, 
-                    y: e.y,
-                    dist: Math.abs(e.x - game.player.x) + Math.abs(e.y - game.player.y)
-                }));
-            """)
-            
-            close_enemies = [e for e in enemies if e['dist'] <= 1]
+            # 敵が近い場合は攻撃（直前のスナップショットの敵位置を使う）
+            close_enemies = [e for e in current['enemies'] if e['dist'] <= 1]
             if close_enemies:
                 body.send_keys(Keys.SPACE)
                 print("  攻撃！")
@@ -117,15 +124,10 @@ def demo_with_keys():
             pattern_index += 1
             
             # アラート処理
-            try:
-                alert = driver.switch_to.alert
-                text = alert.text
-                print(f"\n[アラート] {text}")
-                alert.accept()
-                time.sleep(1)
+            event = dialogs.pop()
+            if event:
+                print(f"\n[アラート] {event['message']}")
                 break
-            except:
-                pass
         
         # 最終状態
         final_state = driver.execute_script("""
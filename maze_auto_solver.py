@@ -4,12 +4,11 @@
 迷路自動クリアプログラム
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-import time
 import os
-from collections import deque
+from maze_pathfinding import find_path, to_directions
+from path_executor import PathExecutor
+from browser_factory import create_driver
+from page_events import load_game
 
 class MazeAutoSolver:
     def __init__(self):
@@ -18,18 +17,17 @@ class MazeAutoSolver:
         self.player_pos = None
         self.goal_pos = None
         self.path = []
+        self.executor = None
         
     def setup_driver(self):
         """ブラウザ起動"""
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = create_driver(eager=True)
+        self.executor = PathExecutor(self.driver)
         
     def open_game(self):
         """迷路ゲームを開く"""
         game_path = os.path.join(os.path.dirname(__file__), "simple-maze-game.html")
-        self.driver.get(f"file:///{game_path}")
-        time.sleep(1)
+        load_game(self.driver, f"file:///{game_path}")
         
     def get_maze_state(self):
         """現在の迷路の状態を取得"""
@@ -52,69 +50,20 @@ class MazeAutoSolver:
         return state
         
     def find_path_bfs(self):
-        """幅優先探索で最短経路を見つける"""
-        start = self.player_pos
-        goal = self.goal_pos
-        
-        # 訪問済みマップ
-        visited = set()
-        visited.add(start)
-        
-        # キュー: (現在位置, 経路)
-        queue = deque([(start, [])])
-        
-        # 4方向の移動
-        directions = [
-            (0, -1, 'up'),    # 上
-            (0, 1, 'down'),   # 下
-            (-1, 0, 'left'),  # 左
-            (1, 0, 'right')   # 右
-        ]
-        
-        while queue:
-            (x, y), path = queue.popleft()
-            
-            # ゴール到達
-            if (x, y) == goal:
-                return path
-                
-            # 4方向を探索
-            for dx, dy, direction in directions:
-                nx, ny = x + dx, y + dy
-                
-                # 範囲内かつ通路かつ未訪問
-                if (0 <= nx < len(self.maze[0]) and 
-                    0 <= ny < len(self.maze) and
-                    self.maze[ny][nx] == 0 and
-                    (nx, ny) not in visited):
-                    
-                    visited.add((nx, ny))
-                    queue.append(((nx, ny), path + [direction]))
-                    
-        return []  # 経路が見つからない
+        """最短経路を見つける（共通の経路探索エンジンを使用）"""
+        path = find_path(self.maze, self.player_pos, self.goal_pos)
+        if path is None:
+            return []  # 経路が見つからない
+        return to_directions(self.player_pos, path)
         
     def execute_path(self, path):
-        """見つけた経路を実行"""
+        """見つけた経路を実行（経路全体を1回の呼び出しでページに渡す）"""
         print(f"\n経路を実行中... ({len(path)}ステップ)")
         
-        # キーマッピング
-        key_map = {
-            'up': Keys.UP,
-            'down': Keys.DOWN,
-            'left': Keys.LEFT,
-            'right': Keys.RIGHT
-        }
-        
-        body = self.driver.find_element(By.TAG_NAME, "body")
+        result = self.executor.run(path)
         
-        for i, direction in enumerate(path):
-            body.send_keys(key_map[direction])
-            time.sleep(0.05)  # 少し待機
-            
-            if i % 10 == 0:
-                print(f"  進行状況: {i}/{len(path)}")
-                
-        print(f"  完了！")
+        print(f"  {result['executed']}/{len(path)}ステップ実行 ({result['reason']})")
+        return result
         
     def solve_maze(self):
         """迷路を解く"""
@@ -144,24 +93,17 @@ class MazeAutoSolver:
                 print()
                 
             # 経路を実行
-            self.execute_path(path)
+            result = self.execute_path(path)
             
-            # 結果を確認（アラートが出る前に少し待つ）
-            time.sleep(1)
-            
-            # アラートの処理
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                print(f"\n{alert_text}")
-                alert.accept()  # OKをクリック
+            # アラートは実行中にページ側で受け取っている
+            if result['alert']:
+                print(f"\n{result['alert']}")
                 
                 # 次のステージの状態を取得
-                time.sleep(0.5)
                 final_state = self.get_maze_state()
                 print(f"次のステージ: {final_state['stage']}")
                 return True
-            except:
+            else:
                 # アラートがない場合
                 final_state = self.get_maze_state()
                 print(f"\n結果: ステップ数 = {final_state['steps']}")
@@ -181,7 +123,6 @@ class MazeAutoSolver:
             
             if self.solve_maze():
                 print("ステージクリア！")
-                time.sleep(1)  # 次のステージの読み込み待ち
             else:
                 print("ステージクリア失敗")
                 break
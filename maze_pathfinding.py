@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+迷路ソルバー共通の経路探索エンジン
+
+二分ヒープのオープンセットと親ポインタによる経路復元を使ったA*。
+マスに入るコストは cost 関数で差し替えられる（敵の危険度など）。
+敵の移動に合わせて何度も再探索する場合は IncrementalPlanner（D* Lite）を使う。
+迷路は game.maze と同じ形式（0 = 通路, 1 = 壁）の2次元配列。
+"""
+
+import heapq
+
+# 4方向の移動（dx, dy, 方向名）
+DIRECTIONS = [
+    (0, -1, 'up'),
+    (0, 1, 'down'),
+    (-1, 0, 'left'),
+    (1, 0, 'right')
+]
+
+DIRECTION_NAMES = {(dx, dy): name for dx, dy, name in DIRECTIONS}
+
+INF = float('inf')
+
+
+def manhattan(a, b):
+    """マンハッタン距離"""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def find_path(maze, start, goal, cost=None):
+    """A*で start から goal までの経路を探索
+
+    cost(x, y) はそのマスに入るときの追加コスト（0以上）。
+    各マスの移動コストは 1 + cost(x, y) なので、マンハッタン距離の
+    ヒューリスティックは常に許容的になる。
+
+    戻り値は start を含まない座標のリスト。到達できなければ None。
+    """
+    start = tuple(start)
+    goal = tuple(goal)
+    if start == goal:
+        return []
+
+    height = len(maze)
+    width = len(maze[0])
+    gx, gy = goal
+
+    # 座標は y * width + x の整数インデックスで扱う
+    start_index = start[1] * width + start[0]
+    goal_index = gy * width + gx
+
+    g_score = {start_index: 0}
+    parent = {start_index: -1}
+    closed = set()
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    # (f, h, index) - f が同じならゴールに近いノードを優先
+    open_heap = [(h, h, start_index)]
+
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+
+        if current == goal_index:
+            return _reconstruct(parent, current, width)
+
+        if current in closed:
+            continue
+        closed.add(current)
+
+        cy, cx = divmod(current, width)
+        current_g = g_score[current]
+
+        for dx, dy, _ in DIRECTIONS:
+            nx, ny = cx + dx, cy + dy
+            if not (0 <= nx < width and 0 <= ny < height) or maze[ny][nx] != 0:
+                continue
+
+            neighbor = ny * width + nx
+            if neighbor in closed:
+                continue
+
+            tentative_g = current_g + 1
+            if cost is not None:
+                tentative_g += cost(nx, ny)
+
+            if tentative_g < g_score.get(neighbor, INF):
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                h = abs(nx - gx) + abs(ny - gy)
+                heapq.heappush(open_heap, (tentative_g + h, h, neighbor))
+
+    return None
+
+
+def _reconstruct(parent, index, width):
+    """親ポインタを辿って経路を復元（start は含まない）"""
+    path = []
+    while parent[index] != -1:
+        y, x = divmod(index, width)
+        path.append((x, y))
+        index = parent[index]
+    path.reverse()
+    return path
+
+
+def to_directions(start, path):
+    """座標のリストを 'up'/'down'/'left'/'right' のリストに変換"""
+    directions = []
+    x, y = start
+    for nx, ny in path:
+        directions.append(DIRECTION_NAMES[(nx - x, ny - y)])
+        x, y = nx, ny
+    return directions
+
+
+def danger_costs(enemies, radius=3, weight=5):
+    """敵の周囲のマスの危険度コストを辞書で返す
+
+    敵とのマンハッタン距離を d とすると max(0, radius - d) * weight。
+    コストが0になるマスは含まないので、辞書の大きさは敵の数に比例する。
+    enemies は (x, y) のリスト。
+    """
+    costs = {}
+    reach = radius - 1
+    for ex, ey in enemies:
+        for dy in range(-reach, reach + 1):
+            span = reach - abs(dy)
+            for dx in range(-span, span + 1):
+                value = (radius - abs(dx) - abs(dy)) * weight
+                cell = (ex + dx, ey + dy)
+                if value > costs.get(cell, 0):
+                    costs[cell] = value
+    return costs
+
+
+def enemy_danger_cost(enemies, radius=3, weight=5):
+    """敵の近くほど高くなるコスト関数を作る（find_path の cost 用）"""
+    costs = danger_costs(enemies, radius, weight)
+    if not costs:
+        return None
+
+    def cost(x, y):
+        return costs.get((x, y), 0)
+
+    return cost
+
+
+class IncrementalPlanner:
+    """D* Lite による差分再探索
+
+    ゴールからの探索木を保持したまま、プレイヤーの移動（move_to）と
+    マスのコスト変化（update_costs）を反映する。再探索で処理するのは
+    コストが変わったマスの周辺だけなので、迷路の大きさではなく
+    敵の動きの量に比例した時間で経路を更新できる。
+    """
+
+    def __init__(self, maze, start, goal, costs=None):
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0])
+        self.start = tuple(start)
+        self.goal = tuple(goal)
+        self.costs = dict(costs) if costs else {}
+
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.km = 0
+        self.last = self.start
+        # ヒープは遅延削除。queued に現在有効なキーを持つ
+        self.queue = []
+        self.queued = {}
+        self._push(self.goal)
+        self._compute()
+
+    def _key(self, cell):
+        m = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (m + manhattan(self.start, cell) + self.km, m)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _top(self):
+        """古いエントリを捨てて先頭を返す"""
+        while self.queue:
+            key, cell = self.queue[0]
+            if self.queued.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.queue)
+        return (INF, INF), None
+
+    def _neighbors(self, cell):
+        x, y = cell
+        for dx, dy, _ in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.maze[ny][nx] == 0:
+                yield (nx, ny)
+
+    def _step_cost(self, cell):
+        """cell に入るコスト"""
+        return 1 + self.costs.get(cell, 0)
+
+    def _update_vertex(self, cell):
+        if cell != self.goal:
+            self.rhs[cell] = min(
+                (self._step_cost(n) + self.g.get(n, INF) for n in self._neighbors(cell)),
+                default=INF
+            )
+        self.queued.pop(cell, None)
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            self._push(cell)
+
+    def _compute(self):
+        while True:
+            top_key, cell = self._top()
+            if cell is None:
+                break
+            start_g = self.g.get(self.start, INF)
+            start_rhs = self.rhs.get(self.start, INF)
+            if top_key >= self._key(self.start) and start_g == start_rhs:
+                break
+
+            heapq.heappop(self.queue)
+            new_key = self._key(cell)
+            if top_key < new_key:
+                self._push(cell)
+                continue
+
+            del self.queued[cell]
+            if self.g.get(cell, INF) > self.rhs.get(cell, INF):
+                self.g[cell] = self.rhs[cell]
+                for n in self._neighbors(cell):
+                    self._update_vertex(n)
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                for n in self._neighbors(cell):
+                    self._update_vertex(n)
+
+    def move_to(self, position):
+        """プレイヤーの現在位置を更新"""
+        position = tuple(position)
+        self.km += manhattan(self.last, position)
+        self.last = position
+        self.start = position
+
+    def update_costs(self, costs):
+        """マスのコストを置き換えて差分だけ再探索
+
+        戻り値はコストが変化したマスの数。
+        """
+        changed = [
+            cell for cell in set(self.costs) | set(costs)
+            if self.costs.get(cell, 0) != costs.get(cell, 0)
+        ]
+        self.costs = dict(costs)
+
+        for cell in changed:
+            # cell に入る辺のコストが変わるので、隣接マスを更新
+            for n in self._neighbors(cell):
+                self._update_vertex(n)
+        self._compute()
+        return len(changed)
+
+    def path(self):
+        """現在位置からゴールまでの経路（start を含まない）。到達不能なら None"""
+        self._compute()
+        if self.g.get(self.start, INF) == INF and self.start != self.goal:
+            return None
+
+        path = []
+        current = self.start
+        # 探索木は無閉路だが、念のためマス数で打ち切る
+        for _ in range(self.width * self.height):
+            if current == self.goal:
+                return path
+            current = min(
+                self._neighbors(current),
+                key=lambda n: self._step_cost(n) + self.g.get(n, INF)
+            )
+            path.append(current)
+        return None
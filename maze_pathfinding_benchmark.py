@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+経路探索エンジンのベンチマーク
+
+20x20 から 1000x1000 までの迷路で maze_pathfinding.find_path を計測する。
+小さい迷路では旧実装（sort + pop(0) と経路コピーのA*）とも比較する。
+
+使い方:
+    python maze_pathfinding_benchmark.py
+    python maze_pathfinding_benchmark.py --sizes 20 100 500 --repeat 5
+"""
+
+import argparse
+import random
+import time
+
+from maze_pathfinding import find_path, enemy_danger_cost
+
+DEFAULT_SIZES = [20, 50, 100, 200, 500, 1000]
+
+# 旧実装はこのサイズまでしか計測しない（それ以上は遅すぎる）
+LEGACY_MAX_SIZE = 100
+
+
+def generate_maze(size, seed=0):
+    """穴掘り法で size x size の迷路を生成（0 = 通路, 1 = 壁）"""
+    rng = random.Random(seed)
+    maze = [[1] * size for _ in range(size)]
+    maze[1][1] = 0
+    stack = [(1, 1)]
+
+    while stack:
+        x, y = stack[-1]
+        neighbors = []
+        for dx, dy in [(0, -2), (2, 0), (0, 2), (-2, 0)]:
+            nx, ny = x + dx, y + dy
+            if 0 < nx < size - 1 and 0 < ny < size - 1 and maze[ny][nx] == 1:
+                neighbors.append((nx, ny, dx, dy))
+
+        if neighbors:
+            nx, ny, dx, dy = rng.choice(neighbors)
+            maze[ny][nx] = 0
+            maze[y + dy // 2][x + dx // 2] = 0
+            stack.append((nx, ny))
+        else:
+            stack.pop()
+
+    # ゲームと同じくゴール周辺を開ける
+    goal = (size - 2, size - 2)
+    maze[goal[1]][goal[0]] = 0
+    maze[goal[1] - 1][goal[0]] = 0
+    maze[goal[1]][goal[0] - 1] = 0
+    return maze, (1, 1), goal
+
+
+def random_enemies(maze, count, seed=0):
+    """通路上にランダムに敵を配置"""
+    rng = random.Random(seed)
+    open_cells = [(x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell == 0]
+    return rng.sample(open_cells, min(count, len(open_cells)))
+
+
+def legacy_find_safe_path(maze, start, goal, enemies):
+    """旧 MazeSolverWithEnemies.find_safe_path（比較用）"""
+    def heuristic(pos):
+        return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
+
+    def enemy_danger(pos):
+        if not enemies:
+            return 0
+        min_dist = min(abs(pos[0] - ex) + abs(pos[1] - ey) for ex, ey in enemies)
+        return max(0, 3 - min_dist) * 5
+
+    open_set = [(0, start, [])]
+    visited = set()
+
+    while open_set:
+        open_set.sort(key=lambda x: x[0])
+        _, current, path = open_set.pop(0)
+
+        if current == goal:
+            return path
+        if current in visited:
+            continue
+        visited.add(current)
+
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            nx, ny = current[0] + dx, current[1] + dy
+            if (0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and
+                    maze[ny][nx] == 0 and (nx, ny) not in visited):
+                new_path = path + [(nx, ny)]
+                f_score = len(new_path) + heuristic((nx, ny)) + enemy_danger((nx, ny))
+                open_set.append((f_score, (nx, ny), new_path))
+
+    return None
+
+
+def measure(func, repeat):
+    """最良時間（秒）と最後の戻り値を返す"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start_time)
+    return best, result
+
+
+def run(sizes, repeat, enemy_count):
+    print(f"{'size':>6} {'path':>8} {'plain':>10} {'danger':>10} {'legacy':>10}")
+    for size in sizes:
+        maze, start, goal = generate_maze(size, seed=size)
+        enemies = random_enemies(maze, enemy_count, seed=size)
+        cost = enemy_danger_cost(enemies)
+
+        plain_time, path = measure(lambda: find_path(maze, start, goal), repeat)
+        danger_time, _ = measure(lambda: find_path(maze, start, goal, cost), repeat)
+
+        legacy = "-"
+        if size <= LEGACY_MAX_SIZE:
+            legacy_time, _ = measure(lambda: legacy_find_safe_path(maze, start, goal, enemies), repeat)
+            legacy = f"{legacy_time * 1000:.2f}ms"
+
+        length = len(path) if path is not None else -1
+        print(f"{size:>6} {length:>8} {plain_time * 1000:>8.2f}ms {danger_time * 1000:>8.2f}ms {legacy:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="経路探索エンジンのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--enemies", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat, args.enemies)
+
+
+if __name__ == "__main__":
+    main()
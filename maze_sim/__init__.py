@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+迷路ゲームのヘッドレス・シミュレーター
+
+各HTMLゲームのルール（迷路生成・敵の移動・押しのけとスタン・鍵とドア・
+階層）をPythonで再現する。乱数はシードから決まり、時間は frame() /
+advance() で進める仮想時計なので、同じシードと操作列なら必ず同じ結果になる。
+get_game_state() は各ソルバーの get_game_state と同じ形の辞書を返すため、
+ブラウザなしでソルバーの経路探索を試せる。
+
+    game = make_game('enemies', seed=1)
+    state = game.get_game_state()
+    game.move('right')
+    game.advance(150)
+    alert = game.pop_alert()
+"""
+
+from .base import MazeGame, MAZE_WIDTH, MAZE_HEIGHT, FRAME_MS
+from .simple import SimpleMazeGame
+from .enemies import EnemyMazeGame
+from .improved import ImprovedEnemyMazeGame
+from .keys import KeyMazeGame
+from .multilevel import MultiLevelMazeGame
+
+# ゲーム名と対応するHTMLファイル
+GAMES = {
+    'simple': SimpleMazeGame,            # simple-maze-game.html
+    'enemies': EnemyMazeGame,            # maze-game-with-enemies.html
+    'improved': ImprovedEnemyMazeGame,   # maze-game-improved-enemies.html
+    'keys': KeyMazeGame,                 # maze-game-with-keys.html
+    'multilevel': MultiLevelMazeGame     # maze-game-multilevel.html
+}
+
+
+def make_game(name, seed=None):
+    """名前からシミュレーターを作成"""
+    if name not in GAMES:
+        raise ValueError(f"不明なゲーム: {name}（{', '.join(GAMES)}）")
+    return GAMES[name](seed)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+シミュレーター上でソルバーを走らせるベンチマーク
+
+    python -m maze_sim --game enemies --stages 100 --seed 1
+
+共通の経路探索エンジン（maze_pathfinding）で敵を避けながらゴールを目指し、
+1秒あたりに処理できたステージ数を表示する。1手ごとに仮想時計を
+--step-ms ミリ秒進めるので、敵はブラウザと同じ速さで動く。
+"""
+
+import argparse
+import time
+
+from maze_pathfinding import DIRECTION_NAMES, find_path, enemy_danger_cost, to_directions
+from maze_sim import GAMES, make_game
+
+
+def blocked_maze(state, block_up=True):
+    """鍵を持っていない閉じたドア（と上り階段）を壁として扱った迷路"""
+    held = state['player'].get('keys', [])
+    walls = [(d['x'], d['y']) for d in state.get('doors', [])
+             if not d['isOpen'] and d['color'] not in held]
+    stairs = state.get('stairs')
+    if block_up and stairs and stairs['up']:
+        walls.append((stairs['up']['x'], stairs['up']['y']))
+    if not walls:
+        return state['maze']
+    maze = [row[:] for row in state['maze']]
+    for x, y in walls:
+        maze[y][x] = 1
+    return maze
+
+
+def targets(state):
+    """目指すマスの候補（ゴール、なければ下り階段。次に未取得の鍵）"""
+    if state.get('goal'):
+        yield (state['goal']['x'], state['goal']['y'])
+    stairs = state.get('stairs')
+    if stairs and stairs['down']:
+        yield (stairs['down']['x'], stairs['down']['y'])
+    for key in state.get('keys', []):
+        if not key['collected']:
+            yield (key['x'], key['y'])
+
+
+def step_off_and_back(maze, start):
+    """隣の通路に降りてから start に戻る2手"""
+    x, y = start
+    for (dx, dy), name in DIRECTION_NAMES.items():
+        if maze[y + dy][x + dx] == 0:
+            return [name, DIRECTION_NAMES[(-dx, -dy)]]
+    return []
+
+
+def plan(state):
+    """次に進む方向のリスト（見つからなければ空）
+
+    上り階段は避けるが、そこを通らないと進めない階では上の階を経由する。
+    立っているマスの階段や鍵（上った先の下り階段、スタート地点の鍵）は
+    乗り直さないと使えないので、一度降りてから戻る。
+    """
+    start = (state['player']['x'], state['player']['y'])
+    cost = enemy_danger_cost([(e['x'], e['y']) for e in state.get('enemies', [])])
+    for block_up in (True, False):
+        maze = blocked_maze(state, block_up)
+        for target in targets(state):
+            if target == start:
+                directions = step_off_and_back(maze, start)
+            else:
+                directions = to_directions(start, find_path(maze, start, target, cost) or [])
+            if directions:
+                return directions
+    return []
+
+
+def play(game, stages, step_ms, replan_every, max_moves):
+    """stages 回クリアするまでプレイして (クリア数, ゲームオーバー数, 手数, 詰み) を返す
+
+    敵は経路探索で壁として扱わず、シミュレーターはクリアできる迷路しか
+    作らないので、経路がなくなることはないはず。なくなったら詰みとして打ち切る。
+    """
+    cleared = 0
+    game_overs = 0
+    moves = 0
+
+    while cleared < stages and moves < max_moves:
+        directions = plan(game.get_game_state())
+        if not directions:
+            return cleared, game_overs, moves, True
+
+        for direction in directions[:replan_every]:
+            game.move(direction)
+            game.advance(step_ms)
+            moves += 1
+
+            alert = game.pop_alert()
+            if alert is None:
+                continue
+            if 'クリア' in alert:
+                cleared += 1
+            elif 'ゲームオーバー' in alert:
+                game_overs += 1
+            break
+
+    return cleared, game_overs, moves, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="迷路シミュレーターのベンチマーク")
+    parser.add_argument("--game", choices=list(GAMES), default="enemies")
+    parser.add_argument("--stages", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--step-ms", type=float, default=150)
+    parser.add_argument("--replan-every", type=int, default=3)
+    parser.add_argument("--max-moves", type=int, default=200000)
+    args = parser.parse_args()
+
+    game = make_game(args.game, args.seed)
+    start = time.perf_counter()
+    cleared, game_overs, moves, stuck = play(game, args.stages, args.step_ms,
+                                      args.replan_every, args.max_moves)
+    elapsed = time.perf_counter() - start
+
+    print(f"ゲーム: {args.game} (seed={args.seed})")
+    print(f"クリア: {cleared}ステージ, ゲームオーバー: {game_overs}回, 手数: {moves}")
+    if stuck:
+        print(f"ステージ{game.stage}でゴールへの経路がなくなったため終了")
+    print(f"実時間: {elapsed:.2f}秒, 仮想時間: {game.now / 1000:.1f}秒")
+    if elapsed > 0:
+        print(f"速度: {cleared / elapsed:.1f}ステージ/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+迷路ゲームのシミュレーター共通部分
+
+ブラウザの Date.now() / Math.random() / alert() / requestAnimationFrame を
+仮想時計・シード付き乱数・アラート記録・frame() に置き換えている。
+"""
+
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+
+MAZE_WIDTH = 20
+MAZE_HEIGHT = 20
+
+# requestAnimationFrame 1回あたりの時間（60fps）
+FRAME_MS = 1000 / 60
+
+# keydown の e.key と移動方向の対応
+MOVE_KEYS = {
+    'ArrowUp': (0, -1), 'w': (0, -1), 'W': (0, -1),
+    'ArrowDown': (0, 1), 's': (0, 1), 'S': (0, 1),
+    'ArrowLeft': (-1, 0), 'a': (-1, 0), 'A': (-1, 0),
+    'ArrowRight': (1, 0), 'd': (1, 0), 'D': (1, 0)
+}
+
+DIRECTION_KEYS = {
+    'up': 'ArrowUp',
+    'down': 'ArrowDown',
+    'left': 'ArrowLeft',
+    'right': 'ArrowRight'
+}
+
+
+def sign(value):
+    """Math.sign"""
+    return (value > 0) - (value < 0)
+
+
+class MazeGame(ABC):
+    """迷路ゲームの基底クラス
+
+    サブクラスは generate / on_key / get_game_state を実装する
+    （ゲームループを持つものは update も）。
+    """
+
+    # ゲームループ（敵の更新と衝突判定）を持つか
+    has_game_loop = False
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.frame_count = 0
+        self.alerts = []
+        self.maze = []
+        self.player = {'x': 1, 'y': 1}
+        self.goal = {'x': 18, 'y': 18}
+        self.steps = 0
+        self.stage = 1
+        # 押下中のキー（改良版の game.keys）
+        self.pressed = {}
+
+    # --- ブラウザAPIの置き換え ---
+
+    def random(self):
+        """Math.random()"""
+        return self.rng.random()
+
+    def alert(self, message):
+        """alert() - ブロックせずに記録だけする"""
+        self.alerts.append(message)
+
+    def pop_alert(self):
+        """最も古い未処理のアラートを取り出す（なければ None）"""
+        return self.alerts.pop(0) if self.alerts else None
+
+    # --- 迷路生成 ---
+
+    def carve_maze(self, extra_openings=0):
+        """穴掘り法で迷路を生成（generateMaze の共通部分）"""
+        maze = [[1] * MAZE_WIDTH for _ in range(MAZE_HEIGHT)]
+        maze[1][1] = 0
+        stack = [(1, 1)]
+
+        while stack:
+            cx, cy = stack[-1]
+            directions = [(2, 0), (-2, 0), (0, 2), (0, -2)]
+
+            # ランダムに並び替え（JSと同じ Fisher-Yates）
+            for i in range(len(directions) - 1, 0, -1):
+                j = int(self.random() * (i + 1))
+                directions[i], directions[j] = directions[j], directions[i]
+
+            found = False
+            for dx, dy in directions:
+                nx, ny = cx + dx, cy + dy
+                if 0 < nx < MAZE_WIDTH - 1 and 0 < ny < MAZE_HEIGHT - 1 and maze[ny][nx] == 1:
+                    maze[ny][nx] = 0
+                    maze[cy + dy // 2][cx + dx // 2] = 0
+                    stack.append((nx, ny))
+                    found = True
+                    break
+
+            if not found:
+                stack.pop()
+
+        return maze
+
+    def open_goal(self, maze):
+        """ゴールまでの道を確保"""
+        maze[18][18] = 0
+        maze[17][18] = 0
+        maze[18][17] = 0
+
+    def add_openings(self, maze, count):
+        """追加の通路を作成（複数ルート確保）"""
+        for _ in range(count):
+            x = int(self.random() * (MAZE_WIDTH - 2)) + 1
+            y = int(self.random() * (MAZE_HEIGHT - 2)) + 1
+            maze[y][x] = 0
+
+    def random_cell(self):
+        """Math.floor(Math.random() * MAZE_WIDTH/HEIGHT) の組"""
+        x = int(self.random() * MAZE_WIDTH)
+        y = int(self.random() * MAZE_HEIGHT)
+        return x, y
+
+    def is_open(self, x, y, maze=None):
+        maze = self.maze if maze is None else maze
+        return 0 <= x < MAZE_WIDTH and 0 <= y < MAZE_HEIGHT and maze[y][x] == 0
+
+    def reachable(self, start, maze=None, walls=()):
+        """start から歩いて行けるマスの集合（walls のマスは壁として扱う）"""
+        maze = self.maze if maze is None else maze
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                cell = (x + dx, y + dy)
+                if cell not in seen and cell not in walls and self.is_open(*cell, maze):
+                    seen.add(cell)
+                    queue.append(cell)
+        return seen
+
+    # --- 操作 ---
+
+    def press(self, key):
+        """keydown イベント"""
+        self.on_key(key)
+
+    def release(self, key):
+        """keyup イベント"""
+        self.pressed[key] = False
+
+    def move(self, direction):
+        """'up'/'down'/'left'/'right' で1マス移動"""
+        self.press(DIRECTION_KEYS[direction])
+
+    def frame(self):
+        """requestAnimationFrame 1回分の時間を進めてゲームループを実行"""
+        self.now += FRAME_MS
+        self.frame_count += 1
+        if self.has_game_loop:
+            self.update()
+
+    def advance(self, ms):
+        """ms ミリ秒分のフレームを進める"""
+        target = self.now + ms
+        while self.now + FRAME_MS <= target:
+            self.frame()
+
+    # --- サブクラスで実装 ---
+
+    @abstractmethod
+    def generate(self):
+        """迷路（と敵・アイテム）を作り直す"""
+
+    @abstractmethod
+    def on_key(self, key):
+        """keydown のハンドラー"""
+
+    def update(self):
+        pass
+
+    @abstractmethod
+    def get_game_state(self):
+        """ソルバーの get_game_state と同じ形の辞書"""
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+maze-game-with-enemies.html のシミュレーター
+"""
+
+from .base import MazeGame, MOVE_KEYS, sign
+
+
+class Enemy:
+    """ランダム型／追跡型の敵"""
+
+    def __init__(self, game, x, y, type='random'):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.type = type
+        self.move_interval = 500 if type == 'random' else 300
+        self.last_move = game.now
+
+    def update(self):
+        game = self.game
+        if game.now - self.last_move < self.move_interval:
+            return
+        self.last_move = game.now
+
+        if self.type == 'random':
+            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+            dx, dy = directions[int(game.random() * len(directions))]
+            self.try_move(dx, dy)
+        else:
+            # プレイヤーを追跡
+            dx = sign(game.player['x'] - self.x)
+            dy = sign(game.player['y'] - self.y)
+
+            if game.random() < 0.5 and dx != 0:
+                if not self.try_move(dx, 0):
+                    self.try_move(0, dy)
+            elif dy != 0:
+                if not self.try_move(0, dy):
+                    self.try_move(dx, 0)
+            else:
+                self.try_move(dx, 0)
+
+    def try_move(self, dx, dy):
+        new_x = self.x + dx
+        new_y = self.y + dy
+        if self.game.is_open(new_x, new_y):
+            collision = any(e is not self and e.x == new_x and e.y == new_y
+                            for e in self.game.enemies)
+            if not collision:
+                self.x = new_x
+                self.y = new_y
+                return True
+        return False
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'type': self.type}
+
+
+class EnemyMazeGame(MazeGame):
+    """敵キャラクター版の迷路"""
+
+    has_game_loop = True
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.enemies = []
+        self.health = 3
+        self.game_over = False
+        self.generate()
+
+    def generate(self):
+        maze = self.carve_maze()
+        self.open_goal(maze)
+        self.maze = maze
+        self.place_enemies()
+
+    def place_enemies(self):
+        self.enemies = []
+        enemy_count = 2 + self.stage // 2
+
+        for i in range(enemy_count):
+            placed = False
+            attempts = 0
+            while not placed and attempts < 100:
+                x, y = self.random_cell()
+                if (self.maze[y][x] == 0 and
+                        not (x == self.player['x'] and y == self.player['y']) and
+                        not (x == self.goal['x'] and y == self.goal['y']) and
+                        (abs(x - self.player['x']) > 3 or abs(y - self.player['y']) > 3)):
+                    # ステージ3以降は追跡型も登場
+                    type = 'chaser' if self.stage >= 3 and i % 2 == 1 else 'random'
+                    self.enemies.append(Enemy(self, x, y, type))
+                    placed = True
+                attempts += 1
+
+    def on_key(self, key):
+        self.pressed[key] = True
+        if key in MOVE_KEYS:
+            self.move_player(*MOVE_KEYS[key])
+
+    def move_player(self, dx, dy):
+        if self.game_over:
+            return
+
+        new_x = self.player['x'] + dx
+        new_y = self.player['y'] + dy
+
+        if self.is_open(new_x, new_y):
+            self.player['x'] = new_x
+            self.player['y'] = new_y
+            self.steps += 1
+
+            if self.player['x'] == self.goal['x'] and self.player['y'] == self.goal['y']:
+                self.alert(f"クリア！ ステップ数: {self.steps}")
+                self.next_stage()
+
+    def next_stage(self):
+        self.stage += 1
+        self.steps = 0
+        self.player = {'x': 1, 'y': 1}
+        self.health = min(self.health + 1, 5)
+        self.generate()
+
+    def check_collisions(self):
+        for enemy in self.enemies:
+            if enemy.x == self.player['x'] and enemy.y == self.player['y']:
+                self.health -= 1
+                if self.health <= 0:
+                    self.game_over = True
+                    self.alert(f"ゲームオーバー！ ステージ{self.stage}で力尽きました...")
+                    self.reset_game()
+                else:
+                    # プレイヤーを初期位置に戻す
+                    self.player = {'x': 1, 'y': 1}
+                break
+
+    def reset_game(self):
+        self.stage = 1
+        self.steps = 0
+        self.health = 3
+        self.player = {'x': 1, 'y': 1}
+        self.game_over = False
+        self.generate()
+
+    def update(self):
+        for enemy in self.enemies:
+            enemy.update()
+        self.check_collisions()
+
+    def get_game_state(self):
+        """MazeSolverWithEnemies.get_game_state と同じ形の状態"""
+        return {
+            'player': dict(self.player),
+            'goal': dict(self.goal),
+            'enemies': [e.to_dict() for e in self.enemies],
+            'maze': self.maze,
+            'stage': self.stage,
+            'steps': self.steps,
+            'health': self.health,
+            'gameOver': self.game_over
+        }
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+maze-game-improved-enemies.html のシミュレーター
+
+pushCooldown / powerUpTime / stunTime はJSと同じく時刻（仮想時計のミリ秒）。
+"""
+
+from .base import MazeGame, MOVE_KEYS, MAZE_WIDTH, MAZE_HEIGHT, sign
+
+MOVE_INTERVALS = {'patrol': 600, 'chaser': 400, 'guardian': 800}
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+class Enemy:
+    """パトロール型／追跡型／守護型の敵"""
+
+    def __init__(self, game, x, y, type='patrol'):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.type = type
+        self.move_interval = MOVE_INTERVALS.get(type, 500)
+        self.last_move = game.now
+        self.stun_time = 0
+
+    def update(self):
+        game = self.game
+        # スタン中は動かない
+        if self.stun_time > game.now:
+            return
+        if game.now - self.last_move < self.move_interval:
+            return
+        self.last_move = game.now
+
+        # 狭い通路にいる場合は移動を優先
+        if self.is_on_critical_path():
+            self.move_away_from_critical_path()
+            return
+
+        if self.type == 'patrol':
+            self.patrol_move()
+        elif self.type == 'chaser':
+            self.chase_move()
+        elif self.type == 'guardian':
+            self.guard_move()
+
+    def is_on_critical_path(self):
+        wall_count = sum(1 for dx, dy in DIRECTIONS
+                         if not self.game.is_open(self.x + dx, self.y + dy))
+        return wall_count >= 2
+
+    def move_away_from_critical_path(self):
+        best_dir = None
+        best_space = -1
+        for dx, dy in DIRECTIONS:
+            nx, ny = self.x + dx, self.y + dy
+            if self.can_move_to(nx, ny):
+                space = self.game.evaluate_space_at(nx, ny)
+                if space > best_space:
+                    best_space = space
+                    best_dir = (dx, dy)
+        if best_dir:
+            self.try_move(*best_dir)
+
+    def patrol_move(self):
+        valid_dirs = [(dx, dy) for dx, dy in DIRECTIONS
+                      if self.can_move_to(self.x + dx, self.y + dy)]
+        if valid_dirs:
+            dx, dy = valid_dirs[int(self.game.random() * len(valid_dirs))]
+            self.try_move(dx, dy)
+
+    def chase_move(self):
+        game = self.game
+        dx = sign(game.player['x'] - self.x)
+        dy = sign(game.player['y'] - self.y)
+        dist = abs(game.player['x'] - self.x) + abs(game.player['y'] - self.y)
+
+        # 近すぎる場合は少し離れる
+        if dist < 3 and game.power_up_time <= game.now:
+            if self.try_move(-dx, -dy):
+                return
+
+        if game.random() < 0.7 and dx != 0:
+            if not self.try_move(dx, 0):
+                self.try_move(0, dy)
+        elif dy != 0:
+            if not self.try_move(0, dy):
+                self.try_move(dx, 0)
+
+    def guard_move(self):
+        game = self.game
+        goal_dist = abs(self.x - game.goal['x']) + abs(self.y - game.goal['y'])
+        if goal_dist > 5:
+            self.try_move(sign(game.goal['x'] - self.x), sign(game.goal['y'] - self.y))
+        else:
+            self.patrol_move()
+
+    def can_move_to(self, x, y):
+        if not self.game.is_open(x, y):
+            return False
+        return not any(e is not self and e.x == x and e.y == y for e in self.game.enemies)
+
+    def try_move(self, dx, dy):
+        if self.can_move_to(self.x + dx, self.y + dy):
+            self.x += dx
+            self.y += dy
+            return True
+        return False
+
+    def push(self, dx, dy):
+        """押しのけられる（1秒スタン）"""
+        self.stun_time = self.game.now + 1000
+        if self.can_move_to(self.x + dx * 2, self.y + dy * 2):
+            self.x += dx * 2
+            self.y += dy * 2
+        elif self.can_move_to(self.x + dx, self.y + dy):
+            self.x += dx
+            self.y += dy
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'type': self.type, 'stunTime': self.stun_time}
+
+
+class ImprovedEnemyMazeGame(MazeGame):
+    """改良版敵システムの迷路（スペースで敵を押しのける）"""
+
+    has_game_loop = True
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.enemies = []
+        self.health = 3
+        self.game_over = False
+        self.push_cooldown = 0
+        self.power_up_time = 0
+        self.generate()
+
+    def generate(self):
+        maze = self.carve_maze()
+        self.open_goal(maze)
+        self.add_openings(maze, 5 + self.stage)
+        self.maze = maze
+        self.place_enemies()
+
+    def evaluate_space_at(self, x, y):
+        space = 0
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if self.is_open(x + dx, y + dy):
+                    space += 1
+        return space
+
+    def place_enemies(self):
+        self.enemies = []
+        stage_bonus = (self.stage - 1) // 2
+        enemy_count = min(2 + stage_bonus, 6)
+
+        # 広い場所を優先して配置
+        open_spaces = []
+        for y in range(2, MAZE_HEIGHT - 2):
+            for x in range(2, MAZE_WIDTH - 2):
+                if self.maze[y][x] == 0:
+                    space = self.evaluate_space_at(x, y)
+                    if space >= 5:
+                        open_spaces.append((x, y, space))
+
+        # JSの sort は安定ソートなので同じ広さの順序は保たれる
+        open_spaces.sort(key=lambda s: -s[2])
+
+        for i in range(min(enemy_count, len(open_spaces))):
+            x, y, _ = open_spaces[i]
+            player_dist = abs(x - self.player['x']) + abs(y - self.player['y'])
+            goal_dist = abs(x - self.goal['x']) + abs(y - self.goal['y'])
+
+            if player_dist > 4 and goal_dist > 3:
+                if i == 0 and self.stage >= 3:
+                    type = 'guardian'
+                elif i % 2 == 1 and self.stage >= 2:
+                    type = 'chaser'
+                else:
+                    type = 'patrol'
+                self.enemies.append(Enemy(self, x, y, type))
+
+    def on_key(self, key):
+        self.pressed[key] = True
+        if key in MOVE_KEYS:
+            self.move_player(*MOVE_KEYS[key])
+        elif key == ' ':
+            self.push_enemies()
+
+    def move_player(self, dx, dy):
+        if self.game_over:
+            return
+
+        new_x = self.player['x'] + dx
+        new_y = self.player['y'] + dy
+
+        if self.is_open(new_x, new_y):
+            self.player['x'] = new_x
+            self.player['y'] = new_y
+            self.steps += 1
+
+            if self.player['x'] == self.goal['x'] and self.player['y'] == self.goal['y']:
+                self.alert(f"クリア！ ステップ数: {self.steps}")
+                self.next_stage()
+
+    def push_enemies(self):
+        if self.push_cooldown > self.now:
+            return
+        self.push_cooldown = self.now + 3000
+
+        for enemy in self.enemies:
+            dx = enemy.x - self.player['x']
+            dy = enemy.y - self.player['y']
+            if abs(dx) + abs(dy) <= 2:
+                enemy.push(sign(dx), sign(dy))
+
+        self.power_up_time = self.now + 500
+
+    def next_stage(self):
+        self.stage += 1
+        self.steps = 0
+        self.player = {'x': 1, 'y': 1}
+        self.health = min(self.health + 1, 5)
+        self.push_cooldown = 0
+        self.generate()
+
+    def check_collisions(self):
+        if self.power_up_time > self.now:
+            return  # パワーアップ中は無敵
+
+        for enemy in self.enemies:
+            if enemy.stun_time > self.now:
+                continue
+            if enemy.x == self.player['x'] and enemy.y == self.player['y']:
+                self.health -= 1
+                if self.health <= 0:
+                    self.game_over = True
+                    self.alert(f"ゲームオーバー！ ステージ{self.stage}で力尽きました...")
+                    self.reset_game()
+                else:
+                    self.player = {'x': 1, 'y': 1}
+                    self.power_up_time = self.now + 2000
+                break
+
+    def reset_game(self):
+        self.stage = 1
+        self.steps = 0
+        self.health = 3
+        self.player = {'x': 1, 'y': 1}
+        self.game_over = False
+        self.push_cooldown = 0
+        self.power_up_time = 0
+        self.generate()
+
+    def update(self):
+        for enemy in self.enemies:
+            enemy.update()
+        self.check_collisions()
+
+    def get_game_state(self):
+        """ImprovedMazeSolver.get_game_state と同じ形の状態"""
+        return {
+            'player': dict(self.player),
+            'goal': dict(self.goal),
+            'enemies': [e.to_dict() for e in self.enemies],
+            'maze': self.maze,
+            'stage': self.stage,
+            'steps': self.steps,
+            'health': self.health,
+            'gameOver': self.game_over,
+            'pushCooldown': self.push_cooldown,
+            'powerUpTime': self.power_up_time
+        }
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+maze-game-with-keys.html のシミュレーター
+
+JSでは鍵が自分のドアの奥に置かれてクリアできない迷路もできるが、
+ここではクリアできる配置になるまで迷路を作り直す
+（クリアできる迷路では乱数の使い方も配置もJSと同じ）。
+"""
+
+from .base import MazeGame, MOVE_KEYS, sign
+
+ENEMY_HEALTH = {'basic': 1, 'strong': 2, 'boss': 3}
+ENEMY_INTERVALS = {'basic': 800, 'strong': 600, 'boss': 1000}
+ENEMY_VALUES = {'basic': 10, 'strong': 20, 'boss': 50}
+
+DOOR_COLORS = ['red', 'blue', 'yellow']
+ITEM_TYPES = ['heart', 'power', 'ammo']
+
+FACING = {(1, 0): 'right', (-1, 0): 'left', (0, 1): 'down', (0, -1): 'up'}
+FACING_OFFSETS = {name: offset for offset, name in FACING.items()}
+
+
+def new_player():
+    """初期状態のプレイヤー"""
+    return {
+        'x': 1,
+        'y': 1,
+        'direction': 'right',
+        'keys': [],
+        'attackPower': 1,
+        'attacksRemaining': 5,
+        'specialAttackUsed': False
+    }
+
+
+class Door:
+    """色付きのドア（同じ色の鍵で開く）"""
+
+    def __init__(self, game, x, y, color):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.color = color
+        self.is_open = False
+
+    def try_open(self, player_keys):
+        if self.is_open:
+            return True
+        if self.color in player_keys:
+            self.is_open = True
+            player_keys.remove(self.color)
+            self.game.score += 25
+            return True
+        return False
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'color': self.color, 'isOpen': self.is_open}
+
+
+class Key:
+    """ドアの鍵"""
+
+    def __init__(self, game, x, y, color):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.color = color
+        self.collected = False
+
+    def collect(self):
+        if not self.collected:
+            self.collected = True
+            self.game.player['keys'].append(self.color)
+            self.game.score += 15
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'color': self.color, 'collected': self.collected}
+
+
+class Item:
+    """ハート（ライフ+2）／パワー（攻撃力+1）／弾薬（攻撃回数+5）"""
+
+    def __init__(self, game, x, y, type):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.type = type
+        self.collected = False
+
+    def collect(self):
+        if self.collected:
+            return
+        self.collected = True
+        game = self.game
+        if self.type == 'heart':
+            game.health = min(game.health + 2, 10)
+        elif self.type == 'power':
+            game.player['attackPower'] += 1
+        elif self.type == 'ammo':
+            game.player['attacksRemaining'] += 5
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'type': self.type, 'collected': self.collected}
+
+
+class Enemy:
+    """体力を持つ追跡型の敵（basic / strong / boss）"""
+
+    def __init__(self, game, x, y, type='basic'):
+        self.game = game
+        self.x = x
+        self.y = y
+        self.type = type
+        self.health = self.get_health_by_type()
+        self.max_health = self.health
+        self.move_interval = ENEMY_INTERVALS.get(type, 800)
+        self.last_move = game.now
+        self.value = self.get_value_by_type()
+
+    def get_health_by_type(self):
+        return ENEMY_HEALTH.get(self.type, 1)
+
+    def get_value_by_type(self):
+        return ENEMY_VALUES.get(self.type, 10)
+
+    def update(self):
+        game = self.game
+        if game.now - self.last_move < self.move_interval:
+            return
+        self.last_move = game.now
+
+        dx = sign(game.player['x'] - self.x)
+        dy = sign(game.player['y'] - self.y)
+
+        if game.random() < 0.5 and dx != 0:
+            if not self.try_move(dx, 0):
+                self.try_move(0, dy)
+        elif dy != 0:
+            if not self.try_move(0, dy):
+                self.try_move(dx, 0)
+        else:
+            self.try_move(dx, 0)
+
+    def blocked(self, x, y):
+        """閉じたドアは通れない"""
+        return any(d.x == x and d.y == y and not d.is_open for d in self.game.doors)
+
+    def try_move(self, dx, dy):
+        game = self.game
+        new_x = self.x + dx
+        new_y = self.y + dy
+        if not game.is_open(new_x, new_y) or self.blocked(new_x, new_y):
+            return False
+        if any(e is not self and e.x == new_x and e.y == new_y for e in game.enemies):
+            return False
+        self.x = new_x
+        self.y = new_y
+        return True
+
+    def take_damage(self, damage):
+        self.health -= damage
+        if self.health <= 0:
+            self.game.score += self.value
+            return True
+        return False
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'type': self.type,
+                'health': self.health, 'maxHealth': self.max_health}
+
+
+class KeyMazeGame(MazeGame):
+    """鍵とドアのある迷路（スペースで攻撃、Xで全体攻撃）"""
+
+    has_game_loop = True
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.player = new_player()
+        self.enemies = []
+        self.items = []
+        self.doors = []
+        self.keys = []
+        self.health = 5
+        self.score = 0
+        self.game_over = False
+        self.generate()
+
+    def generate(self):
+        start = (self.player['x'], self.player['y'])
+        goal = (self.goal['x'], self.goal['y'])
+        while True:
+            maze = self.carve_maze()
+            self.open_goal(maze)
+            self.add_openings(maze, 10)
+            self.maze = maze
+
+            self.place_doors_and_keys()
+            self.place_enemies()
+            self.place_items()
+            if self.can_finish(start, [goal]):
+                break
+
+    def can_finish(self, start, targets, maze=None, doors=None, keys=None):
+        """鍵を拾ってドアを開けながら start から targets のどれかに行けるか"""
+        doors = self.doors if doors is None else doors
+        keys = self.keys if keys is None else keys
+        held = set(self.player['keys'])
+        while True:
+            walls = {(d.x, d.y) for d in doors if not d.is_open and d.color not in held}
+            cells = self.reachable(start, maze, walls)
+            if any(target in cells for target in targets):
+                return True
+            found = {k.color for k in keys if not k.collected and (k.x, k.y) in cells}
+            if found <= held:
+                return False
+            held |= found
+
+    def place_doors_and_keys(self):
+        self.doors = []
+        self.keys = []
+        self.player['keys'] = []
+
+        door_count = min(1 + self.stage // 2, 3)
+
+        for i in range(door_count):
+            color = DOOR_COLORS[i]
+
+            # ドアを配置（通路の要所に）
+            door = None
+            for _ in range(100):
+                x = 5 + int(self.random() * 10)
+                y = 5 + int(self.random() * 10)
+                if self.maze[y][x] == 0:
+                    wall_count = sum(1 for dx, dy in FACING
+                                     if not self.is_open(x + dx, y + dy))
+                    if wall_count >= 2:
+                        door = Door(self, x, y, color)
+                        self.doors.append(door)
+                        break
+
+            # 対応する鍵をドアより手前に配置
+            for _ in range(100):
+                x, y = self.random_cell()
+                if self.maze[y][x] == 0 and not (x == self.player['x'] and y == self.player['y']):
+                    if door:
+                        player_dist = abs(x - self.player['x']) + abs(y - self.player['y'])
+                        door_dist = abs(door.x - self.player['x']) + abs(door.y - self.player['y'])
+                        if player_dist < door_dist:
+                            self.keys.append(Key(self, x, y, color))
+                            break
+
+    def is_door(self, x, y):
+        return any(d.x == x and d.y == y for d in self.doors)
+
+    def place_enemies(self):
+        self.enemies = []
+        enemy_count = 3 + self.stage // 2
+
+        for i in range(enemy_count):
+            for _ in range(100):
+                x, y = self.random_cell()
+                if (self.maze[y][x] == 0 and
+                        not (x == self.player['x'] and y == self.player['y']) and
+                        not (x == self.goal['x'] and y == self.goal['y']) and
+                        not self.is_door(x, y) and
+                        (abs(x - self.player['x']) > 3 or abs(y - self.player['y']) > 3)):
+                    type = 'basic'
+                    if self.stage >= 3 and i == 0:
+                        type = 'boss'
+                    elif self.stage >= 2 and i % 2 == 0:
+                        type = 'strong'
+                    self.enemies.append(Enemy(self, x, y, type))
+                    break
+
+    def place_items(self):
+        self.items = []
+        item_count = 2 + self.stage // 3
+
+        for _ in range(item_count):
+            for _ in range(100):
+                x, y = self.random_cell()
+                if (self.maze[y][x] == 0 and
+                        not (x == self.player['x'] and y == self.player['y']) and
+                        not (x == self.goal['x'] and y == self.goal['y']) and
+                        not self.is_door(x, y)):
+                    type = ITEM_TYPES[int(self.random() * len(ITEM_TYPES))]
+                    self.items.append(Item(self, x, y, type))
+                    break
+
+    def on_key(self, key):
+        self.pressed[key] = True
+        if key in MOVE_KEYS:
+            self.move_player(*MOVE_KEYS[key])
+        elif key == ' ':
+            self.attack()
+        elif key in ('x', 'X'):
+            self.special_attack()
+
+    def enter_cell(self, x, y):
+        """ドアの開閉判定。通れなければ False"""
+        door = next((d for d in self.doors if d.x == x and d.y == y), None)
+        if door and not door.is_open:
+            return door.try_open(self.player['keys'])
+        return True
+
+    def collect_at(self, x, y):
+        """鍵とアイテムの取得"""
+        for key in self.keys:
+            if not key.collected and key.x == x and key.y == y:
+                key.collect()
+        for item in self.items:
+            if not item.collected and item.x == x and item.y == y:
+                item.collect()
+
+    def move_player(self, dx, dy):
+        if self.game_over:
+            return
+
+        new_x = self.player['x'] + dx
+        new_y = self.player['y'] + dy
+        self.player['direction'] = FACING[(dx, dy)]
+
+        if not self.is_open(new_x, new_y) or not self.enter_cell(new_x, new_y):
+            return
+
+        self.player['x'] = new_x
+        self.player['y'] = new_y
+        self.steps += 1
+        self.collect_at(new_x, new_y)
+
+        if self.player['x'] == self.goal['x'] and self.player['y'] == self.goal['y']:
+            bonus = self.player['attacksRemaining'] * 10 + len(self.player['keys']) * 20
+            self.score += bonus
+            self.alert(f"クリア！ ステップ数: {self.steps}\nボーナス: {bonus}点")
+            self.next_stage()
+
+    def attack(self):
+        if self.player['attacksRemaining'] <= 0:
+            return
+        self.player['attacksRemaining'] -= 1
+
+        dx, dy = FACING_OFFSETS[self.player['direction']]
+        target_x = self.player['x'] + dx
+        target_y = self.player['y'] + dy
+
+        for enemy in list(reversed(self.enemies)):
+            if enemy.x == target_x and enemy.y == target_y:
+                if enemy.take_damage(self.player['attackPower']):
+                    self.enemies.remove(enemy)
+
+    def special_attack(self):
+        if self.player['specialAttackUsed']:
+            return
+        self.player['specialAttackUsed'] = True
+
+        for enemy in list(reversed(self.enemies)):
+            dist = abs(enemy.x - self.player['x']) + abs(enemy.y - self.player['y'])
+            if dist <= 3:
+                if enemy.take_damage(2):
+                    self.enemies.remove(enemy)
+
+    def reset_player_for_stage(self):
+        self.stage += 1
+        self.steps = 0
+        self.player['x'] = 1
+        self.player['y'] = 1
+        self.player['attacksRemaining'] = min(self.player['attacksRemaining'] + 3, 10)
+        self.player['specialAttackUsed'] = False
+        self.health = min(self.health + 1, 10)
+
+    def next_stage(self):
+        self.reset_player_for_stage()
+        self.generate()
+
+    def check_collisions(self):
+        for enemy in self.enemies:
+            if enemy.x == self.player['x'] and enemy.y == self.player['y']:
+                self.health -= 1
+                if self.health <= 0:
+                    self.game_over = True
+                    self.alert(f"ゲームオーバー！\nステージ: {self.stage}\nスコア: {self.score}")
+                    self.reset_game()
+                else:
+                    self.player['x'] = 1
+                    self.player['y'] = 1
+                break
+
+    def reset_game(self):
+        self.stage = 1
+        self.steps = 0
+        self.health = 5
+        self.score = 0
+        self.player = new_player()
+        self.game_over = False
+        self.generate()
+
+    def update(self):
+        for enemy in self.enemies:
+            enemy.update()
+        self.check_collisions()
+
+    def get_game_state(self):
+        return {
+            'player': dict(self.player, keys=list(self.player['keys'])),
+            'goal': dict(self.goal) if self.goal else None,
+            'enemies': [e.to_dict() for e in self.enemies],
+            'items': [i.to_dict() for i in self.items],
+            'doors': [d.to_dict() for d in self.doors],
+            'keys': [k.to_dict() for k in self.keys],
+            'maze': self.maze,
+            'stage': self.stage,
+            'steps': self.steps,
+            'health': self.health,
+            'score': self.score,
+            'gameOver': self.game_over
+        }
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+maze-game-multilevel.html のシミュレーター
+
+JSの changeFloor はフロア読み込み後に階層を比較するので、階段を使っても
+プレイヤーの座標が移されず、移動先の階で壁の中に立つことがある。ここでは
+移動先の階の階段（下りたら上り階段、上ったら下り階段）の上に移す。
+また階段は (1, 1) から行けるマスに置き、ドアと鍵はその階を抜けられる
+配置になるまで置き直す（JSでは鍵が自分のドアの奥に置かれることがある）。
+"""
+
+from .keys import KeyMazeGame, Door, Key, Item, ITEM_TYPES, DOOR_COLORS, ENEMY_VALUES, FACING
+from .keys import Enemy as KeyEnemy
+
+
+class Stairs:
+    """階段（'up' または 'down'）"""
+
+    def __init__(self, x, y, type):
+        self.x = x
+        self.y = y
+        self.type = type
+
+    def to_dict(self):
+        return {'x': self.x, 'y': self.y, 'type': self.type}
+
+
+class Enemy(KeyEnemy):
+    """深い階ほど体力と得点が上がる敵。階段の上には乗らない"""
+
+    def get_health_by_type(self):
+        return super().get_health_by_type() + self.game.current_floor // 2
+
+    def get_value_by_type(self):
+        return ENEMY_VALUES[self.type] * self.game.current_floor
+
+    def blocked(self, x, y):
+        if super().blocked(x, y):
+            return True
+        stairs = self.game.stairs
+        return any(s and s.x == x and s.y == y for s in (stairs['up'], stairs['down']))
+
+
+class MultiLevelMazeGame(KeyMazeGame):
+    """複数階層の迷路（ゴールは最下層のみ）"""
+
+    def __init__(self, seed=None):
+        self.current_floor = 1
+        self.total_floors = 3
+        self.floors = []
+        self.stairs = {'up': None, 'down': None}
+        self.visited_floors = set()
+        super().__init__(seed)
+
+    def generate(self):
+        """generateAllFloors"""
+        self.floors = []
+        self.total_floors = 2 + self.stage // 2
+        for floor in range(1, self.total_floors + 1):
+            self.floors.append(self.generate_floor(floor))
+        self.load_floor(1)
+
+    def place_stairs(self, maze, offset, type, cells):
+        """cells（スタートから行けるマス）の中に階段を置く"""
+        while True:
+            x = offset + int(self.random() * 4)
+            y = offset + int(self.random() * 4)
+            if maze[y][x] == 0 and (x, y) in cells:
+                return Stairs(x, y, type)
+
+    def generate_floor(self, floor_number):
+        maze = self.carve_maze()
+        self.add_openings(maze, 5 + floor_number)
+        cells = self.reachable((1, 1), maze)
+
+        stairs = {'up': None, 'down': None}
+        # 下の階へ（最下層以外）
+        if floor_number < self.total_floors:
+            stairs['down'] = self.place_stairs(maze, 15, 'down', cells)
+        # 上の階へ（最上階以外）
+        if floor_number > 1:
+            stairs['up'] = self.place_stairs(maze, 1, 'up', cells)
+
+        # ゴール（最下層のみ）
+        goal = None
+        if floor_number == self.total_floors:
+            goal = {'x': 18, 'y': 18}
+            self.open_goal(maze)
+
+        return {
+            'maze': maze,
+            'stairs': stairs,
+            'goal': goal,
+            'enemies': [],
+            'items': [],
+            'doors': [],
+            'keys': []
+        }
+
+    def load_floor(self, floor_number):
+        floor = self.floors[floor_number - 1]
+        self.current_floor = floor_number
+        self.maze = floor['maze']
+        self.stairs = floor['stairs']
+        self.goal = floor['goal']
+
+        # 初回訪問時のみ敵やアイテムを配置
+        if floor_number not in self.visited_floors:
+            self.visited_floors.add(floor_number)
+            self.place_floor_enemies(floor)
+            self.place_floor_items(floor)
+            self.place_floor_doors_and_keys(floor)
+            # 鍵がドアの奥にあって抜けられなければ置き直す
+            while not self.can_leave(floor):
+                floor['doors'] = []
+                floor['keys'] = []
+                self.place_floor_doors_and_keys(floor)
+
+        # JSと同じく配列はコピーなので、倒した敵は階を移動するまで保存されない
+        self.enemies = list(floor['enemies'])
+        self.items = list(floor['items'])
+        self.doors = list(floor['doors'])
+        self.keys = list(floor['keys'])
+
+    def can_leave(self, floor):
+        """スタートと上り階段のどちらからでも、ゴールか下り階段に行けるか"""
+        goal = floor['goal']
+        down = floor['stairs']['down']
+        target = (goal['x'], goal['y']) if goal else (down.x, down.y)
+        starts = [(1, 1)]
+        if floor['stairs']['up']:
+            starts.append((floor['stairs']['up'].x, floor['stairs']['up'].y))
+        return all(self.can_finish(start, [target], floor['maze'], floor['doors'], floor['keys'])
+                   for start in starts)
+
+    def is_reserved(self, floor, x, y):
+        """スタート・ゴール・階段のマス"""
+        if x == 1 and y == 1:
+            return True
+        goal = floor['goal']
+        if goal and x == goal['x'] and y == goal['y']:
+            return True
+        return any(s and s.x == x and s.y == y
+                   for s in (floor['stairs']['up'], floor['stairs']['down']))
+
+    def place_floor_enemies(self, floor):
+        enemy_count = 2 + self.current_floor + self.stage // 2
+
+        for i in range(enemy_count):
+            for _ in range(100):
+                x, y = self.random_cell()
+                if floor['maze'][y][x] == 0 and not self.is_reserved(floor, x, y):
+                    type = 'basic'
+                    if self.current_floor == self.total_floors and i == 0:
+                        type = 'boss'
+                    elif i % 3 == 0:
+                        type = 'strong'
+                    floor['enemies'].append(Enemy(self, x, y, type))
+                    break
+
+    def place_floor_items(self, floor):
+        item_count = 2 + self.current_floor // 2
+
+        for _ in range(item_count):
+            for _ in range(100):
+                x, y = self.random_cell()
+                if floor['maze'][y][x] == 0:
+                    type = ITEM_TYPES[int(self.random() * len(ITEM_TYPES))]
+                    floor['items'].append(Item(self, x, y, type))
+                    break
+
+    def place_floor_doors_and_keys(self, floor):
+        if self.current_floor == 1:
+            return  # 1階にはドアなし
+
+        door_count = min(self.current_floor // 2, 2)
+        for i in range(door_count):
+            color = DOOR_COLORS[i]
+
+            for _ in range(100):
+                x = 5 + int(self.random() * 10)
+                y = 5 + int(self.random() * 10)
+                if floor['maze'][y][x] == 0:
+                    floor['doors'].append(Door(self, x, y, color))
+                    break
+
+            for _ in range(100):
+                x, y = self.random_cell()
+                if floor['maze'][y][x] == 0:
+                    floor['keys'].append(Key(self, x, y, color))
+                    break
+
+    def move_player(self, dx, dy):
+        if self.game_over:
+            return
+
+        new_x = self.player['x'] + dx
+        new_y = self.player['y'] + dy
+        self.player['direction'] = FACING[(dx, dy)]
+
+        if not self.is_open(new_x, new_y) or not self.enter_cell(new_x, new_y):
+            return
+
+        self.player['x'] = new_x
+        self.player['y'] = new_y
+        self.steps += 1
+
+        up = self.stairs['up']
+        down = self.stairs['down']
+        if up and up.x == new_x and up.y == new_y:
+            self.change_floor(self.current_floor - 1)
+        elif down and down.x == new_x and down.y == new_y:
+            self.change_floor(self.current_floor + 1)
+
+        self.collect_at(self.player['x'], self.player['y'])
+
+        if self.goal and self.player['x'] == self.goal['x'] and self.player['y'] == self.goal['y']:
+            bonus = (self.player['attacksRemaining'] * 10 +
+                     len(self.player['keys']) * 20 +
+                     self.total_floors * 100)
+            self.score += bonus
+            self.alert(f"クリア！\nステップ数: {self.steps}\nボーナス: {bonus}点")
+            self.next_stage()
+
+    def change_floor(self, new_floor):
+        if new_floor < 1 or new_floor > self.total_floors:
+            return
+
+        floor = self.floors[self.current_floor - 1]
+        floor['enemies'] = list(self.enemies)
+        floor['items'] = list(self.items)
+        floor['doors'] = list(self.doors)
+        floor['keys'] = list(self.keys)
+
+        previous_floor = self.current_floor
+        self.load_floor(new_floor)
+
+        # 読み込む前の階と比べる（JSは読み込み後の current_floor と比べるので移動しない）
+        if new_floor > previous_floor and self.stairs['up']:
+            self.player['x'] = self.stairs['up'].x
+            self.player['y'] = self.stairs['up'].y
+        elif new_floor < previous_floor and self.stairs['down']:
+            self.player['x'] = self.stairs['down'].x
+            self.player['y'] = self.stairs['down'].y
+
+        self.score += 50  # 階層移動ボーナス
+
+    def next_stage(self):
+        self.reset_player_for_stage()
+        self.visited_floors.clear()
+        self.generate()
+
+    def reset_game(self):
+        self.current_floor = 1
+        self.visited_floors.clear()
+        super().reset_game()
+
+    def get_game_state(self):
+        state = super().get_game_state()
+        state['stairs'] = {
+            'up': self.stairs['up'].to_dict() if self.stairs['up'] else None,
+            'down': self.stairs['down'].to_dict() if self.stairs['down'] else None
+        }
+        state['currentFloor'] = self.current_floor
+        state['totalFloors'] = self.total_floors
+        state['visitedFloors'] = sorted(self.visited_floors)
+        return state
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+simple-maze-game.html のシミュレーター
+"""
+
+from .base import MazeGame, MOVE_KEYS, MAZE_WIDTH, MAZE_HEIGHT
+
+
+class SimpleMazeGame(MazeGame):
+    """敵のいないシンプルな迷路"""
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.generate()
+
+    def generate(self):
+        maze = self.carve_maze()
+        self.open_goal(maze)
+        self.maze = maze
+
+    def on_key(self, key):
+        self.pressed[key] = True
+        if key in MOVE_KEYS:
+            self.move_player(*MOVE_KEYS[key])
+
+    def move_player(self, dx, dy):
+        new_x = self.player['x'] + dx
+        new_y = self.player['y'] + dy
+
+        if self.is_open(new_x, new_y):
+            self.player['x'] = new_x
+            self.player['y'] = new_y
+            self.steps += 1
+
+            if self.player['x'] == self.goal['x'] and self.player['y'] == self.goal['y']:
+                self.alert(f"クリア！ ステップ数: {self.steps}")
+                self.next_stage()
+
+    def next_stage(self):
+        self.stage += 1
+        self.steps = 0
+        self.player = {'x': 1, 'y': 1}
+        self.generate()
+
+    def get_game_state(self):
+        """MazeAutoSolver.get_maze_state と同じ形の状態"""
+        return {
+            'maze': self.maze,
+            'player': dict(self.player),
+            'goal': dict(self.goal),
+            'width': MAZE_WIDTH,
+            'height': MAZE_HEIGHT,
+            'steps': self.steps,
+            'stage': self.stage
+        }
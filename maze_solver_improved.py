@@ -1,17 +1,20 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import UnexpectedAlertPresentException, TimeoutException
 import time
 import os
 from datetime import datetime
+from game_snapshot import GameSnapshot
+from browser_factory import create_driver
+from page_events import load_game
+from dialog_listener import DialogListener
+from maze_pathfinding import find_path
 
 class ImprovedMazeSolver:
     def __init__(self, game_file="maze-game-improved-enemies.html"):
         self.driver = None
         self.game_file = os.path.abspath(game_file)
+        self.snapshot = None
+        self.dialogs = None
         
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -19,79 +22,52 @@ class ImprovedMazeSolver:
         
     def start_browser(self):
         self.log("ブラウザ起動中", "SYSTEM")
-        options = webdriver.ChromeOptions()
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_window_size(800, 800)
+        # ローカルのゲームだけを開くのでサンドボックスは外す
+        self.driver = create_driver(eager=True, no_sandbox=True)
         self.log("ブラウザ起動完了", "SYSTEM")
         
     def load_game(self):
         self.log(f"ゲームを開く", "GAME")
-        self.driver.get(f"file:///{self.game_file}")
-        time.sleep(1.5)
+        load_game(self.driver, f"file:///{self.game_file}")
+        # アラートはページ内のキューで受け取り、状態取得のついでに回収する
+        self.dialogs = DialogListener(self.driver)
+        self.dialogs.install()
         self.log("ゲーム読み込み完了", "GAME")
         
     def get_game_state(self):
-        """JavaScriptからゲーム状態を取得"""
+        """JavaScriptからゲーム状態を取得（1回の呼び出しで変化分だけ受け取る）"""
         try:
-            state = self.driver.execute_script("""
-                return {
-                    player: game.player,
-                    goal: game.goal,
-                    enemies: game.enemies.map(e => ({
-                        x: e.x, 
-                        y: e.y, 
+            if self.snapshot is None:
+                self.snapshot = GameSnapshot(self.driver, {
+                    'player': 'game.player',
+                    'goal': 'game.goal',
+                    'enemies': """game.enemies.map(e => ({
+                        x: e.x,
+                        y: e.y,
                         type: e.type,
                         stunTime: e.stunTime
-                    })),
-                    maze: game.maze,
-                    stage: game.stage,
-                    steps: game.steps,
-                    health: game.health,
-                    pushCooldown: game.pushCooldown,
-                    powerUpTime: game.powerUpTime
-                };
-            """)
+                    }))""",
+                    'stage': 'game.stage',
+                    'steps': 'game.steps',
+                    'health': 'game.health',
+                    'pushCooldown': 'game.pushCooldown',
+                    'powerUpTime': 'game.powerUpTime',
+                    'dialogs': DialogListener.EXPRESSION
+                }, grids={
+                    # 迷路はステージが変わったときだけ送られる
+                    'maze': ('game.maze', 'game.stage')
+                })
+            state = self.snapshot.get()
+            self.dialogs.feed(state.pop('dialogs', None))
             return state
         except:
             return None
             
     def find_path_bfs(self, state):
-        """シンプルなBFS経路探索"""
-        maze = state['maze']
+        """最短経路探索（共通の経路探索エンジンを使用）"""
         start = (state['player']['x'], state['player']['y'])
         goal = (state['goal']['x'], state['goal']['y'])
-        
-        from collections import deque
-        
-        queue = deque([(start, [])])
-        visited = set()
-        
-        while queue:
-            (x, y), path = queue.popleft()
-            
-            if (x, y) == goal:
-                return path
-                
-            if (x, y) in visited:
-                continue
-                
-            visited.add((x, y))
-            
-            # 4方向を探索
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                
-                if (0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and 
-                    maze[ny][nx] == 0 and (nx, ny) not in visited):
-                    
-                    new_path = path + [(nx, ny)]
-                    queue.append(((nx, ny), new_path))
-        
-        return None
+        return find_path(state['maze'], start, goal)
         
     def should_push_enemies(self, state):
         """敵を押しのけるべきか判断"""
@@ -115,7 +91,8 @@ class ImprovedMazeSolver:
         if not state:
             return False
             
-        self.log(f"ステージ {state['stage']} 開始", "STAGE")
+        stage = state['stage']
+        self.log(f"ステージ {stage} 開始", "STAGE")
         self.log(f"敵: {len(state['enemies'])}体, ライフ: {state['health']}", "INFO")
         
         body = self.driver.find_element(By.TAG_NAME, "body")
@@ -125,6 +102,19 @@ class ImprovedMazeSolver:
             if not state:
                 break
                 
+            # アラートチェック（状態取得と一緒に受け取っているので追加の通信はない）
+            event = self.dialogs.pop()
+            if event:
+                alert_text = event['message']
+                self.log(f"アラート: {alert_text}", "ALERT")
+                
+                if "クリア" in alert_text:
+                    self.log(f"ステージ {stage} クリア！", "CLEAR")
+                    return True
+                elif "ゲームオーバー" in alert_text:
+                    self.log("ゲームオーバー", "GAMEOVER")
+                    return False
+                    
             # 経路探索
             path = self.find_path_bfs(state)
             if not path:
@@ -156,22 +146,6 @@ class ImprovedMazeSolver:
                     
                 time.sleep(0.2)  # 敵の動きを見るため
                 
-            # アラートチェック
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                self.log(f"アラート: {alert_text}", "ALERT")
-                alert.accept()
-                
-                if "クリア" in alert_text:
-                    self.log(f"ステージ {state['stage']} クリア！", "CLEAR")
-                    return True
-                elif "ゲームオーバー" in alert_text:
-                    self.log("ゲームオーバー", "GAMEOVER")
-                    return False
-            except:
-                pass
-                
             # 進捗表示
             if state['steps'] % 20 == 0 and state['steps'] > 0:
                 self.log(f"進行中: {state['steps']}歩", "PROGRESS")
@@ -192,7 +166,6 @@ class ImprovedMazeSolver:
             for i in range(max_stages):
                 if self.play_stage():
                     stages_cleared += 1
-                    time.sleep(1)
                 else:
                     break
                     
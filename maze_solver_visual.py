@@ -4,62 +4,39 @@
 迷路自動ソルバー（視覚的パス表示機能付き）
 """
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 import time
 import os
-from datetime import datetime
-from collections import deque
+from maze_pathfinding import find_path, to_directions
+from solver_logger import SolverLogger
+from browser_factory import create_driver
+from page_events import load_game, wait_for_alert
 import json
 
 class MazeSolverVisual:
     def __init__(self):
         self.driver = None
         self.log_file = "maze_visual_log.txt"
-        self.json_log_file = "maze_visual_log.json"
-        self.log_entries = []
+        self.json_log_file = "maze_visual_log.jsonl"
+        self.logger = SolverLogger(self.log_file, self.json_log_file)
         
     def write_log(self, message, event_type="INFO"):
-        """ログファイルに書き込み"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        log_entry = f"[{timestamp}] [{event_type}] {message}"
+        """ログを書き込む（ファイルへの書き込みはバックグラウンドで行う）"""
+        self.logger.log(message, event_type)
         
-        # テキストファイルに追記
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(log_entry + "\n")
-            
-        # JSONログ用のエントリも保存
-        self.log_entries.append({
-            "timestamp": timestamp,
-            "event_type": event_type,
-            "message": message,
-            "unix_time": time.time()
-        })
-        
-        # コンソールにも出力
-        print(log_entry)
-        
-    def save_json_log(self):
-        """JSON形式でログを保存"""
-        with open(self.json_log_file, "w", encoding="utf-8") as f:
-            json.dump(self.log_entries, f, ensure_ascii=False, indent=2)
-            
     def setup_driver(self):
         """ブラウザ起動"""
         self.write_log("ブラウザ起動開始", "SYSTEM")
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        options.add_experimental_option("detach", True)  # ブラウザを開いたまま
-        self.driver = webdriver.Chrome(options=options)
+        # 経路の描画を見るためのスクリプトなので画面を表示したまま残す
+        self.driver = create_driver(headless=False, eager=True, detach=True)
         self.write_log("ブラウザ起動完了", "SYSTEM")
         
     def open_game(self):
         """迷路ゲームを開く"""
         game_path = os.path.join(os.path.dirname(__file__), "simple-maze-game.html")
         self.write_log(f"ゲームファイルを開く: {game_path}", "GAME")
-        self.driver.get(f"file:///{game_path}")
-        time.sleep(1)
+        load_game(self.driver, f"file:///{game_path}")
         self.write_log("ゲーム読み込み完了", "GAME")
         
     def inject_visual_functions(self):
@@ -126,36 +103,11 @@ class MazeSolverVisual:
         return state
         
     def find_path_bfs(self, start, goal, maze):
-        """幅優先探索で最短経路を見つける"""
-        visited = set()
-        visited.add(start)
-        queue = deque([(start, [])])
-        
-        directions = [
-            (0, -1, 'up'),
-            (0, 1, 'down'),
-            (-1, 0, 'left'),
-            (1, 0, 'right')
-        ]
-        
-        while queue:
-            (x, y), path = queue.popleft()
-            
-            if (x, y) == goal:
-                return path
-                
-            for dx, dy, direction in directions:
-                nx, ny = x + dx, y + dy
-                
-                if (0 <= nx < len(maze[0]) and 
-                    0 <= ny < len(maze) and
-                    maze[ny][nx] == 0 and
-                    (nx, ny) not in visited):
-                    
-                    visited.add((nx, ny))
-                    queue.append(((nx, ny), path + [direction]))
-                    
-        return []
+        """最短経路を見つける（共通の経路探索エンジンを使用）"""
+        path = find_path(maze, start, goal)
+        if path is None:
+            return []
+        return to_directions(start, path)
         
     def visualize_path(self, path):
         """パスを視覚的に表示"""
@@ -214,18 +166,12 @@ class MazeSolverVisual:
             # 経路実行
             self.execute_path_with_visual(path)
             
-            # アラート待機と処理
-            time.sleep(1)
+            # アラート待機と処理（出た時点で戻る）
+            alert_text = wait_for_alert(self.driver, 1)
             
-            try:
-                alert = self.driver.switch_to.alert
-                alert_text = alert.text
-                
+            if alert_text is not None:
                 # アラート検知をログに記録
                 self.write_log(f"アラート検知: '{alert_text}'", "ALERT")
-                
-                # アラート受諾
-                alert.accept()
                 self.write_log("アラートを閉じました", "ALERT")
                 
                 # クリア情報をログ
@@ -236,7 +182,7 @@ class MazeSolverVisual:
                 
                 return True
                 
-            except:
+            else:
                 self.write_log("アラートが検出されませんでした", "WARNING")
                 return False
         else:
@@ -259,7 +205,6 @@ class MazeSolverVisual:
                 # 現在のステップ数を取得
                 state = self.get_maze_state()
                 total_steps = state['steps']
-                time.sleep(1)  # 次のステージの準備
             else:
                 break
                 
@@ -269,9 +214,9 @@ class MazeSolverVisual:
         """終了処理"""
         self.write_log("セッション終了", "SYSTEM")
         # detachオプションを使っているので、ブラウザは閉じない
-        # JSON形式でもログを保存
-        self.save_json_log()
+        # 残りのログを書き出す
         self.write_log("ログ保存完了", "SYSTEM")
+        self.logger.close()
 
 def main():
     print("=== 迷路自動ソルバー（視覚パス表示版） ===\n")
@@ -1,20 +1,24 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import UnexpectedAlertPresentException, TimeoutException
-from collections import deque
 import time
 import json
 import os
 from datetime import datetime
+from game_snapshot import GameSnapshot
+from browser_factory import create_driver
+from page_events import load_game
+from dialog_listener import DialogListener
+from maze_pathfinding import find_path, IncrementalPlanner
+from danger_map import DangerField
 
 class MazeSolverWithEnemies:
     def __init__(self, game_file="maze-game-with-enemies.html"):
         self.driver = None
         self.game_file = os.path.abspath(game_file)
         self.logs = []
+        self.snapshot = None
+        self.dialogs = None
+        self.danger_field = None
         self.game_data = {
             "sessions": [],
             "total_stages": 0,
@@ -31,104 +35,66 @@ class MazeSolverWithEnemies:
         
     def start_browser(self):
         self.log("ブラウザ起動中", "SYSTEM")
-        options = webdriver.ChromeOptions()
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.set_window_size(800, 800)
+        # ローカルのゲームだけを開くのでサンドボックスは外す
+        self.driver = create_driver(eager=True, no_sandbox=True)
         self.log("ブラウザ起動完了", "SYSTEM")
         
     def load_game(self):
         self.log(f"ゲームファイルを開く: {self.game_file}", "GAME")
-        self.driver.get(f"file:///{self.game_file}")
-        time.sleep(1.5)
+        load_game(self.driver, f"file:///{self.game_file}")
+        # アラートはページ内のキューで受け取り、状態取得のついでに回収する
+        self.dialogs = DialogListener(self.driver)
+        self.dialogs.install()
         self.log("ゲーム読み込み完了", "GAME")
         
     def get_game_state(self):
-        """JavaScriptからゲーム状態を取得"""
+        """JavaScriptからゲーム状態を取得（1回の呼び出しで変化分だけ受け取る）"""
         try:
-            state = self.driver.execute_script("""
-                return {
-                    player: game.player,
-                    goal: game.goal,
-                    enemies: game.enemies.map(e => ({x: e.x, y: e.y, type: e.type})),
-                    maze: game.maze,
-                    stage: game.stage,
-                    steps: game.steps,
-                    health: game.health,
-                    gameOver: game.gameOver
-                };
-            """)
+            if self.snapshot is None:
+                self.snapshot = GameSnapshot(self.driver, {
+                    'player': 'game.player',
+                    'goal': 'game.goal',
+                    'enemies': 'game.enemies.map(e => ({x: e.x, y: e.y, type: e.type}))',
+                    'stage': 'game.stage',
+                    'steps': 'game.steps',
+                    'health': 'game.health',
+                    'gameOver': 'game.gameOver',
+                    'dialogs': DialogListener.EXPRESSION
+                }, grids={
+                    # 迷路はステージが変わったときだけ送られる
+                    'maze': ('game.maze', 'game.stage')
+                })
+            state = self.snapshot.get()
+            self.dialogs.feed(state.pop('dialogs', None))
             return state
         except:
             return None
             
     def find_safe_path(self, state, avoid_enemies=True):
         """敵を避けながら最短経路を探索（A*アルゴリズム）"""
-        maze = state['maze']
         start = (state['player']['x'], state['player']['y'])
         goal = (state['goal']['x'], state['goal']['y'])
-        enemies = [(e['x'], e['y']) for e in state['enemies']] if avoid_enemies else []
         
-        # ヒューリスティック関数（マンハッタン距離）
-        def heuristic(pos):
-            return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
+        # 敵に近いマスほど移動コストを高くする
+        cost = None
+        if avoid_enemies:
+            cost = self.update_danger_field(state).cost
         
-        # 敵からの距離を計算
-        def enemy_danger(pos):
-            if not avoid_enemies:
-                return 0
-            min_dist = float('inf')
-            for enemy_pos in enemies:
-                dist = abs(pos[0] - enemy_pos[0]) + abs(pos[1] - enemy_pos[1])
-                min_dist = min(min_dist, dist)
-            # 距離が近いほど危険度が高い
-            return max(0, 3 - min_dist) * 5
+        return find_path(state['maze'], start, goal, cost)
         
-        # 優先度付きキュー（手動実装）
-        open_set = [(0, start, [])]
-        visited = set()
+    def get_danger_field(self, state):
+        """迷路の危険度マップ（迷路が変わったら作り直す）"""
+        if self.danger_field is None or self.danger_field.maze is not state['maze']:
+            self.danger_field = DangerField(state['maze'])
+        return self.danger_field
         
-        while open_set:
-            # 最小コストのノードを取得
-            open_set.sort(key=lambda x: x[0])
-            f_score, current, path = open_set.pop(0)
-            
-            if current == goal:
-                return path
-                
-            if current in visited:
-                continue
-                
-            visited.add(current)
-            
-            # 4方向を探索
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nx, ny = current[0] + dx, current[1] + dy
-                
-                # 範囲チェックと壁チェック
-                if (0 <= nx < len(maze[0]) and 0 <= ny < len(maze) and 
-                    maze[ny][nx] == 0 and (nx, ny) not in visited):
-                    
-                    # 新しいパス
-                    new_path = path + [(nx, ny)]
-                    
-                    # コスト計算
-                    g_score = len(new_path)
-                    h_score = heuristic((nx, ny))
-                    danger = enemy_danger((nx, ny))
-                    f_score = g_score + h_score + danger
-                    
-                    open_set.append((f_score, (nx, ny), new_path))
+    def update_danger_field(self, state):
+        """危険度マップ全体を敵の現在位置で更新（find_path の cost 用）"""
+        return self.get_danger_field(state).update([(e['x'], e['y']) for e in state['enemies']])
         
-        # 敵を避けて経路が見つからない場合は、敵を無視して再探索
-        if avoid_enemies:
-            self.log("安全な経路が見つかりません。敵を無視して探索", "SOLVER")
-            return self.find_safe_path(state, avoid_enemies=False)
-            
-        return None
+    def danger_costs(self, state):
+        """敵の周りだけの危険度（再計画用。全グリッドは計算しない）"""
+        return self.get_danger_field(state).local_costs([(e['x'], e['y']) for e in state['enemies']])
         
     def visualize_path(self, path):
         """パスを視覚的に表示"""
@@ -166,17 +132,26 @@ class MazeSolverWithEnemies:
         # canvasではなくbodyにキー送信
         body = self.driver.find_element(By.TAG_NAME, "body")
         moves = 0
+        # 再探索用のプランナー（最初の再探索で作成し、以降は差分だけ更新）
+        planner = None
+        i = 0
         
-        for i, (x, y) in enumerate(path):
+        while i < len(path):
+            x, y = path[i]
+            
             # 現在の状態を取得
             state = self.get_game_state()
             if not state or state['gameOver']:
                 break
+            # クリアやゲームオーバーのアラートが出たら中断
+            if self.dialogs.pending():
+                break
                 
             current = (state['player']['x'], state['player']['y'])
             
             # すでに目標地点にいる場合はスキップ
             if current == (x, y):
+                i += 1
                 continue
                 
             # 敵が近くにいるかチェック
@@ -191,10 +166,22 @@ class MazeSolverWithEnemies:
             # 敵が近い場合は再経路探索
             if enemies_nearby and i > 5:
                 self.log("敵が近いため再経路探索", "SOLVER")
-                new_path = self.find_safe_path(state)
+                costs = self.danger_costs(state)
+                replan_start = time.time()
+                if planner is None:
+                    goal = (state['goal']['x'], state['goal']['y'])
+                    planner = IncrementalPlanner(state['maze'], current, goal, costs)
+                    changed = len(costs)
+                else:
+                    planner.move_to(current)
+                    changed = planner.update_costs(costs)
+                new_path = planner.path()
+                self.log(f"再探索: 変化したマス {changed}, 探索時間: {time.time() - replan_start:.3f}秒", "SOLVER")
                 if new_path:
                     self.visualize_path(new_path)
-                    return moves + self.move_along_path(new_path)
+                    path = new_path
+                    i = 0
+                    continue
             
             # 移動方向を決定
             dx = x - current[0]
@@ -218,20 +205,17 @@ class MazeSolverWithEnemies:
                 progress = (i / len(path)) * 100
                 self.log(f"進捗: {progress:.1f}% ({i}/{len(path)}ステップ)", "PROGRESS")
                 
+            i += 1
+                
         return moves
         
     def handle_alert(self):
-        """アラート処理"""
-        try:
-            wait = WebDriverWait(self.driver, 0.5)
-            alert = wait.until(EC.alert_is_present())
-            alert_text = alert.text
-            self.log(f"アラート検知: '{alert_text}'", "ALERT")
-            alert.accept()
-            self.log("アラート処理完了", "ALERT")
-            return alert_text
-        except TimeoutException:
+        """アラート処理（移動中に受け取ったものがなければ最大0.5秒待つ）"""
+        event = self.dialogs.pop() or self.dialogs.wait(0.5)
+        if event is None:
             return None
+        self.log(f"アラート検知: '{event['message']}'", "ALERT")
+        return event['message']
             
     def play_stage(self):
         """1ステージをプレイ"""
@@ -279,8 +263,7 @@ class MazeSolverWithEnemies:
             
             self.log(f"移動実行完了: {moves}ステップ, 実行時間: {move_time:.2f}秒", "MOVE")
             
-            # アラートチェック
-            time.sleep(0.5)
+            # アラートチェック（出た時点で戻る）
             alert_text = self.handle_alert()
             
             if alert_text and "クリア" in alert_text:
@@ -291,8 +274,7 @@ class MazeSolverWithEnemies:
                 self.log("ゲームオーバー！", "GAMEOVER")
                 self.game_data["enemy_collisions"] += 1
                 stage_data["enemy_collisions"] += 1
-                time.sleep(1)
-                # ゲームがリセットされるので再挑戦
+                # アラートを閉じた時点でゲームはリセット済みなので再挑戦
                 state = self.get_game_state()
                 if state:
                     self.log(f"再挑戦 {attempts+1}/5", "RETRY")
@@ -304,7 +286,6 @@ class MazeSolverWithEnemies:
                     self.game_data["enemy_collisions"] += 1
                     stage_data["enemy_collisions"] += 1
                     state = new_state
-                    time.sleep(0.5)
                 else:
                     break
                     
@@ -323,7 +304,6 @@ class MazeSolverWithEnemies:
                 if self.play_stage():
                     stages_cleared += 1
                     self.game_data["total_stages"] = stages_cleared
-                    time.sleep(1)
                 else:
                     self.log("ステージクリア失敗", "ERROR")
                     break
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ページの準備完了やアラートを固定の sleep ではなくイベントで待つ
+
+どの待機もページ内で条件を監視する execute_async_script 1回で行い、
+条件が成立した時点で戻る。
+
+    wait_for_game(driver)             # game オブジェクトができて最初のフレームが描画された
+    wait_until(driver, "game.stage === 2")
+    text = wait_for_alert(driver, 0.5)  # クリア／ゲームオーバーのアラート
+
+wait_for_alert は alert() が開くと実行中のスクリプトが中断される
+（UnexpectedAlertPresentException）ことを利用しているので、
+ポーリングせずにアラートの発生を検知できる。
+"""
+
+from selenium.common.exceptions import (
+    NoAlertPresentException,
+    TimeoutException,
+    UnexpectedAlertPresentException
+)
+
+# 条件が真になるまでページ内で監視し、その後 frames 回フレームを待つ
+WAIT_SCRIPT = """
+    const condition = new Function('return (' + arguments[0] + ');');
+    const frames = arguments[1];
+    const timeoutMs = arguments[2];
+    const done = arguments[arguments.length - 1];
+    const start = Date.now();
+
+    const check = () => {
+        try {
+            return condition();
+        } catch (e) {
+            return null;
+        }
+    };
+    const afterFrames = (count, value) => {
+        if (count <= 0) {
+            done({ok: true, value: value === undefined ? null : value});
+            return;
+        }
+        requestAnimationFrame(() => afterFrames(count - 1, value));
+    };
+    const poll = () => {
+        const value = check();
+        if (value) {
+            afterFrames(frames, value);
+        } else if (Date.now() - start >= timeoutMs) {
+            done({ok: false, value: null});
+        } else {
+            setTimeout(poll, 10);
+        }
+    };
+    poll();
+"""
+
+# 何もせず待つだけ（alert が開けばその時点で中断される）
+SLEEP_SCRIPT = """
+    const done = arguments[arguments.length - 1];
+    setTimeout(() => done(null), arguments[0]);
+"""
+
+GAME_READY = "typeof game !== 'undefined' && game !== null && document.readyState === 'complete'"
+
+# execute_async_script のタイムアウトはページ側の待ち時間より少し長くする
+SCRIPT_TIMEOUT_MARGIN = 5
+
+
+def wait_until(driver, condition, timeout=10, frames=0):
+    """JavaScriptの式 condition が真になるまで待ってその値を返す
+
+    frames を指定すると、条件成立後にさらにそのフレーム数だけ待つ。
+    タイムアウトしたら TimeoutException。
+    """
+    driver.set_script_timeout(timeout + SCRIPT_TIMEOUT_MARGIN)
+    result = driver.execute_async_script(WAIT_SCRIPT, condition, frames, timeout * 1000)
+    if not result or not result['ok']:
+        raise TimeoutException(f"{timeout}秒以内に条件が成立しませんでした: {condition}")
+    return result['value']
+
+
+def wait_for_game(driver, timeout=10, frames=1):
+    """game オブジェクトができて最初のフレームが描画されるまで待つ"""
+    wait_until(driver, GAME_READY, timeout, frames)
+
+
+def load_game(driver, url, timeout=10):
+    """ページを開いてゲームの準備ができるまで待つ"""
+    driver.get(url)
+    wait_for_game(driver, timeout)
+
+
+def accept_alert(driver):
+    """開いているアラートを閉じてテキストを返す（なければ None）"""
+    try:
+        alert = driver.switch_to.alert
+        text = alert.text
+        alert.accept()
+        return text
+    except NoAlertPresentException:
+        return None
+
+
+def wait_for_alert(driver, timeout=0.5):
+    """アラートが開くまで最大 timeout 秒待ち、閉じてテキストを返す
+
+    アラートが出なければ None。
+    """
+    text = accept_alert(driver)
+    if text is not None:
+        return text
+
+    driver.set_script_timeout(timeout + SCRIPT_TIMEOUT_MARGIN)
+    try:
+        driver.execute_async_script(SLEEP_SCRIPT, timeout * 1000)
+    except UnexpectedAlertPresentException as e:
+        # unhandledPromptBehavior によってはアラートがすでに閉じられている
+        text = accept_alert(driver)
+        return text if text is not None else e.alert_text
+    return None
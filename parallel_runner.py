@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数のヘッドレスChromeでゲームを並列実行する
+
+ワーカープロセスごとにChromeを1つ起動し、ジョブ（ステージ数や
+エピソード番号など）をキューから順に割り当てる。各ジョブの結果は
+ジョブ順に並べて1つのレポートにまとめる。
+
+    runner = ParallelRunner("parallel_runner:play_maze_job", workers=4)
+    report = runner.run([{"stages": 3}] * 8)
+
+世代ごとに run を繰り返すような使い方では、with 文でワーカーを
+起動したままにしておけばブラウザを毎回起動し直さずに済む:
+
+    with ParallelRunner("strategy_search:evaluate_strategy_job", workers=4) as runner:
+        for generation in range(10):
+            report = runner.run(jobs)
+
+ターゲットは "モジュール:関数" の文字列で指定し、関数は
+target(driver, job) の形で呼ばれる（ワーカー側で import するので
+プロセス間で関数を受け渡す必要がない）。戻り値は JSON にできる値にする。
+
+使い方:
+    python parallel_runner.py maze --jobs 8 --workers 4
+    python parallel_runner.py learning --jobs 6 [--seed 0] [--lockstep]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from multiprocessing import util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# コマンドラインから選べるターゲット
+TARGETS = {
+    "maze": "parallel_runner:play_maze_job",
+    "learning": "parallel_runner:play_learning_job"
+}
+
+# ワーカープロセス内のブラウザ
+_driver = None
+_target = None
+
+
+def create_driver(headless=True, window_size=(800, 800)):
+    """ワーカー用のChromeを起動"""
+    from browser_factory import create_driver as create_browser
+
+    # ローカルのゲームだけを開くのでサンドボックスは外す
+    return create_browser(headless=headless, window_size=window_size, eager=True,
+                          no_sandbox=True)
+
+
+def resolve_target(spec):
+    """"モジュール:関数" から関数を取り出す"""
+    module_name, _, func_name = spec.partition(":")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _init_worker(target, headless):
+    global _driver, _target
+    _target = resolve_target(target)
+    _driver = create_driver(headless)
+    # ワーカープロセスの終了時には atexit が呼ばれないので multiprocessing の終了処理に登録
+    util.Finalize(_driver, _driver.quit, exitpriority=10)
+
+
+def _run_job(index, job):
+    start_time = time.time()
+    result = {"index": index, "job": job, "worker": os.getpid()}
+    try:
+        result["result"] = _target(_driver, job)
+        result["ok"] = True
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = str(e)
+        result["traceback"] = traceback.format_exc()
+    result["elapsed"] = time.time() - start_time
+    return result
+
+
+class ParallelRunner:
+    """ワーカープールでジョブを並列実行"""
+
+    def __init__(self, target, workers=None, headless=True):
+        self.target = TARGETS.get(target, target)
+        self.workers = workers or os.cpu_count() or 1
+        self.headless = headless
+        self.pool = None
+
+    def _create_pool(self, workers):
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(self.target, self.headless))
+
+    def start(self):
+        """ワーカーを起動したままにする（close まで run の間でブラウザを使い回す）"""
+        if self.pool is None:
+            self.pool = self._create_pool(self.workers)
+        return self
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, jobs, on_result=None):
+        """全ジョブを実行してレポートを返す
+
+        on_result(result) は各ジョブが終わるたびに呼ばれる（進捗表示用）。
+        """
+        jobs = list(jobs)
+        started = datetime.now()
+        start_time = time.time()
+
+        if self.pool is not None:
+            workers = self.workers
+            results = self._collect(self.pool, jobs, on_result)
+        else:
+            workers = max(1, min(self.workers, len(jobs)))
+            with self._create_pool(workers) as pool:
+                results = self._collect(pool, jobs, on_result)
+
+        results.sort(key=lambda r: r["index"])
+        return {
+            "target": self.target,
+            "started": started.isoformat(),
+            "workers": workers,
+            "jobs": len(jobs),
+            "succeeded": sum(1 for r in results if r["ok"]),
+            "failed": sum(1 for r in results if not r["ok"]),
+            "elapsed": time.time() - start_time,
+            "results": results
+        }
+
+    def _collect(self, pool, jobs, on_result):
+        results = []
+        futures = [pool.submit(_run_job, i, job) for i, job in enumerate(jobs)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+
+def save_report(report, path=None):
+    """レポートをJSONで保存"""
+    if path is None:
+        path = f"parallel_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+# --- ターゲット ---
+
+def play_maze_job(driver, job):
+    """敵対応迷路ソルバーで job["stages"] ステージをプレイ"""
+    from maze_solver_with_enemies import MazeSolverWithEnemies
+
+    solver = MazeSolverWithEnemies(job.get("game_file", "maze-game-with-enemies.html"))
+    solver.driver = driver
+    solver.load_game()
+    solver.play_game(max_stages=job.get("stages", 3))
+    return solver.game_data
+
+
+def play_learning_job(driver, job):
+    """学習型RPGプレイヤーで1エピソードをプレイ（戦略の更新は親プロセスで行う）"""
+    sys.path.insert(0, os.path.join(ROOT, "game-tests", "02_learning"))
+    from learning_rpg_player import LearningRPGPlayer, GAME_URL
+
+    # 同じワーカーの前のエピソードが残っていれば再読み込みでリセット
+    if driver.current_url == GAME_URL:
+        driver.refresh()
+    # ジョブのシードで行動選択の乱数（ロックステップならページの Math.random も）を固定
+    seed = job.get("seed")
+    random.seed(seed)
+    player = LearningRPGPlayer(lockstep=job.get("lockstep", False), seed=seed)
+    player.driver = driver
+    # どのワーカーも同じ戦略（同じエピソード番号）を読むので、状態の記録はジョブごとの
+    # ディレクトリに保存し、親プロセスが merge_learning_results で正しい番号に移す
+    player.state_dir = job.get("state_dir") or os.path.join(
+        player.state_dir, "jobs", f"{os.getpid()}_{time.time_ns()}")
+    return player.play_episode(duration=job.get("duration", 45))
+
+
+def _move_state_file(path, state_dir, episode):
+    """ジョブごとに保存した状態の記録を state_dir/ep{episode} に移して新しいパスを返す"""
+    if not path or not os.path.exists(path):
+        return path
+    target = os.path.join(state_dir, f"ep{episode}" + os.path.splitext(path)[1])
+    os.makedirs(state_dir, exist_ok=True)
+    os.replace(path, target)
+    try:
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+    return target
+
+
+def merge_learning_results(report):
+    """並列で集めたエピソードを学習履歴に追加して戦略を更新"""
+    sys.path.insert(0, os.path.join(ROOT, "game-tests", "02_learning"))
+    from learning_rpg_player import LearningRPGPlayer
+
+    player = LearningRPGPlayer()
+    player.store.migrate()
+    player.play_history = player.load_history()
+    player.episode = player.current_strategy["episode"]
+    for r in report["results"]:
+        if r["ok"] and r["result"]:
+            episode = dict(r["result"])
+            # update_strategy は履歴が少ないと番号を進めないので、ここで1つずつ進める
+            player.episode += 1
+            episode["episode"] = player.episode
+            episode["state_file"] = _move_state_file(episode.get("state_file"),
+                                                     player.state_dir, player.episode)
+            player.play_history.append(episode)
+            player.update_strategy()
+            player.current_strategy["episode"] = player.episode
+    player.save_strategy()
+    player.save_history()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ゲームの並列実行")
+    parser.add_argument("target", help="maze / learning または モジュール:関数")
+    parser.add_argument("--jobs", type=int, default=4, help="ジョブ数（ステージ群・エピソード数）")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカー数（既定: CPUコア数）")
+    parser.add_argument("--stages", type=int, default=3, help="maze: 1ジョブのステージ数")
+    parser.add_argument("--duration", type=int, default=45, help="learning: 1エピソードの秒数")
+    parser.add_argument("--seed", type=int, default=0, help="learning: 最初のエピソードのシード")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="learning: フレーム単位で進める（シードで展開も固定）")
+    parser.add_argument("--show", action="store_true", help="ヘッドレスにしない")
+    parser.add_argument("--report", default=None, help="レポートの保存先")
+    args = parser.parse_args()
+
+    if args.target == "learning":
+        # エピソードごとに別のシードを割り当てる
+        # 状態の記録はジョブごとのディレクトリへ（まとめるときに ep{N} へ移す）
+        run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        jobs = [{"duration": args.duration, "seed": args.seed + i, "lockstep": args.lockstep,
+                 "state_dir": os.path.join("rpg_state_history", "jobs", f"{run_id}_{i}")}
+                for i in range(args.jobs)]
+    else:
+        jobs = [{"stages": args.stages, "duration": args.duration} for _ in range(args.jobs)]
+    runner = ParallelRunner(args.target, workers=args.workers, headless=not args.show)
+
+    def progress(result):
+        status = "OK" if result["ok"] else f"NG ({result['error']})"
+        print(f"[{result['index'] + 1}/{len(jobs)}] worker {result['worker']}: "
+              f"{status} {result['elapsed']:.1f}秒")
+
+    report = runner.run(jobs, on_result=progress)
+    if args.target == "learning":
+        merge_learning_results(report)
+
+    path = save_report(report, args.report)
+    print(f"\n完了: {report['succeeded']}/{report['jobs']} 成功, "
+          f"{report['workers']}ワーカー, {report['elapsed']:.1f}秒")
+    print(f"レポート: {path}")
+
+
+if __name__ == "__main__":
+    main()
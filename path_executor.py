@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+計画済みの経路をブラウザ呼び出し1回で実行する
+
+経路（'up'/'down'/'left'/'right' のリスト）をページに注入したルーチンに
+まとめて渡し、ページ側で requestAnimationFrame ごとにキーイベントを
+発行する。send_keys を1手ずつ送って待つ方式と違い、実行速度は
+WebDriver ではなくゲームのフレームレートで決まる。
+
+途中で次のことが起きたら、そこで止めて理由を返す:
+    alert    - アラート（クリア・ゲームオーバー）が出た
+    damage   - 敵に当たってライフが減った／初期位置に戻された
+    gameOver - game.gameOver が立った
+    wall     - キーを送っても位置が変わらなかった（壁）
+    timeout  - 期限までに終わらなかった（requestAnimationFrame が止まったなど）
+
+実行中は window.alert を一時的に差し替えてメッセージを記録するので、
+アラートで WebDriver が止まることはない。記録したテキストは戻り値の
+'alert' に入る（アラート自体はすでに閉じた扱いになる）。差し替えた alert は
+ページ側の期限（スクリプトのタイムアウトより少し前）でも必ず元に戻し、
+それでも Python 側がタイムアウトしたときは RESTORE_ALERT_SCRIPT で戻す。
+"""
+
+from selenium.common.exceptions import TimeoutException
+
+EXECUTOR_SCRIPT = """
+    const directions = arguments[0];
+    const framesPerStep = arguments[1];
+    const deadline = arguments[2];
+    const done = arguments[arguments.length - 1];
+    const KEYS = {up: 'ArrowUp', down: 'ArrowDown', left: 'ArrowLeft', right: 'ArrowRight'};
+
+    const result = {executed: 0, reason: 'done', alert: null, player: null};
+    const originalAlert = window.alert;
+    // Python 側がタイムアウトしたときにも戻せるように残しておく
+    window.__pathExecutorAlert = originalAlert;
+    window.alert = function(message) {
+        result.alert = String(message);
+    };
+
+    const press = key => {
+        document.dispatchEvent(new KeyboardEvent('keydown', {key: key, bubbles: true}));
+        document.dispatchEvent(new KeyboardEvent('keyup', {key: key, bubbles: true}));
+    };
+
+    let finished = false;
+    const finish = reason => {
+        if (finished) return;
+        finished = true;
+        clearTimeout(timer);
+        window.alert = originalAlert;
+        delete window.__pathExecutorAlert;
+        result.reason = reason;
+        result.player = {x: game.player.x, y: game.player.y};
+        done(result);
+    };
+    // requestAnimationFrame が止まっても期限で必ず alert を戻して返す
+    const timer = setTimeout(() => finish('timeout'), deadline);
+
+    let index = 0;
+    let frame = 0;
+    let expected = null;
+    let health = game.health;
+    const step = () => {
+        if (finished) return;
+        // 前のフレームの間にゲームループ側で起きた変化を確認
+        if (result.alert !== null) {
+            finish('alert');
+            return;
+        }
+        if (game.gameOver) {
+            finish('gameOver');
+            return;
+        }
+        if (game.health < health ||
+            (expected && (game.player.x !== expected.x || game.player.y !== expected.y))) {
+            finish('damage');
+            return;
+        }
+        if (index >= directions.length) {
+            finish('done');
+            return;
+        }
+        if (frame++ % framesPerStep !== 0) {
+            requestAnimationFrame(step);
+            return;
+        }
+
+        const before = {x: game.player.x, y: game.player.y};
+        press(KEYS[directions[index]]);
+        index++;
+
+        if (result.alert !== null) {
+            result.executed = index;
+            finish('alert');
+            return;
+        }
+        if (game.player.x === before.x && game.player.y === before.y) {
+            result.executed = index - 1;
+            finish('wall');
+            return;
+        }
+        result.executed = index;
+        expected = {x: game.player.x, y: game.player.y};
+        health = game.health;
+        requestAnimationFrame(step);
+    };
+    requestAnimationFrame(step);
+"""
+
+# Python 側がタイムアウトしたときに差し替えたままの alert を戻す
+RESTORE_ALERT_SCRIPT = """
+    if (window.__pathExecutorAlert) {
+        window.alert = window.__pathExecutorAlert;
+        delete window.__pathExecutorAlert;
+    }
+"""
+
+# 1手あたりのタイムアウト見積もり（秒）
+SECONDS_PER_STEP = 0.1
+# ページ側の期限はスクリプトのタイムアウトよりこれだけ早くする（秒）
+DEADLINE_MARGIN = 2
+
+
+class PathExecutor:
+    """経路をまとめてページに渡して実行する"""
+
+    def __init__(self, driver, frames_per_step=1):
+        self.driver = driver
+        # 何フレームごとに1手進めるか（敵の動きに合わせたい場合は増やす）
+        self.frames_per_step = frames_per_step
+
+    def run(self, directions):
+        """経路を実行して結果を返す
+
+        戻り値: {'executed': 実行した手数, 'reason': 停止理由,
+                 'alert': アラートのテキストまたは None, 'player': {'x', 'y'}}
+        """
+        directions = list(directions)
+        timeout = 10 + len(directions) * self.frames_per_step * SECONDS_PER_STEP
+        self.driver.set_script_timeout(timeout)
+        deadline_ms = int((timeout - DEADLINE_MARGIN) * 1000)
+        try:
+            return self.driver.execute_async_script(EXECUTOR_SCRIPT, directions,
+                                                    self.frames_per_step, deadline_ms)
+        except TimeoutException:
+            self.driver.execute_script(RESTORE_ALERT_SCRIPT)
+            raise
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数のページで記事を並行して取得する非同期クローラー
+
+記事を1件ずつ同じページで開くと、全体の時間は記事数 × 読み込み時間になる。
+AsyncCrawler は URL をページのプール（ワーカーごとに1ページ）に振り分け、
+ホストごとの同時接続数と間隔を守りながら並行して取得する。
+
+    crawler = AsyncCrawler(fetch_article, host_delay=1.0, host_concurrency=2)
+    pages = [await context.new_page() for _ in range(4)]
+    results = await crawler.run(links, pages, key=lambda link: link['url'])
+
+fetch(page, item) は記事1件を取得するコルーチン。結果は items と同じ順で
+返し、失敗した項目は None になる（例外は crawler.errors に残る）。
+
+スケジューリング:
+    - ホストごとに asyncio.Semaphore で同時接続数を制限し、さらに
+      リクエストの開始間隔を host_delay 秒以上あける
+    - 待ち行列はホストごとに分け、ホストを順番に回して取り出すので、
+      記事の多いホストが他のホストを待たせることがない
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+
+
+class HostLimiter:
+    """ホストごとの同時接続数とリクエスト間隔の制限"""
+
+    def __init__(self, delay=1.0, concurrency=1):
+        self.delay = delay
+        self.concurrency = concurrency
+        self.semaphores = {}
+        self.next_start = {}
+
+    def slot(self, host):
+        return _HostSlot(self, host)
+
+    async def acquire(self, host):
+        semaphore = self.semaphores.get(host)
+        if semaphore is None:
+            semaphore = self.semaphores[host] = asyncio.Semaphore(self.concurrency)
+        await semaphore.acquire()
+        # 開始時刻の予約（await を挟まないので他のタスクと競合しない）
+        now = time.monotonic()
+        start = max(now, self.next_start.get(host, now))
+        self.next_start[host] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def release(self, host):
+        self.semaphores[host].release()
+
+
+class _HostSlot:
+    def __init__(self, limiter, host):
+        self.limiter = limiter
+        self.host = host
+
+    async def __aenter__(self):
+        await self.limiter.acquire(self.host)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limiter.release(self.host)
+
+
+class FairQueue:
+    """ホストごとの待ち行列を順番に回して取り出す"""
+
+    def __init__(self):
+        self.hosts = OrderedDict()
+
+    def push(self, host, job):
+        self.hosts.setdefault(host, deque()).append(job)
+
+    def pop(self):
+        """次のジョブを (ホスト, ジョブ) で返す。空なら None"""
+        if not self.hosts:
+            return None
+        host, jobs = next(iter(self.hosts.items()))
+        job = jobs.popleft()
+        if jobs:
+            # このホストは最後尾に回す
+            self.hosts.move_to_end(host)
+        else:
+            del self.hosts[host]
+        return host, job
+
+    def __len__(self):
+        return sum(len(jobs) for jobs in self.hosts.values())
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+class AsyncCrawler:
+    """ページのプールで fetch を並行に実行する"""
+
+    def __init__(self, fetch, host_delay=1.0, host_concurrency=2):
+        self.fetch = fetch
+        self.limiter = HostLimiter(host_delay, host_concurrency)
+        self.errors = []
+
+    async def run(self, items, pages, key=None):
+        """items をすべて取得して、items と同じ順の結果リストを返す
+
+        key(item) は URL を返す関数（省略時は item 自体が URL）。
+        ワーカー数は pages の数で、各ワーカーは自分のページだけを使う。
+        """
+        key = key or (lambda item: item)
+        queue = FairQueue()
+        for index, item in enumerate(items):
+            queue.push(host_of(key(item)), (index, item))
+
+        results = [None] * len(items)
+        self.errors = []
+
+        async def worker(page):
+            while True:
+                job = queue.pop()
+                if job is None:
+                    return
+                host, (index, item) = job
+                async with self.limiter.slot(host):
+                    try:
+                        results[index] = await self.fetch(page, item)
+                    except Exception as e:
+                        self.errors.append((item, e))
+
+        await asyncio.gather(*(worker(page) for page in pages))
+        return results
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+繰り返しのスクレイピングで変わっていない記事を取り直さないための索引
+
+URL ごとに本文のハッシュ、ETag / Last-Modified、最後に確認した時刻を
+覚えておき、次の実行では
+
+    - recheck_after 秒以内に確認した記事はリクエストしない
+    - それ以外は If-None-Match / If-Modified-Since 付きで取得し、304 なら終わり
+    - 取得できた記事もハッシュが同じなら「変更なし」として出力しない
+
+ので、定期実行のコストはおおむね新しい記事・変わった記事の数だけになる。
+
+    index = CrawlIndex("playwright_crawl_index.jsonl")
+    links = [link for link in links if not index.is_fresh(link['url'], 3600)]
+    headers = index.validators(url)              # 条件付きリクエスト用
+    if index.change(url, article) != 'unchanged':
+        store.append(article)                    # 出力に書いてから索引に記録する
+    change = index.update(url, article, etag=..., last_modified=...)
+    # → 'new' / 'updated' / 'unchanged'
+    index.close()                                # 古い行が多ければ詰め直す
+
+索引は1回の更新を1行追記する JSON Lines（同じ URL は後の行が優先）なので、
+実行ごとの書き込みも変わった分だけで済む。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# ハッシュに含める項目（取得時刻などは含めない）
+HASH_FIELDS = ('title', 'content', 'timestamp', 'category')
+
+
+def content_hash(article):
+    """記事の中身のハッシュ"""
+    payload = json.dumps([article.get(field, '') for field in HASH_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CrawlIndex:
+    """URL ごとのハッシュ・検証用ヘッダー・確認時刻"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.lines = 0
+        self.counts = {'new': 0, 'updated': 0, 'unchanged': 0}
+        # 書き込み途中で止まった（改行のない）最後の行の位置（次の追記の前に切り捨てる）
+        self.torn_at = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    self.torn_at = offset
+                    break
+                offset += len(line)
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # 読めない行は飛ばして先を読む
+                    continue
+                self.entries[entry['url']] = entry
+                self.lines += 1
+
+    def _append(self, entry):
+        self.entries[entry['url']] = entry
+        if self.torn_at is not None:
+            # 途中で切れた行に続けて書くと、次の行まで読めなくなる
+            with open(self.path, 'r+b') as f:
+                f.truncate(self.torn_at)
+            self.torn_at = None
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.lines += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def is_fresh(self, url, recheck_after):
+        """recheck_after 秒以内に確認済みなら True（リクエストしなくてよい）"""
+        entry = self.entries.get(url)
+        return bool(entry and recheck_after and time.time() - entry['checked_at'] < recheck_after)
+
+    def validators(self, url):
+        """条件付きリクエストのヘッダー（なければ空）"""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def change(self, url, article):
+        """索引と比べた 'new' / 'updated' / 'unchanged'（索引は書き換えない）"""
+        previous = self.entries.get(url)
+        if previous is None:
+            return 'new'
+        if previous['hash'] != content_hash(article):
+            return 'updated'
+        return 'unchanged'
+
+    def update(self, url, article, etag=None, last_modified=None):
+        """取得した記事を記録して 'new' / 'updated' / 'unchanged' を返す
+
+        記事を出力に書く場合は、書き終えてから呼ぶ（途中で止まっても
+        書いていない記事を「確認済み」にしない）。
+        """
+        previous = self.entries.get(url)
+        change = self.change(url, article)
+        self._append({
+            'url': url,
+            'hash': content_hash(article),
+            'etag': etag,
+            'last_modified': last_modified,
+            'scraped_at': time.time() if change != 'unchanged' else previous['scraped_at'],
+            'checked_at': time.time()
+        })
+        self.counts[change] += 1
+        return change
+
+    def not_modified(self, url, etag=None, last_modified=None):
+        """304 が返ったときに確認時刻（と新しい検証用ヘッダー）だけ更新する"""
+        entry = dict(self.entries[url])
+        entry['checked_at'] = time.time()
+        if etag:
+            entry['etag'] = etag
+        if last_modified:
+            entry['last_modified'] = last_modified
+        self._append(entry)
+        self.counts['unchanged'] += 1
+
+    def compact(self):
+        """URL ごとに最新の1行だけを残して書き直す"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.torn_at = None
+        except:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.lines = len(self.entries)
+
+    def close(self):
+        """古い行が URL 数の2倍を超えていれば詰め直す"""
+        if self.lines > 2 * len(self.entries):
+            self.compact()
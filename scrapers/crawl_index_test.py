@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+crawl_index の確認（一時ディレクトリの索引で新規・変更・途中で止まった書き込みを試す）
+
+    python crawl_index_test.py
+"""
+
+import os
+import sys
+import tempfile
+
+from crawl_index import CrawlIndex
+
+
+def article(content):
+    return {'title': 't', 'content': content, 'timestamp': '', 'category': ''}
+
+
+def check_changes(path):
+    index = CrawlIndex(path)
+    assert index.update('a', article('1')) == 'new'
+    assert index.update('a', article('1')) == 'unchanged'
+    assert index.update('a', article('2')) == 'updated'
+    index = CrawlIndex(path)
+    assert index.change('a', article('2')) == 'unchanged'
+    print("[SUCCESS] new / updated / unchanged")
+
+
+def check_torn_tail(path):
+    index = CrawlIndex(path)
+    index.update('a', article('1'))
+    # 書き込み途中で止まった行
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "b", "hash": "')
+
+    index = CrawlIndex(path)
+    assert sorted(index.entries) == ['a'], sorted(index.entries)
+    index.update('c', article('3'))
+
+    index = CrawlIndex(path)
+    assert sorted(index.entries) == ['a', 'c'], sorted(index.entries)
+    assert index.change('c', article('3')) == 'unchanged'
+    print("[SUCCESS] 途中で止まった最後の行のあとの更新が残る")
+
+
+def check_corrupt_middle(path):
+    index = CrawlIndex(path)
+    index.update('a', article('1'))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{broken\n')
+    index.update('b', article('2'))
+
+    index = CrawlIndex(path)
+    assert sorted(index.entries) == ['a', 'b'], sorted(index.entries)
+    print("[SUCCESS] 途中の読めない行を飛ばして先を読む")
+
+
+def main():
+    print("=== crawl_index 確認 ===")
+    with tempfile.TemporaryDirectory() as directory:
+        check_changes(os.path.join(directory, 'changes.jsonl'))
+        check_torn_tail(os.path.join(directory, 'torn.jsonl'))
+        check_corrupt_middle(os.path.join(directory, 'corrupt.jsonl'))
+    print("[SUCCESS] すべての確認に成功しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
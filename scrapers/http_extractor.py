@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+記事ページをブラウザを使わずに HTTP で取得して抽出する
+
+記事の本文・日時・カテゴリは静的な HTML に含まれていることが多く、
+そのためだけにブラウザでページを開く必要はない。HttpArticleFetcher は
+接続を使い回す requests.Session で HTML を取得し、ブラウザ側と同じ
+セレクターの並び（CONTENT_SELECTORS など）を lxml のコンパイル済み
+CSS セレクターで評価する。本文が空だったときだけ None を返すので、
+呼び出し側はそのときだけブラウザで開き直せばよい。
+
+    fetcher = HttpArticleFetcher(pool_size=4)
+    article = fetcher.fetch(url)        # 取れなければ None（ブラウザで開く）
+    result = fetcher.get(url, {'If-None-Match': etag})   # 条件付き（result.not_modified）
+
+ローカルのページでも確認できる（fixtures/ に本文のある記事と本文が空の記事がある）:
+    python http_extractor_test.py        # fixtures/ を配信して結果を確かめる
+    python -m http.server 8000 --directory fixtures
+    python http_extractor.py http://127.0.0.1:8000/article.html
+
+lxml（と cssselect）がなければ fetch は常に None を返し、すべてブラウザで開く。
+"""
+
+import json
+import sys
+import time
+
+try:
+    from lxml import html as lxml_html
+    from lxml.cssselect import CSSSelector
+    HAVE_LXML = True
+except ImportError:
+    lxml_html = None
+    CSSSelector = None
+    HAVE_LXML = False
+
+# 記事本文（最初に10文字を超える段落が見つかったセレクターを使う）
+CONTENT_SELECTORS = [
+    'div[class*="articleBody"] p',
+    'div[class*="article"] p',
+    '.article-body p',
+    'article p',
+    '.article-main p'
+]
+
+# 日時（最初に文字か datetime 属性が取れた要素）
+TIME_SELECTORS = [
+    'time',
+    '.article-date',
+    '.timestamp',
+    '[class*="time"]',
+    '[class*="date"]'
+]
+
+# カテゴリ（最初に50文字未満の文字が取れた要素）
+CATEGORY_SELECTORS = [
+    '.category',
+    '[class*="category"]',
+    '.breadcrumb a',
+    'nav a'
+]
+
+# ブラウザ側の抽出スクリプトに渡す形
+SELECTORS = {
+    'content': CONTENT_SELECTORS,
+    'time': TIME_SELECTORS,
+    'category': CATEGORY_SELECTORS
+}
+
+# ブラウザで記事ページから本文・日時・カテゴリを取り出す（extract_article と同じ規則）
+ARTICLE_SCRIPT = """
+    (selectors) => {
+        const data = {
+            url: window.location.href,
+            title: document.title || document.querySelector('h1')?.textContent || 'No title',
+            content: '',
+            timestamp: '',
+            category: '',
+            source: 'yahoo_news',
+            scraped_at: Date.now()
+        };
+
+        // 記事本文を取得
+        for (const selector of selectors.content) {
+            const paragraphs = document.querySelectorAll(selector);
+            if (paragraphs.length > 0) {
+                const contentParts = Array.from(paragraphs)
+                    .map(p => p.textContent?.trim())
+                    .filter(text => text && text.length > 10);
+
+                if (contentParts.length > 0) {
+                    data.content = contentParts.join('\\n');
+                    break;
+                }
+            }
+        }
+
+        // タイムスタンプを取得
+        for (const selector of selectors.time) {
+            const timeElement = document.querySelector(selector);
+            if (timeElement) {
+                data.timestamp = timeElement.textContent?.trim() || 
+                                timeElement.getAttribute('datetime') || '';
+                if (data.timestamp) break;
+            }
+        }
+
+        // カテゴリを取得
+        for (const selector of selectors.category) {
+            const categoryElement = document.querySelector(selector);
+            if (categoryElement) {
+                data.category = categoryElement.textContent?.trim() || '';
+                if (data.category && data.category.length < 50) break;
+            }
+        }
+
+        return data;
+    }
+"""
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+_compiled = {}
+
+
+def css(selector):
+    """セレクターをコンパイルして使い回す"""
+    compiled = _compiled.get(selector)
+    if compiled is None:
+        compiled = _compiled[selector] = CSSSelector(selector)
+    return compiled
+
+
+def _text(element):
+    return (element.text_content() or '').strip()
+
+
+def extract_article(html_text, url):
+    """HTML から記事の情報を取り出す（ARTICLE_SCRIPT と同じ規則）"""
+    doc = lxml_html.document_fromstring(html_text)
+    data = {
+        'url': url,
+        'title': '',
+        'content': '',
+        'timestamp': '',
+        'category': '',
+        'source': 'yahoo_news',
+        'scraped_at': int(time.time() * 1000)
+    }
+
+    title = doc.find('.//title')
+    if title is not None:
+        data['title'] = ' '.join((title.text_content() or '').split())
+    if not data['title']:
+        h1 = css('h1')(doc)
+        data['title'] = h1[0].text_content() if h1 else 'No title'
+
+    for selector in CONTENT_SELECTORS:
+        parts = [text for text in (_text(p) for p in css(selector)(doc)) if len(text) > 10]
+        if parts:
+            data['content'] = '\n'.join(parts)
+            break
+
+    for selector in TIME_SELECTORS:
+        found = css(selector)(doc)
+        if found:
+            data['timestamp'] = _text(found[0]) or found[0].get('datetime') or ''
+            if data['timestamp']:
+                break
+
+    for selector in CATEGORY_SELECTORS:
+        found = css(selector)(doc)
+        if found:
+            data['category'] = _text(found[0])
+            if data['category'] and len(data['category']) < 50:
+                break
+
+    return data
+
+
+def read_article(driver, selectors=SELECTORS):
+    """Selenium のドライバーで開いているページから ARTICLE_SCRIPT で取り出す"""
+    return driver.execute_script(f"return ({ARTICLE_SCRIPT})(arguments[0]);", selectors)
+
+
+class HttpResult:
+    """HTTP で取得した結果"""
+
+    def __init__(self):
+        self.status = None
+        # 本文が取れたときの記事（取れなければ None）
+        self.article = None
+        self.etag = None
+        self.last_modified = None
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+
+class HttpArticleFetcher:
+    """接続を使い回して記事を HTTP で取得する"""
+
+    def __init__(self, pool_size=4, timeout=10, user_agent=USER_AGENT):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # HTTP だけで取れた記事数と、ブラウザに回した記事数
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url, headers=None):
+        """記事を取得して HttpResult を返す
+
+        headers に If-None-Match / If-Modified-Since を渡すと条件付きで取得し、
+        変わっていなければ result.not_modified が True になる。
+        """
+        result = HttpResult()
+        if HAVE_LXML:
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                result.status = response.status_code
+                result.etag = response.headers.get('ETag')
+                result.last_modified = response.headers.get('Last-Modified')
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code == 200 and 'html' in content_type:
+                    # 文字コードがヘッダーにあればそれで、なければ meta から判定させる
+                    body = response.text if 'charset' in content_type.lower() else response.content
+                    article = extract_article(body, response.url)
+                    if article['content']:
+                        result.article = article
+            except Exception as e:
+                print(f"[WARN] HTTP取得エラー: {url} {e}")
+
+        if result.article or result.not_modified:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+
+    def fetch(self, url):
+        """記事を取得して返す。本文が取れなければ None（ブラウザで開き直す）"""
+        return self.get(url).article
+
+    def close(self):
+        self.session.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("使い方: python http_extractor.py URL [URL ...]")
+        return
+    fetcher = HttpArticleFetcher()
+    for url in sys.argv[1:]:
+        article = fetcher.fetch(url)
+        if article:
+            print(json.dumps(article, indent=2, ensure_ascii=False))
+        else:
+            print(f"[INFO] 本文が取れませんでした（ブラウザが必要）: {url}")
+    fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
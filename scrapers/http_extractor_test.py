@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+http_extractor の確認（fixtures/ のページをローカルで配信して取得する）
+
+    python http_extractor_test.py
+
+    - article.html       本文が静的な HTML にある記事（HTTP だけで取れる）
+    - article_empty.html 本文をスクリプトで描画する記事（None になり、ブラウザで開き直す）
+"""
+
+import functools
+import os
+import sys
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+from http_extractor import HAVE_LXML, HttpArticleFetcher, extract_article
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures():
+    """fixtures/ を空いているポートで配信して (サーバー, ベースURL) を返す"""
+    handler = functools.partial(_QuietHandler, directory=FIXTURES_DIR)
+    server = HTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def check_extract_article():
+    with open(os.path.join(FIXTURES_DIR, 'article.html'), 'rb') as f:
+        article = extract_article(f.read(), 'http://example.com/article.html')
+    assert article['url'] == 'http://example.com/article.html'
+    assert article['title'] == 'テスト記事の タイトル', article['title']
+    # 10文字以下の段落は本文に含めない
+    assert article['content'] == ('これは十分に長い本文の最初の段落です。\n'
+                                  '二つ目の十分に長い段落がここにあります。'), article['content']
+    assert article['timestamp'] == '9/11(木) 10:00', article['timestamp']
+    assert article['category'] == '政治', article['category']
+    print("[SUCCESS] extract_article: article.html")
+
+
+def check_fetcher(base_url):
+    fetcher = HttpArticleFetcher(pool_size=1, timeout=5)
+    try:
+        result = fetcher.get(f"{base_url}/article.html")
+        assert result.status == 200, result.status
+        assert result.article is not None
+        assert result.article['category'] == '政治'
+        assert result.last_modified, "Last-Modified がない"
+        print("[SUCCESS] HttpArticleFetcher.get: article.html")
+
+        # 変わっていなければ 304（ブラウザで開き直さない）
+        result = fetcher.get(f"{base_url}/article.html",
+                             {'If-Modified-Since': result.last_modified})
+        assert result.not_modified, result.status
+        assert result.article is None
+        print("[SUCCESS] HttpArticleFetcher.get: 304")
+
+        # 本文が空ならブラウザで開き直す
+        result = fetcher.get(f"{base_url}/article_empty.html")
+        assert result.status == 200, result.status
+        assert result.article is None
+        assert fetcher.fetch(f"{base_url}/article_empty.html") is None
+        print("[SUCCESS] HttpArticleFetcher.get: article_empty.html（ブラウザへ）")
+
+        assert fetcher.hits == 2 and fetcher.misses == 2, (fetcher.hits, fetcher.misses)
+    finally:
+        fetcher.close()
+
+
+def main():
+    print("=== http_extractor 確認 ===")
+    if not HAVE_LXML:
+        print("[ERROR] lxml と cssselect が必要です（pip install lxml cssselect）")
+        return 1
+    check_extract_article()
+    server, base_url = serve_fixtures()
+    try:
+        check_fetcher(base_url)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("[SUCCESS] すべての確認に成功しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+トップページの記事リンクをページ内で1回の走査で集め、重複を除いて返す
+
+セレクターごとに querySelectorAll して全部を Python に送り、Python 側で
+重複を除くと、大きなトップページでは同じリンクを何度も直列化して送ることになる。
+HARVEST_SCRIPT はすべてのセレクターをまとめた1回の querySelectorAll で
+要素を1回だけ走査し、正規化した URL ごとに1件だけ残して、
+最初に一致したセレクターを付けたリンクを返す。
+
+並び順はセレクターごとに querySelectorAll していたときと同じ
+（LINK_SELECTORS の順、同じセレクターの中では文書順）。呼び出し側は
+先頭から記事数で切るので、'a[href*="/articles/"]' のリンクが先に来る。
+同じ URL が複数あるときも、より前のセレクターに一致したものを残す。
+
+    result = await page.evaluate(HARVEST_SCRIPT, LINK_OPTIONS)     # Playwright
+    result = harvest_links(driver)                                 # Selenium
+    result['links']    # [{url, title, selector}, ...]（重複なし、セレクター順）
+    result['scanned']  # 走査した要素数
+
+URL の正規化: フラグメントと utm_* などの追跡用パラメーターを除き、
+残りのパラメーターを名前順に並べる。
+"""
+
+# リンクを探すセレクター（selector には最初に一致したものを記録する）
+LINK_SELECTORS = [
+    'a[href*="/articles/"]',
+    'div[class*="newsList"] a',
+    'div[class*="topicsListItem"] a',
+    'article a',
+    '.newsFeed a',
+    '[data-cl-params*="articles"] a'
+]
+
+LINK_OPTIONS = {
+    'selectors': LINK_SELECTORS,
+    # このドメイン（とサブドメイン）のリンクだけ
+    'host': 'yahoo.co.jp',
+    # これより短いテキストのリンクは記事ではないとみなす
+    'minText': 11,
+    # 正規化で取り除くパラメーター（末尾が * なら前方一致）
+    'dropParams': ['utm_*', 'fr', 'ref', 'source']
+}
+
+HARVEST_SCRIPT = """
+    (options) => {
+        const selectors = options.selectors;
+        const drop = options.dropParams.map(p =>
+            p.endsWith('*') ? (name => name.startsWith(p.slice(0, -1))) : (name => name === p));
+
+        const canonical = href => {
+            let url;
+            try {
+                url = new URL(href, document.baseURI);
+            } catch (e) {
+                return null;
+            }
+            if (url.protocol !== 'http:' && url.protocol !== 'https:') return null;
+            const host = url.hostname.toLowerCase();
+            if (host !== options.host && !host.endsWith('.' + options.host)) return null;
+            url.hash = '';
+            const params = [...url.searchParams.entries()]
+                .filter(([name]) => !drop.some(match => match(name)))
+                .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+            url.search = new URLSearchParams(params).toString();
+            return url.href;
+        };
+
+        // URL ごとに (セレクターの順位, 文書順) が最も小さい1件を残す
+        const best = new Map();
+        const elements = document.querySelectorAll(selectors.join(', '));
+        elements.forEach((element, position) => {
+            if (!element.href) return;
+            const url = canonical(element.href);
+            if (!url) return;
+            const rank = selectors.findIndex(selector => element.matches(selector));
+            const kept = best.get(url);
+            if (kept && kept.rank <= rank) return;
+            const title = (element.textContent || '').trim().replace(/\\s+/g, ' ');
+            if (title.length < options.minText) return;
+            best.set(url, {rank: rank, position: position,
+                           link: {url: url, title: title, selector: selectors[rank]}});
+        });
+        const links = [...best.values()]
+            .sort((a, b) => a.rank - b.rank || a.position - b.position)
+            .map(entry => entry.link);
+        return {links: links, scanned: elements.length};
+    }
+"""
+
+
+def harvest_links(driver, options=LINK_OPTIONS):
+    """Selenium のドライバーで HARVEST_SCRIPT を実行する"""
+    return driver.execute_script(f"return ({HARVEST_SCRIPT})(arguments[0]);", options)
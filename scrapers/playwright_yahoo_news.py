@@ -2,20 +2,72 @@
 # -*- coding: utf-8 -*-
 """
 Playwright でYahooニュースデータを収集（学習・研究目的）
+
+記事ページは複数のページで並行して取得する
+（同じホストへのリクエストの間隔と同時接続数は守る）:
+    python playwright_yahoo_news.py --concurrency 4 --max-articles 30
+
+画像・フォント・動画・広告は読み込まず、domcontentloaded と目的の要素を
+待って読み取る（--wait-until networkidle --no-block で従来の読み込み方）。
+
+記事ページはまず HTTP で取得して抽出し、本文が取れなかった記事だけ
+ブラウザで開く（--no-http で常にブラウザ）。
+
+取得した記事は索引（playwright_crawl_index.jsonl）に URL ごとのハッシュと
+ETag / Last-Modified を記録し、新しい記事・変わった記事だけを
+playwright_yahoo_news.jsonl に追記する（--full で索引を使わない）。
+    python playwright_yahoo_news.py --recheck-after 6   # 6時間以内に確認した記事は飛ばす
 """
 
-import json
+import argparse
+import os
+import sys
 import time
 import asyncio
 from playwright.async_api import async_playwright
+from async_crawler import AsyncCrawler
+from resource_blocker import RouteBlocker, TOP_PAGE_READY, ARTICLE_READY
+from http_extractor import HttpArticleFetcher, ARTICLE_SCRIPT, SELECTORS
+from link_harvester import HARVEST_SCRIPT, LINK_OPTIONS
+from crawl_index import CrawlIndex
+
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from episode_store import EpisodeStore
 
 class PlaywrightYahooNewsScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, max_articles=10, host_delay=1.0, host_concurrency=2,
+                 wait_until='domcontentloaded', block_resources=True, ready_timeout=5000,
+                 http_first=True, incremental=True, recheck_after=0,
+                 index_file='playwright_crawl_index.jsonl',
+                 output_file='playwright_yahoo_news.jsonl'):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
         self.news_data = []
+        self.source_url = "https://news.yahoo.co.jp/"
+        # goto で待つ読み込み状態（networkidle 以外なら目的の要素が現れるまでも待つ）
+        self.wait_until = wait_until
+        self.ready_timeout = ready_timeout
+        # 画像・フォント・動画・広告を読み込まない
+        self.blocker = RouteBlocker() if block_resources else None
+        # 前回までに取得した記事の索引（None なら毎回すべて新しい記事として扱う）
+        self.index = CrawlIndex(index_file) if incremental else None
+        # この秒数以内に確認した記事はリクエストしない（0 なら毎回確認する）
+        self.recheck_after = recheck_after
+        # 新しい記事・変わった記事を追記する出力
+        self.output_file = output_file
+        self.store = EpisodeStore(output_file, key='url', score_key='scraped_at')
+        # 記事を並行して開くページ数（1 なら従来どおり1件ずつ）
+        self.concurrency = max(1, concurrency)
+        # 取得する記事数の上限（0 なら見つかった記事すべて）
+        self.max_articles = max_articles
+        # 同じホストへのリクエストの開始間隔（秒）と同時接続数
+        self.host_delay = host_delay
+        self.host_concurrency = host_concurrency
+        # 記事はまず HTTP で取得する（本文が取れなければブラウザで開く）
+        self.http = HttpArticleFetcher(pool_size=self.concurrency) if http_first else None
 
     async def setup_browser(self):
         """ブラウザを起動してスクレイピングの準備をする"""
@@ -39,6 +91,9 @@ class PlaywrightYahooNewsScraper:
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             )
             
+            if self.blocker:
+                await self.blocker.install(self.context)
+            
             # ページを作成
             self.page = await self.context.new_page()
             
@@ -57,183 +112,51 @@ class PlaywrightYahooNewsScraper:
             return False
         
         try:
-            url = "https://news.yahoo.co.jp/"
+            url = self.source_url
             print(f"[INFO] アクセス: {url}")
             
-            await self.page.goto(url)
-            await self.page.wait_for_load_state('networkidle')
+            await self.open_page(self.page, url, TOP_PAGE_READY)
             print("[INFO] ページ読み込み完了")
             
             # ニュース記事のリンクを収集
             print("[INFO] ニュース記事を検索中...")
             
-            news_links = await self.page.evaluate("""
-                () => {
-                    const links = [];
-                    
-                    // 複数のセレクターを試す
-                    const selectors = [
-                        'a[href*="/articles/"]',
-                        'div[class*="newsList"] a',
-                        'div[class*="topicsListItem"] a', 
-                        'article a',
-                        '.newsFeed a',
-                        '[data-cl-params*="articles"] a'
-                    ];
-                    
-                    selectors.forEach(selector => {
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(element => {
-                            const href = element.href;
-                            const text = element.textContent?.trim();
-                            
-                            if (href && href.includes('yahoo.co.jp') && text && text.length > 10) {
-                                links.push({
-                                    url: href,
-                                    title: text,
-                                    selector: selector
-                                });
-                            }
-                        });
-                    });
-                    
-                    return links;
-                }
-            """)
+            # 重複はページ内で除いてあるので、正規化済みの URL が1件ずつ返る
+            harvest = await self.page.evaluate(HARVEST_SCRIPT, LINK_OPTIONS)
+            unique_links = harvest['links']
             
-            print(f"[INFO] {len(news_links)}件のニュースリンクを発見")
+            print(f"[INFO] {len(unique_links)}件のニュースリンクを発見（{harvest['scanned']}要素を走査）")
             
-            # 重複を除去
-            unique_links = []
-            seen_urls = set()
+            # 最近確認した記事はリクエストしない
+            if self.index is not None and self.recheck_after:
+                unique_links = [link for link in unique_links
+                                if not self.index.is_fresh(link['url'], self.recheck_after)]
+                print(f"[INFO] 確認が必要な記事: {len(unique_links)}件")
             
-            for link in news_links:
-                if link['url'] not in seen_urls:
-                    unique_links.append(link)
-                    seen_urls.add(link['url'])
+            # 詳細情報を取得（ページのプールで並行に）
+            if self.max_articles:
+                unique_links = unique_links[:self.max_articles]
+            self.news_data = await self.scrape_articles(unique_links)
             
-            print(f"[INFO] 重複除去後: {len(unique_links)}件")
-            
-            # 詳細情報を取得（最初の10件）
-            max_articles = min(10, len(unique_links))
-            
-            for i in range(max_articles):
-                try:
-                    link = unique_links[i]
-                    print(f"[INFO] 記事 {i+1}/{max_articles} を処理中...")
-                    
-                    # 記事ページにアクセス
-                    await self.page.goto(link['url'])
-                    await self.page.wait_for_load_state('networkidle')
-                    
-                    # 記事の詳細情報を取得
-                    article_data = await self.page.evaluate("""
-                        () => {
-                            const data = {
-                                url: window.location.href,
-                                title: document.title || document.querySelector('h1')?.textContent || 'No title',
-                                content: '',
-                                timestamp: '',
-                                category: '',
-                                source: 'yahoo_news',
-                                scraped_at: Date.now()
-                            };
-                            
-                            // 記事本文を取得
-                            const contentSelectors = [
-                                'div[class*="articleBody"] p',
-                                'div[class*="article"] p',
-                                '.article-body p',
-                                'article p',
-                                '.article-main p'
-                            ];
-                            
-                            for (const selector of contentSelectors) {
-                                const paragraphs = document.querySelectorAll(selector);
-                                if (paragraphs.length > 0) {
-                                    const contentParts = Array.from(paragraphs)
-                                        .map(p => p.textContent?.trim())
-                                        .filter(text => text && text.length > 10);
-                                    
-                                    if (contentParts.length > 0) {
-                                        data.content = contentParts.join('\\n');
-                                        break;
-                                    }
-                                }
-                            }
-                            
-                            // タイムスタンプを取得
-                            const timeSelectors = [
-                                'time',
-                                '.article-date',
-                                '.timestamp',
-                                '[class*="time"]',
-                                '[class*="date"]'
-                            ];
-                            
-                            for (const selector of timeSelectors) {
-                                const timeElement = document.querySelector(selector);
-                                if (timeElement) {
-                                    data.timestamp = timeElement.textContent?.trim() || 
-                                                    timeElement.getAttribute('datetime') || '';
-                                    if (data.timestamp) break;
-                                }
-                            }
-                            
-                            // カテゴリを取得
-                            const categorySelectors = [
-                                '.category',
-                                '[class*="category"]',
-                                '.breadcrumb a',
-                                'nav a'
-                            ];
-                            
-                            for (const selector of categorySelectors) {
-                                const categoryElement = document.querySelector(selector);
-                                if (categoryElement) {
-                                    data.category = categoryElement.textContent?.trim() || '';
-                                    if (data.category && data.category.length < 50) break;
-                                }
-                            }
-                            
-                            return data;
-                        }
-                    """)
-                    
-                    self.news_data.append(article_data)
-                    print(f"[SUCCESS] 記事収集完了: {article_data['title'][:50]}...")
-                    
-                    # 少し待機（サーバー負荷軽減）
-                    await asyncio.sleep(1)
-                    
-                except Exception as e:
-                    print(f"[WARN] 記事処理エラー: {e}")
-                    continue
-            
-            # 結果をファイルに保存
-            result = {
-                'tool': 'playwright',
-                'success': len(self.news_data) > 0,
-                'timestamp': time.time(),
-                'total_articles': len(self.news_data),
-                'articles': self.news_data,
-                'source_url': url
-            }
-            
-            output_file = 'playwright_yahoo_news.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            # 新しい記事・変わった記事は record で取得するたびに追記済み
+            unchanged = self.index.counts['unchanged'] if self.index is not None else 0
             
             print(f"\n[SUMMARY] Playwright収集結果:")
-            print(f"  - 総記事数: {len(self.news_data)}")
-            print(f"  - 保存ファイル: {output_file}")
+            print(f"  - 新しい記事・変わった記事: {len(self.news_data)}")
+            print(f"  - 変更なし: {unchanged}")
+            print(f"  - 保存ファイル: {self.output_file}（累計 {len(self.store)}件）")
+            if self.http:
+                print(f"  - HTTPで取得: {self.http.hits}件 / ブラウザで取得: {self.http.misses}件")
+            if self.blocker:
+                print(f"  - 読み込みを止めたリクエスト: {self.blocker.blocked}/"
+                      f"{self.blocker.blocked + self.blocker.allowed}")
             
             for i, article in enumerate(self.news_data[:5]):
                 print(f"  [{i+1}] {article['title'][:60]}...")
             
             await self.cleanup()
             
-            if len(self.news_data) > 0:
+            if len(self.news_data) > 0 or unchanged > 0:
                 print(f"\n[SUCCESS] Playwrightによるニュース収集が成功しました！")
                 return True
             else:
@@ -245,9 +168,87 @@ class PlaywrightYahooNewsScraper:
             await self.cleanup()
             return False
 
+    async def open_page(self, page, url, ready_selector):
+        """url を開き、ready_selector の要素が現れるまで待つ
+
+        要素が現れなくてもタイムアウト後にそのまま進む（取れた分だけ読む）。
+        """
+        await page.goto(url, wait_until=self.wait_until)
+        if self.wait_until != 'networkidle' and ready_selector:
+            try:
+                await page.wait_for_selector(ready_selector, state='attached',
+                                             timeout=self.ready_timeout)
+            except Exception:
+                pass
+
+    async def fetch_article(self, page, link):
+        """記事の詳細情報を取得（HTTP で取れなければページを開く）
+
+        新しい記事・変わった記事なら返し、変わっていなければ None。
+        """
+        url = link['url']
+        article_data = None
+        etag = last_modified = None
+        if self.http:
+            headers = self.index.validators(url) if self.index is not None else None
+            result = await asyncio.to_thread(self.http.get, url, headers)
+            if result.not_modified and self.index is not None and url in self.index:
+                self.index.not_modified(url, result.etag, result.last_modified)
+                print(f"[INFO] 変更なし（304）: {url}")
+                return None
+            article_data = result.article
+            etag, last_modified = result.etag, result.last_modified
+            if article_data:
+                print(f"[SUCCESS] 記事収集完了（HTTP）: {article_data['title'][:50]}...")
+        
+        if not article_data:
+            await self.open_page(page, url, ARTICLE_READY)
+            article_data = await page.evaluate(ARTICLE_SCRIPT, SELECTORS)
+            print(f"[SUCCESS] 記事収集完了: {article_data['title'][:50]}...")
+        return self.record(url, article_data, etag, last_modified)
+
+    def record(self, url, article_data, etag=None, last_modified=None):
+        """新しい記事・変わった記事なら出力に追記してから索引に記録し、change を付けて返す"""
+        change = self.index.change(url, article_data) if self.index is not None else 'new'
+        if change != 'unchanged':
+            article_data['change'] = change
+            article_data['source_url'] = self.source_url
+            self.store.append(article_data)
+        if self.index is not None:
+            self.index.update(url, article_data, etag, last_modified)
+        return article_data if change != 'unchanged' else None
+
+    async def scrape_articles(self, links):
+        """記事を並行して取得し、links の順に返す（取得できなかった記事は除く）
+
+        ホストごとの間隔は AsyncCrawler が守るので、記事ごとの待機はしない。
+        """
+        print(f"[INFO] {len(links)}件の記事を {self.concurrency} ページで取得中...")
+        crawler = AsyncCrawler(self.fetch_article,
+                               host_delay=self.host_delay,
+                               host_concurrency=self.host_concurrency)
+        # トップページに使ったページもプールに入れる
+        pages = [self.page]
+        for _ in range(min(self.concurrency, len(links)) - 1):
+            pages.append(await self.context.new_page())
+        
+        start = time.time()
+        results = await crawler.run(links, pages, key=lambda link: link['url'])
+        
+        for link, e in crawler.errors:
+            print(f"[WARN] 記事処理エラー: {link['url']} {e}")
+        articles = [article for article in results if article]
+        print(f"[INFO] 記事確認: {len(links)}件（新規・更新 {len(articles)}件, "
+              f"エラー {len(crawler.errors)}件, {time.time() - start:.1f}秒）")
+        return articles
+
     async def cleanup(self):
         """リソースをクリーンアップ"""
         try:
+            if self.http:
+                self.http.close()
+            if self.index is not None:
+                self.index.close()
             if self.context:
                 await self.context.close()
             if self.browser:
@@ -260,9 +261,37 @@ class PlaywrightYahooNewsScraper:
 
 async def main():
     """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="Playwright Yahoo!ニュース収集")
+    parser.add_argument("--concurrency", type=int, default=4, help="記事を並行して開くページ数")
+    parser.add_argument("--max-articles", type=int, default=10, help="取得する記事数（0 ですべて）")
+    parser.add_argument("--host-delay", type=float, default=1.0,
+                        help="同じホストへのリクエストの開始間隔（秒）")
+    parser.add_argument("--host-concurrency", type=int, default=2,
+                        help="同じホストへの同時接続数")
+    parser.add_argument("--wait-until", default="domcontentloaded",
+                        choices=["domcontentloaded", "load", "networkidle"],
+                        help="ページを開くときに待つ読み込み状態")
+    parser.add_argument("--no-block", action="store_true",
+                        help="画像・フォント・広告なども読み込む")
+    parser.add_argument("--no-http", action="store_true",
+                        help="記事ページも常にブラウザで開く")
+    parser.add_argument("--full", action="store_true",
+                        help="索引を使わず、取得した記事をすべて追記する")
+    parser.add_argument("--recheck-after", type=float, default=0,
+                        help="この時間（時間単位）以内に確認した記事は飛ばす")
+    args = parser.parse_args()
+    
     print("Playwright Yahoo!ニュース収集を開始します...\n")
     
-    scraper = PlaywrightYahooNewsScraper()
+    scraper = PlaywrightYahooNewsScraper(concurrency=args.concurrency,
+                                         max_articles=args.max_articles,
+                                         host_delay=args.host_delay,
+                                         host_concurrency=args.host_concurrency,
+                                         wait_until=args.wait_until,
+                                         block_resources=not args.no_block,
+                                         http_first=not args.no_http,
+                                         incremental=not args.full,
+                                         recheck_after=args.recheck_after * 3600)
     success = await scraper.scrape_yahoo_news()
     
     if success:
@@ -1,125 +1,39 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-ChromeDriverの最新版を直接ダウンロードしてテスト
+ChromeDriverを用意してテスト（キャッシュ済みならネットワークを使わない）
 """
 
-import requests
-import zipfile
 import os
-import tempfile
+import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 import json
 import time
 
-def get_chrome_version():
-    """現在のChromeバージョンを取得"""
-    import subprocess
-    try:
-        # Windows版Chrome
-        result = subprocess.run([
-            'reg', 'query', 
-            'HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon',
-            '/v', 'version'
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                if 'version' in line:
-                    version = line.split()[-1]
-                    return version
-    except:
-        pass
-    
-    # 代替手段：Chrome実行ファイルから
-    try:
-        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-        result = subprocess.run([chrome_path, '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            version = result.stdout.strip().split()[-1]
-            return version
-    except:
-        pass
-    
-    return "139.0.7258.155"  # デフォルト値（エラーメッセージから取得）
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from driver_cache import get_driver, chrome_version, major_version
 
-def download_latest_chromedriver():
-    """最新のChromeDriverをダウンロード"""
+def prepare_chromedriver():
+    """Chromeに合うChromeDriverを用意（キャッシュにあればダウンロードしない）"""
     print("[INFO] Chromeバージョンを確認中...")
-    chrome_version = get_chrome_version()
-    major_version = chrome_version.split('.')[0]
-    print(f"[INFO] Chromeバージョン: {chrome_version} (メジャー: {major_version})")
+    version = chrome_version()
+    major = major_version(version)
+    print(f"[INFO] Chromeバージョン: {version} (メジャー: {major})")
     
-    # ChromeDriver APIから最新バージョンを取得
-    try:
-        print("[INFO] 最新ChromeDriverバージョンを取得中...")
-        api_url = f"https://googlechromelabs.github.io/chrome-for-testing/last-known-good-versions-with-downloads.json"
-        response = requests.get(api_url, timeout=10)
-        data = response.json()
-        
-        # Stableバージョンを取得
-        stable_version = data['channels']['Stable']['version']
-        downloads = data['channels']['Stable']['downloads']['chromedriver']
-        
-        # Windows版を探す
-        win64_url = None
-        for download in downloads:
-            if download['platform'] == 'win64':
-                win64_url = download['url']
-                break
-        
-        if not win64_url:
-            raise Exception("Windows版ChromeDriverが見つかりません")
-        
-        print(f"[INFO] 最新ChromeDriverバージョン: {stable_version}")
-        print(f"[INFO] ダウンロード URL: {win64_url}")
-        
-        # 一時ディレクトリにダウンロード
-        temp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(temp_dir, 'chromedriver.zip')
-        
-        print("[INFO] ChromeDriverをダウンロード中...")
-        with requests.get(win64_url, stream=True, timeout=30) as r:
-            r.raise_for_status()
-            with open(zip_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        
-        # ZIPファイルを展開
-        extract_path = os.path.join(temp_dir, 'extracted')
-        os.makedirs(extract_path, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_path)
-        
-        # chromedriver.exeのパスを見つける
-        chromedriver_path = None
-        for root, dirs, files in os.walk(extract_path):
-            for file in files:
-                if file == 'chromedriver.exe':
-                    chromedriver_path = os.path.join(root, file)
-                    break
-            if chromedriver_path:
-                break
-        
-        if not chromedriver_path:
-            raise Exception("chromedriver.exeが見つかりません")
-        
+    chromedriver_path = get_driver(major)
+    if chromedriver_path:
         print(f"[SUCCESS] ChromeDriver準備完了: {chromedriver_path}")
-        return chromedriver_path
-        
-    except Exception as e:
-        print(f"[ERROR] ChromeDriverダウンロードエラー: {e}")
-        return None
+    return chromedriver_path
 
 def test_with_latest_driver():
-    """最新のChromeDriverでテスト"""
-    print("\n=== 最新ChromeDriverでテスト ===")
+    """Chromeに合うChromeDriverでテスト"""
+    print("\n=== ChromeDriverテスト ===")
     
-    # 最新のChromeDriverをダウンロード
-    driver_path = download_latest_chromedriver()
+    # Chromeに合うChromeDriverを用意
+    driver_path = prepare_chromedriver()
     
     if not driver_path:
         print("[ERROR] ChromeDriverが取得できませんでした")
@@ -190,7 +104,7 @@ def test_with_latest_driver():
         # 結果保存
         result = {
             'success': True,
-            'chrome_version': get_chrome_version(),
+            'chrome_version': chrome_version(),
             'chromedriver_path': driver_path,
             'log_count': len(logs),
             'logs': logs
@@ -213,7 +127,7 @@ def test_with_latest_driver():
         return False
 
 if __name__ == "__main__":
-    print("ChromeDriverの最新版を取得してテストします...\n")
+    print("ChromeDriverを用意してテストします...\n")
     success = test_with_latest_driver()
     
     if success:
@@ -1,121 +1,38 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Chrome 139に対応するChromeDriverをダウンロードしてテスト
+インストール済みのChromeに対応するChromeDriverを用意してテスト
 """
 
-import requests
-import zipfile
 import os
-import tempfile
-import subprocess
+import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 import json
 import time
 
-def download_chromedriver_for_version(chrome_version):
-    """指定されたChromeバージョンに対応するChromeDriverをダウンロード"""
-    major_version = chrome_version.split('.')[0]  # 139
-    print(f"[INFO] Chrome {major_version} に対応するChromeDriverを検索中...")
-    
-    try:
-        # Chrome for Testing APIから該当バージョンを取得
-        api_url = "https://googlechromelabs.github.io/chrome-for-testing/known-good-versions-with-downloads.json"
-        response = requests.get(api_url, timeout=15)
-        data = response.json()
-        
-        # バージョン139系を探す
-        target_version = None
-        for version_info in data['versions']:
-            if version_info['version'].startswith(f"{major_version}."):
-                if 'chromedriver' in version_info['downloads']:
-                    target_version = version_info
-                    break
-        
-        if not target_version:
-            print(f"[ERROR] Chrome {major_version} 対応のChromeDriverが見つかりません")
-            return None
-        
-        version_number = target_version['version']
-        print(f"[INFO] 対応するChromeDriverバージョン: {version_number}")
-        
-        # Windows版のURLを取得
-        chromedriver_downloads = target_version['downloads']['chromedriver']
-        win64_url = None
-        
-        for download in chromedriver_downloads:
-            if download['platform'] == 'win64':
-                win64_url = download['url']
-                break
-        
-        if not win64_url:
-            print("[ERROR] Windows版が見つかりません")
-            return None
-        
-        print(f"[INFO] ダウンロード URL: {win64_url}")
-        
-        # ダウンロードと展開
-        temp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(temp_dir, 'chromedriver.zip')
-        
-        print("[INFO] ダウンロード中...")
-        with requests.get(win64_url, stream=True, timeout=30) as r:
-            r.raise_for_status()
-            with open(zip_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        
-        # 展開
-        extract_path = os.path.join(temp_dir, 'extracted')
-        os.makedirs(extract_path, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_path)
-        
-        # chromedriver.exeを探す
-        chromedriver_path = None
-        for root, dirs, files in os.walk(extract_path):
-            for file in files:
-                if file == 'chromedriver.exe':
-                    chromedriver_path = os.path.join(root, file)
-                    break
-            if chromedriver_path:
-                break
-        
-        if chromedriver_path:
-            print(f"[SUCCESS] ChromeDriver準備完了: {chromedriver_path}")
-            return chromedriver_path
-        else:
-            print("[ERROR] chromedriver.exeが見つかりません")
-            return None
-        
-    except Exception as e:
-        print(f"[ERROR] ダウンロードエラー: {e}")
-        return None
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from driver_cache import get_driver, major_version, chrome_version as detect_chrome_version
 
-def get_chrome_version_simple():
-    """Chromeバージョンを取得（簡略版）"""
-    try:
-        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-        result = subprocess.run([chrome_path, '--version'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version_line = result.stdout.strip()
-            # "Google Chrome 139.0.7258.155" から "139.0.7258.155" を抽出
-            version = version_line.split()[-1]
-            return version
-    except:
-        pass
+def download_chromedriver_for_version(chrome_version):
+    """指定されたChromeバージョンに対応するChromeDriverを用意（キャッシュにあればそれを使う）"""
+    major = major_version(chrome_version)  # 139
+    print(f"[INFO] Chrome {major} に対応するChromeDriverを検索中...")
     
-    return "139.0.7258.155"  # デフォルト
+    chromedriver_path = get_driver(major)
+    if chromedriver_path:
+        print(f"[SUCCESS] ChromeDriver準備完了: {chromedriver_path}")
+    else:
+        print(f"[ERROR] Chrome {major} 対応のChromeDriverが見つかりません")
+    return chromedriver_path
 
 def test_f12_logs_matched():
     """バージョンマッチしたChromeDriverでF12ログテスト"""
     print("\n=== バージョンマッチテスト ===")
     
-    chrome_version = get_chrome_version_simple()
+    chrome_version = detect_chrome_version()
     print(f"[INFO] 現在のChromeバージョン: {chrome_version}")
     
     driver_path = download_chromedriver_for_version(chrome_version)
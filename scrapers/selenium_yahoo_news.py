@@ -2,105 +2,103 @@
 # -*- coding: utf-8 -*-
 """
 Selenium でYahooニュースデータを収集（学習・研究目的）
+
+画像・フォント・動画・広告は読み込まず（CDP の Network.setBlockedURLs）、
+固定の sleep ではなく目的の要素が現れるまで待って読み取る。
+記事ページはまず HTTP で取得して抽出し、本文が取れなかった記事だけ
+ブラウザで開く。
+取得した記事は索引（selenium_crawl_index.jsonl）と比べ、新しい記事・
+変わった記事だけを selenium_yahoo_news.jsonl に追記する。
+    python selenium_yahoo_news.py [--no-block] [--no-http] [--full] [--recheck-after 時間]
 """
 
-import requests
-import zipfile
 import os
-import tempfile
-import subprocess
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import json
+import argparse
 import time
 import re
+import sys
+from selenium.common.exceptions import TimeoutException
 
-def get_chrome_version():
-    """Chromeバージョン取得"""
-    try:
-        chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-        result = subprocess.run([chrome_path, '--version'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version = result.stdout.strip().split()[-1]
-            return version
-    except:
-        pass
-    return "139.0.7258.155"
-
-def download_chromedriver():
-    """ChromeDriverをダウンロード"""
-    chrome_version = get_chrome_version()
-    major_version = chrome_version.split('.')[0]
-    
-    try:
-        api_url = "https://googlechromelabs.github.io/chrome-for-testing/known-good-versions-with-downloads.json"
-        response = requests.get(api_url, timeout=15)
-        data = response.json()
-        
-        for version_info in data['versions']:
-            if version_info['version'].startswith(f"{major_version}."):
-                if 'chromedriver' in version_info['downloads']:
-                    for download in version_info['downloads']['chromedriver']:
-                        if download['platform'] == 'win64':
-                            temp_dir = tempfile.mkdtemp()
-                            zip_path = os.path.join(temp_dir, 'chromedriver.zip')
-                            
-                            with requests.get(download['url'], stream=True, timeout=30) as r:
-                                r.raise_for_status()
-                                with open(zip_path, 'wb') as f:
-                                    for chunk in r.iter_content(chunk_size=8192):
-                                        f.write(chunk)
-                            
-                            extract_path = os.path.join(temp_dir, 'extracted')
-                            os.makedirs(extract_path, exist_ok=True)
-                            
-                            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                                zip_ref.extractall(extract_path)
-                            
-                            for root, dirs, files in os.walk(extract_path):
-                                for file in files:
-                                    if file == 'chromedriver.exe':
-                                        return os.path.join(root, file)
-                            break
-                    break
-    except Exception as e:
-        print(f"[ERROR] ChromeDriverダウンロード失敗: {e}")
-    return None
+# リポジトリ直下の共通モジュールを読み込む
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from browser_factory import create_driver
+from driver_cache import get_driver
+from resource_blocker import block_urls, TOP_PAGE_READY, ARTICLE_READY
+from http_extractor import HttpArticleFetcher, read_article
+from crawl_index import CrawlIndex
+from link_harvester import harvest_links
+from episode_store import EpisodeStore
 
 class SeleniumYahooNewsScraper:
-    def __init__(self):
+    def __init__(self, block_resources=True, ready_timeout=5, http_first=True,
+                 incremental=True, recheck_after=0,
+                 index_file='selenium_crawl_index.jsonl',
+                 output_file='selenium_yahoo_news.jsonl'):
         self.driver = None
         self.news_data = []
+        self.source_url = "https://news.yahoo.co.jp/"
+        # 前回までに取得した記事の索引（None なら毎回すべて新しい記事として扱う）
+        self.index = CrawlIndex(index_file) if incremental else None
+        # この秒数以内に確認した記事はリクエストしない（0 なら毎回確認する）
+        self.recheck_after = recheck_after
+        # 新しい記事・変わった記事を追記する出力
+        self.output_file = output_file
+        self.store = EpisodeStore(output_file, key='url', score_key='scraped_at')
+        # 記事はまず HTTP で取得する（本文が取れなければブラウザで開く）
+        self.http = HttpArticleFetcher() if http_first else None
+        # 画像・フォント・動画・広告を読み込まない
+        self.block_resources = block_resources
+        self.ready_timeout = ready_timeout
         
     def setup_browser(self):
         """ブラウザセットアップ"""
         print("[INFO] Seleniumでブラウザを起動...")
         
-        driver_path = download_chromedriver()
+        driver_path = get_driver()
         if not driver_path:
             print("[ERROR] ChromeDriverが取得できません")
             return False
         
-        options = Options()
-        options.add_argument('--headless')  # バックグラウンド実行
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        user_agent = '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         
         try:
             service = Service(driver_path)
-            self.driver = webdriver.Chrome(service=service, options=options)
+            # 記事一覧は DOM ができれば取れるので画像などの読み込みは待たない
+            self.driver = create_driver(eager=True, extra_args=[user_agent], service=service)
+            if self.block_resources:
+                block_urls(self.driver)
             print("[SUCCESS] ブラウザ起動成功")
             return True
         except Exception as e:
             print(f"[ERROR] ブラウザ起動エラー: {e}")
             return False
     
+    def open_page(self, url, ready_selector):
+        """url を開き、ready_selector の要素が現れるまで待つ（現れなくても進む）"""
+        self.driver.get(url)
+        try:
+            WebDriverWait(self.driver, self.ready_timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector)))
+        except TimeoutException:
+            pass
+    
+    def record(self, url, article_data, etag=None, last_modified=None):
+        """索引と比べて、新しい記事・変わった記事なら出力に追記してから索引に記録する"""
+        change = self.index.change(url, article_data) if self.index is not None else 'new'
+        if change == 'unchanged':
+            print(f"[INFO] 変更なし: {url}")
+        else:
+            article_data['change'] = change
+            article_data['source_url'] = self.source_url
+            self.store.append(article_data)
+            self.news_data.append(article_data)
+        if self.index is not None:
+            self.index.update(url, article_data, etag, last_modified)
+    
     def scrape_yahoo_news(self):
         """Yahooニュースをスクレイピング"""
         print("\n=== Selenium Yahooニュース収集 ===")
@@ -109,139 +107,78 @@ class SeleniumYahooNewsScraper:
             return False
         
         try:
-            url = "https://news.yahoo.co.jp/"
+            url = self.source_url
             print(f"[INFO] アクセス: {url}")
             
-            self.driver.get(url)
-            time.sleep(3)  # ページ読み込み待機
+            self.open_page(url, TOP_PAGE_READY)
             
             print("[INFO] ニュース記事を検索中...")
             
-            # ニュース記事のリンクを取得
-            news_links = []
-            
-            # 複数のセレクターを試す
-            selectors = [
-                'a[href*="/articles/"]',  # Yahoo記事リンク
-                'div[class*="newsList"] a',
-                'div[class*="topicsListItem"] a',
-                'article a',
-                '.newsFeed a'
-            ]
-            
-            for selector in selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements[:20]:  # 最初の20件
-                        href = element.get_attribute('href')
-                        text = element.get_attribute('textContent') or element.text
-                        if href and 'yahoo.co.jp' in href and text.strip():
-                            news_links.append({
-                                'url': href,
-                                'title': text.strip(),
-                                'selector': selector
-                            })
-                except Exception as e:
-                    continue
-            
-            print(f"[INFO] {len(news_links)}件のニュースリンクを発見")
+            # ニュース記事のリンクを取得（重複はページ内で除く）
+            harvest = harvest_links(self.driver)
+            unique_links = harvest['links']
             
-            # 重複を除去
-            unique_links = []
-            seen_urls = set()
-            for link in news_links:
-                if link['url'] not in seen_urls:
-                    unique_links.append(link)
-                    seen_urls.add(link['url'])
+            print(f"[INFO] {len(unique_links)}件のニュースリンクを発見（{harvest['scanned']}要素を走査）")
             
-            print(f"[INFO] 重複除去後: {len(unique_links)}件")
+            # 最近確認した記事はリクエストしない
+            if self.index is not None and self.recheck_after:
+                unique_links = [link for link in unique_links
+                                if not self.index.is_fresh(link['url'], self.recheck_after)]
+                print(f"[INFO] 確認が必要な記事: {len(unique_links)}件")
             
             # 詳細情報を取得（最初の10件）
             for i, link in enumerate(unique_links[:10]):
                 try:
                     print(f"[INFO] 記事 {i+1}/{min(10, len(unique_links))} を処理中...")
                     
-                    # 記事ページにアクセス
-                    self.driver.get(link['url'])
-                    time.sleep(2)
-                    
-                    # 記事の詳細情報を取得
-                    article_data = {
-                        'url': link['url'],
-                        'title': link['title'],
-                        'content': '',
-                        'timestamp': '',
-                        'category': '',
-                        'source': 'yahoo_news',
-                        'scraped_at': time.time()
-                    }
-                    
-                    # 記事本文を取得
-                    content_selectors = [
-                        'div[class*="articleBody"] p',
-                        'div[class*="article"] p',
-                        '.article-body p',
-                        'article p'
-                    ]
-                    
-                    for selector in content_selectors:
-                        try:
-                            paragraphs = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                            if paragraphs:
-                                content_parts = [p.text.strip() for p in paragraphs if p.text.strip()]
-                                if content_parts:
-                                    article_data['content'] = '\n'.join(content_parts)
-                                    break
-                        except:
+                    etag = last_modified = None
+                    if self.http:
+                        headers = self.index.validators(link['url']) if self.index is not None else None
+                        result = self.http.get(link['url'], headers)
+                        if result.not_modified and self.index is not None and link['url'] in self.index:
+                            self.index.not_modified(link['url'], result.etag, result.last_modified)
+                            print(f"[INFO] 変更なし（304）: {link['url']}")
+                            continue
+                        etag, last_modified = result.etag, result.last_modified
+                        article_data = result.article
+                        if article_data:
+                            article_data.update(title=link['title'], scraped_at=time.time())
+                            print(f"[SUCCESS] 記事収集完了（HTTP）: {article_data['title'][:50]}...")
+                            self.record(link['url'], article_data, etag, last_modified)
                             continue
                     
-                    # タイムスタンプを取得
-                    time_selectors = [
-                        'time',
-                        '.article-date',
-                        '.timestamp',
-                        '[class*="time"]'
-                    ]
+                    # 記事ページにアクセス
+                    self.open_page(link['url'], ARTICLE_READY)
                     
-                    for selector in time_selectors:
-                        try:
-                            time_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            article_data['timestamp'] = time_element.text.strip()
-                            break
-                        except:
-                            continue
+                    # 記事の詳細情報を取得（HTTP のときと同じ規則・同じ項目で取り出す）
+                    article_data = read_article(self.driver)
+                    article_data.update(url=link['url'], title=link['title'], scraped_at=time.time())
                     
-                    self.news_data.append(article_data)
                     print(f"[SUCCESS] 記事収集完了: {article_data['title'][:50]}...")
+                    self.record(link['url'], article_data, etag, last_modified)
                     
                 except Exception as e:
                     print(f"[WARN] 記事処理エラー: {e}")
                     continue
             
-            # 結果をファイルに保存
-            result = {
-                'tool': 'selenium',
-                'success': len(self.news_data) > 0,
-                'timestamp': time.time(),
-                'total_articles': len(self.news_data),
-                'articles': self.news_data,
-                'source_url': url
-            }
-            
-            output_file = 'selenium_yahoo_news.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            unchanged = self.index.counts['unchanged'] if self.index is not None else 0
+            if self.index is not None:
+                self.index.close()
             
             print(f"\n[SUMMARY] Selenium収集結果:")
-            print(f"  - 総記事数: {len(self.news_data)}")
-            print(f"  - 保存ファイル: {output_file}")
+            print(f"  - 新しい記事・変わった記事: {len(self.news_data)}")
+            print(f"  - 変更なし: {unchanged}")
+            print(f"  - 保存ファイル: {self.output_file}（累計 {len(self.store)}件）")
+            if self.http:
+                print(f"  - HTTPで取得: {self.http.hits}件 / ブラウザで取得: {self.http.misses}件")
+                self.http.close()
             
             for i, article in enumerate(self.news_data[:5]):
                 print(f"  [{i+1}] {article['title'][:60]}...")
             
             self.driver.quit()
             
-            if len(self.news_data) > 0:
+            if len(self.news_data) > 0 or unchanged > 0:
                 print(f"\n[SUCCESS] Seleniumによるニュース収集が成功しました！")
                 return True
             else:
@@ -255,8 +192,22 @@ class SeleniumYahooNewsScraper:
             return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Selenium Yahoo!ニュース収集")
+    parser.add_argument("--no-block", action="store_true",
+                        help="画像・フォント・広告なども読み込む")
+    parser.add_argument("--no-http", action="store_true",
+                        help="記事ページも常にブラウザで開く")
+    parser.add_argument("--full", action="store_true",
+                        help="索引を使わず、取得した記事をすべて追記する")
+    parser.add_argument("--recheck-after", type=float, default=0,
+                        help="この時間（時間単位）以内に確認した記事は飛ばす")
+    args = parser.parse_args()
+    
     print("Selenium Yahoo!ニュース収集を開始します...\n")
-    scraper = SeleniumYahooNewsScraper()
+    scraper = SeleniumYahooNewsScraper(block_resources=not args.no_block,
+                                       http_first=not args.no_http,
+                                       incremental=not args.full,
+                                       recheck_after=args.recheck_after * 3600)
     success = scraper.scrape_yahoo_news()
     
     if success:
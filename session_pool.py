@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動済みのブラウザを使い回すセッションプール
+
+Chromeの起動には数秒かかるので、エピソードやステージごとに
+webdriver.Chrome を作り直さず、起動済みのセッションを貸し出す。
+返却時にはページの状態をリセットし、次の利用者に渡す前に
+セッションが生きているかを確認する。max_uses 回使ったセッションは
+メモリリーク対策として作り直す。
+
+    pool = SessionPool(create_driver, size=1, max_uses=20)
+    for episode in range(10):
+        with pool.session(game_url) as driver:
+            play(driver)
+    pool.close()
+
+リセット方法（reset）:
+    'reload'  - ページを再読み込み（既定）
+    'script'  - reset_script（例: 'resetGame()'）を実行。失敗したら再読み込み
+    'storage' - localStorage / sessionStorage を消してから再読み込み
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+CLEAR_STORAGE_SCRIPT = """
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledSession:
+    """プール内のセッション（ドライバーと利用回数）"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created = time.time()
+
+
+class SessionPool:
+    """WebDriverセッションのプール"""
+
+    def __init__(self, factory, size=1, max_uses=20, reset='reload', reset_script=None):
+        if reset not in ('reload', 'script', 'storage'):
+            raise ValueError(f"不明なリセット方法: {reset}")
+        if reset == 'script' and not reset_script:
+            raise ValueError("reset='script' には reset_script が必要です")
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.reset = reset
+        self.reset_script = reset_script
+        self.idle = []
+        self.created = 0
+        self.recycled = 0
+        self.closed = False
+        self.lock = threading.Condition()
+
+    def warm(self):
+        """size 個のセッションを先に起動しておく"""
+        while True:
+            with self.lock:
+                if self.created >= self.size:
+                    return
+                self.created += 1
+            session = self._create()
+            with self.lock:
+                self.idle.append(session)
+                self.lock.notify()
+
+    def _create(self):
+        try:
+            return PooledSession(self.factory())
+        except:
+            with self.lock:
+                self.created -= 1
+                self.lock.notify()
+            raise
+
+    def _discard(self, session):
+        try:
+            session.driver.quit()
+        except:
+            pass
+        with self.lock:
+            self.created -= 1
+            self.lock.notify()
+
+    def is_healthy(self, session):
+        """セッションが応答するか確認"""
+        try:
+            return session.driver.execute_script("return 1;") == 1
+        except:
+            return False
+
+    def acquire(self, timeout=None):
+        """セッションを借りる（空きがなければ返却を待つ）"""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self.lock:
+                if self.closed:
+                    raise RuntimeError("プールは閉じられています")
+                if self.idle:
+                    session = self.idle.pop()
+                elif self.created < self.size:
+                    self.created += 1
+                    session = None
+                else:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("空きセッションがありません")
+                    self.lock.wait(remaining)
+                    continue
+
+            if session is None:
+                session = self._create()
+            elif not self.is_healthy(session):
+                # 応答しないセッションは作り直す
+                self._discard(session)
+                continue
+
+            session.uses += 1
+            return session
+
+    def release(self, session):
+        """セッションを返す（使用回数が上限なら作り直す）"""
+        if self.closed or session.uses >= self.max_uses or not self.is_healthy(session):
+            self.recycled += 1
+            self._discard(session)
+            return
+        with self.lock:
+            self.idle.append(session)
+            self.lock.notify()
+
+    def open(self, driver, url):
+        """url を開く（すでに開いていればリセットだけ行う）"""
+        try:
+            current = driver.current_url
+        except:
+            current = None
+
+        if current != url:
+            driver.get(url)
+            return
+
+        if self.reset == 'script':
+            try:
+                driver.execute_script(self.reset_script)
+                return
+            except:
+                pass
+        elif self.reset == 'storage':
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        driver.refresh()
+
+    @contextmanager
+    def session(self, url=None, timeout=None):
+        """with 文でセッションを借りる。url を渡すとそのページを開いた状態で渡す"""
+        session = self.acquire(timeout)
+        try:
+            if url:
+                self.open(session.driver, url)
+            yield session.driver
+        except:
+            # 例外が起きたセッションは状態が分からないので使い回さない
+            session.uses = self.max_uses
+            raise
+        finally:
+            self.release(session)
+
+    def close(self):
+        """全セッションを終了"""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for session in idle:
+            self._discard(session)
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'created': self.created,
+            'idle': len(self.idle),
+            'recycled': self.recycled
+        }
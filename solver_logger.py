@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ソルバー用の非同期ログ
+
+write_log のたびにファイルを開いて1行書いて閉じると、移動ループが
+ディスクI/Oで止まる。SolverLogger はログをキューに積むだけで戻り、
+書き込みはバックグラウンドのスレッドがまとめて行う。
+
+    logger = SolverLogger("maze_solver_log.txt", "maze_solver_log.jsonl")
+    logger.log("ステージ 1 開始", "STAGE")
+    ...
+    logger.close()   # 残りを書き出してスレッドを止める
+
+出力:
+    テキストログ   "[時刻] [種類] メッセージ" の1行
+    JSON Lines    1イベント1行（timestamp / event_type / message / unix_time）
+                  追記するだけなので、実行中でも tail などで読める
+
+どちらのファイルも max_bytes を超えたら .1, .2, ... にずらして新しく作る。
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+# スレッドを止めるための目印
+_STOP = object()
+
+
+class SolverLogger:
+    """キューとバックグラウンドスレッドでログを書き込む"""
+
+    def __init__(self, log_file, json_log_file=None, max_bytes=5 * 1024 * 1024, backups=3,
+                 queue_size=10000, batch_size=200, flush_interval=0.5, echo=True):
+        self.log_file = log_file
+        self.json_log_file = json_log_file
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # コンソール出力は呼び出し側で即座に行う
+        self.echo = echo
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="solver-logger", daemon=True)
+        self.thread.start()
+
+    def log(self, message, event_type="INFO"):
+        """ログを1件積む（キューが満杯のときだけ書き込みを待つ）"""
+        now = time.time()
+        entry = {
+            "timestamp": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            "event_type": event_type,
+            "message": message,
+            "unix_time": now
+        }
+        if self.echo:
+            print(self.format(entry))
+        if self.closed:
+            return entry
+        self.queue.put(entry)
+        return entry
+
+    def format(self, entry):
+        return f"[{entry['timestamp']}] [{entry['event_type']}] {entry['message']}"
+
+    def flush(self):
+        """ここまでに積んだログが書き込まれるまで待つ"""
+        if not self.closed:
+            self.queue.join()
+
+    def close(self):
+        """残りのログを書き出してスレッドを止める"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 書き込みスレッド ---
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # flush_interval の間に来たものを batch_size 件までまとめる
+            deadline = time.time() + self.flush_interval
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            entries = batch[:-1] if stop else batch
+            try:
+                self._write(entries)
+            except Exception as e:
+                # ログのせいでソルバーを止めない
+                print(f"ログ書き込みエラー: {e}")
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, entries):
+        if not entries:
+            return
+        text = "".join(self.format(entry) + "\n" for entry in entries)
+        self._append(self.log_file, text)
+        if self.json_log_file:
+            lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+            self._append(self.json_log_file, lines)
+        self.written += len(entries)
+
+    def _append(self, path, text):
+        data = text.encode("utf-8")
+        if self.max_bytes and os.path.exists(path) and \
+                os.path.getsize(path) + len(data) > self.max_bytes:
+            self._rotate(path)
+        with open(path, "ab") as f:
+            f.write(data)
+
+    def _rotate(self, path):
+        """path → path.1 → path.2 ... と古い順にずらす"""
+        if self.backups <= 0:
+            os.remove(path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
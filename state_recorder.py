@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ティックごとのゲーム状態を列ごとの固定長配列に記録する
+
+1ティックごとに {'time': ..., 'hp': ..., ...} の辞書を作ると、長時間の
+プレイでは辞書オブジェクトだけで数百MBになる。StateRecorder は列ごとに
+array.array（1値4〜8バイト）へ追記するので、同じ記録が数MBで済む。
+
+    recorder = StateRecorder({'time': 'd', 'hp': 'f', 'score': 'i'}, every=5)
+    recorder.record(time=0.1, hp=100, score=0)   # 5ティックに1回だけ記録
+    path = recorder.save("states/ep3")           # → states/ep3.npz（NumPyがなければ .cols）
+
+    columns = load_states(path)
+    columns['hp']                                # 列のビュー（NumPy配列 または memoryview）
+    columns, meta = load_states(path, meta=True)
+    meta['every'], meta['ticks']                 # 記録間隔と全ティック数（記録した時刻の復元用）
+
+型コードは array モジュールのもの（'d' float64, 'f' float32, 'i' int32 など）。
+NumPy があれば .npz（圧縮）で保存し、なければ独自の .cols 形式
+（JSONヘッダー＋列ごとの生バイト列）で保存する。どちらも load_states で読める。
+"""
+
+import json
+import os
+from array import array
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+COLS_MAGIC = b"STATECOLS1\n"
+# .npz に列と一緒に保存する記録間隔と全ティック数（0次元配列）
+NPZ_META = ("_every", "_ticks")
+
+
+class StateRecorder:
+    """列ごとの配列に状態を記録"""
+
+    def __init__(self, columns, every=1):
+        # columns: {列名: 型コード}（記録順は辞書の順）
+        self.columns = {name: array(typecode) for name, typecode in columns.items()}
+        # every ティックに1回記録する
+        self.every = max(1, every)
+        self.ticks = 0
+
+    def record(self, **values):
+        """1ティック分の値を渡す。記録したら True"""
+        tick = self.ticks
+        self.ticks += 1
+        if tick % self.every:
+            return False
+        for name, column in self.columns.items():
+            column.append(values[name])
+        return True
+
+    def __len__(self):
+        """記録した行数"""
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def nbytes(self):
+        """記録に使っているバイト数"""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    def views(self):
+        """列ごとのビュー（コピーしない）"""
+        if HAVE_NUMPY:
+            return {name: np.frombuffer(column, dtype=column.typecode)
+                    for name, column in self.columns.items()}
+        return {name: memoryview(column) for name, column in self.columns.items()}
+
+    def clear(self):
+        for column in self.columns.values():
+            del column[:]
+        self.ticks = 0
+
+    def save(self, path):
+        """path（拡張子なし）に保存して実際のファイル名を返す"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if HAVE_NUMPY:
+            path += ".npz"
+            np.savez_compressed(path, _every=np.array(self.every), _ticks=np.array(self.ticks),
+                                **self.views())
+            return path
+
+        path += ".cols"
+        header = {
+            "every": self.every,
+            "ticks": self.ticks,
+            "columns": [[name, column.typecode, len(column)]
+                        for name, column in self.columns.items()]
+        }
+        with open(path, 'wb') as f:
+            f.write(COLS_MAGIC)
+            f.write(json.dumps(header).encode('utf-8') + b"\n")
+            for column in self.columns.values():
+                f.write(column.tobytes())
+        return path
+
+
+def load_states(path, meta=False):
+    """保存した記録を {列名: ビュー} で返す
+
+    .npz は NumPy 配列、.cols はファイル全体を1回読んだバッファ上の
+    ビュー（NumPy があれば NumPy 配列、なければ memoryview）。
+    meta=True なら ({列名: ビュー}, {'every', 'ticks'}) を返す
+    （記録間隔のない古い .npz では None）。
+    """
+    if path.endswith(".npz"):
+        if not HAVE_NUMPY:
+            raise ImportError(".npz の読み込みには NumPy が必要です")
+        with np.load(path) as data:
+            columns = {name: data[name] for name in data.files if name not in NPZ_META}
+            info = {
+                "every": int(data["_every"]) if "_every" in data.files else None,
+                "ticks": int(data["_ticks"]) if "_ticks" in data.files else None
+            }
+        return (columns, info) if meta else columns
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(COLS_MAGIC):
+        raise ValueError(f"状態記録ファイルではありません: {path}")
+    header_end = data.index(b"\n", len(COLS_MAGIC)) + 1
+    header = json.loads(data[len(COLS_MAGIC):header_end].decode('utf-8'))
+
+    buffer = memoryview(data)
+    offset = header_end
+    columns = {}
+    for name, typecode, length in header["columns"]:
+        size = array(typecode).itemsize * length
+        if HAVE_NUMPY:
+            columns[name] = np.frombuffer(data, dtype=typecode, count=length, offset=offset)
+        else:
+            columns[name] = buffer[offset:offset + size].cast(typecode)
+        offset += size
+    if meta:
+        return columns, {"every": header["every"], "ticks": header["ticks"]}
+    return columns
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+学習型RPGプレイヤーの戦略を集団ベースで探索する
+
+update_strategy のように1つの戦略を ±5〜10% ずつ動かすと、60秒の
+エピソードを何百回も繰り返さないと収束しない。StrategySearch は
+複数の戦略（個体）を同時に評価する遺伝的アルゴリズムで探索する。
+
+    1. 現在の戦略を元に population 個の個体を作る
+    2. 全個体を ParallelRunner のヘッドレスブラウザで並列に1エピソードずつプレイ
+    3. 上位 elite 個をそのまま残し、残りはトーナメント選択＋交叉＋突然変異で作る
+    4. 世代ごとに集団をチェックポイントに保存し、最良の戦略を表示
+
+エピソードの結果にはばらつきがあるので、残った個体も毎世代評価し直し、
+適応度はそれまでの評価の平均にする。
+
+使い方:
+    python strategy_search.py learning --generations 10 --population 8 --workers 4
+    python strategy_search.py improved --resume --apply
+"""
+
+import argparse
+import importlib
+import os
+import random
+import sys
+
+from episode_store import save_checkpoint, load_checkpoint
+from parallel_runner import ParallelRunner, ROOT
+
+LEARNING_DIR = os.path.join(ROOT, "game-tests", "02_learning")
+
+# 適応度 = スコア + 生存時間（秒）× SURVIVAL_WEIGHT
+SURVIVAL_WEIGHT = 0.5
+
+# プレイヤーごとの探索範囲
+# ranges: 戦略のキー（入れ子は "movement_patterns.circle" のように書く）→ (最小, 最大)
+# groups: 合計が1になるように正規化するキーの組
+SEARCH_SPACES = {
+    "learning": {
+        "module": "learning_rpg_player",
+        "class": "LearningRPGPlayer",
+        "ranges": {
+            "attack_frequency": (0.05, 0.8),
+            "move_frequency": (0.1, 0.9),
+            "special_frequency": (0.0, 0.4),
+            "preferred_distance": (50, 400),
+            "dodge_threshold": (30, 250),
+            "mp_threshold": (10, 80),
+            "movement_patterns.circle": (0.01, 1.0),
+            "movement_patterns.zigzag": (0.01, 1.0),
+            "movement_patterns.random": (0.01, 1.0),
+            "movement_patterns.chase": (0.01, 1.0)
+        },
+        "groups": [
+            ["attack_frequency", "move_frequency", "special_frequency"],
+            ["movement_patterns.circle", "movement_patterns.zigzag",
+             "movement_patterns.random", "movement_patterns.chase"]
+        ]
+    },
+    "improved": {
+        "module": "improved_learning_rpg",
+        "class": "ImprovedLearningRPG",
+        # 攻撃・移動の頻度は使われず、特殊攻撃の確率だけを単独で読むので正規化しない
+        "ranges": {
+            "special_frequency": (0.0, 0.4),
+            "preferred_distance": (50, 400),
+            "dodge_threshold": (30, 250),
+            "attack_accuracy": (0.3, 1.0),
+            "movement_speed": (0.05, 0.2),
+            "reaction_time": (0.02, 0.15)
+        },
+        "groups": []
+    }
+}
+
+
+def get_value(strategy, key):
+    for part in key.split("."):
+        strategy = strategy[part]
+    return strategy
+
+
+def set_value(strategy, key, value):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        strategy = strategy.setdefault(part, {})
+    strategy[parts[-1]] = value
+
+
+def load_player_class(name):
+    """探索対象のプレイヤークラスを読み込む"""
+    space = SEARCH_SPACES[name]
+    if LEARNING_DIR not in sys.path:
+        sys.path.insert(0, LEARNING_DIR)
+    module = importlib.import_module(space["module"])
+    return getattr(module, space["class"]), module.GAME_URL
+
+
+def fitness(result):
+    return result["final_score"] + result["duration"] * SURVIVAL_WEIGHT
+
+
+# --- ワーカー側 ---
+
+def evaluate_strategy_job(driver, job):
+    """job["strategy"] で1エピソードをプレイ（履歴・戦略ファイルには書き込まない）"""
+    player_class, game_url = load_player_class(job["player"])
+
+    # 同じワーカーの前の評価が残っていれば再読み込みでリセット
+    if driver.current_url == game_url:
+        driver.refresh()
+    player = player_class(lockstep=job.get("lockstep", False), seed=job.get("page_seed"))
+    player.driver = driver
+    player.current_strategy = job["strategy"]
+    player.state_dir = job["state_dir"]
+    result = player.play_episode(duration=job.get("duration", 45))
+    if result is None:
+        raise RuntimeError("エピソードが途中で失敗しました")
+    return {
+        "final_score": result["final_score"],
+        "duration": result["duration"],
+        "final_hp": result["final_hp"],
+        "fitness": fitness(result)
+    }
+
+
+# --- 探索 ---
+
+class StrategySearch:
+    """遺伝的アルゴリズムによる戦略探索"""
+
+    def __init__(self, player="learning", population=8, elite=2, mutation=0.15,
+                 duration=45, workers=None, headless=True, checkpoint=None, seed=None,
+                 lockstep=False):
+        if player not in SEARCH_SPACES:
+            raise ValueError(f"不明なプレイヤー: {player}")
+        self.player = player
+        self.space = SEARCH_SPACES[player]
+        self.population_size = population
+        self.elite = min(elite, population)
+        # 突然変異の大きさ（探索範囲の幅に対する標準偏差）
+        self.mutation = mutation
+        self.duration = duration
+        self.workers = workers
+        self.headless = headless
+        self.checkpoint = checkpoint or f"strategy_search_{player}.json"
+        self.rng = random.Random(seed)
+        # ロックステップなら同じ世代の個体は同じ乱数のゲームで比べる
+        self.lockstep = lockstep
+
+        self.generation = 0
+        self.population = []
+        self.history = []
+        self.best = None
+
+    # --- 個体の操作 ---
+
+    def clip(self, strategy):
+        """範囲内に収め、合計1の組を正規化"""
+        for key, (low, high) in self.space["ranges"].items():
+            set_value(strategy, key, min(high, max(low, get_value(strategy, key))))
+        for group in self.space["groups"]:
+            total = sum(get_value(strategy, key) for key in group)
+            for key in group:
+                set_value(strategy, key, get_value(strategy, key) / total)
+        return strategy
+
+    def mutate(self, strategy, scale=None):
+        scale = self.mutation if scale is None else scale
+        child = self.copy(strategy)
+        for key, (low, high) in self.space["ranges"].items():
+            if self.rng.random() < 0.5:
+                value = get_value(child, key) + self.rng.gauss(0, scale * (high - low))
+                set_value(child, key, value)
+        return self.clip(child)
+
+    def crossover(self, a, b):
+        """キーごとに2つの親の間の値を取る"""
+        child = self.copy(a)
+        for key in self.space["ranges"]:
+            t = self.rng.random()
+            set_value(child, key, get_value(a, key) * t + get_value(b, key) * (1 - t))
+        return self.clip(child)
+
+    def copy(self, strategy):
+        child = dict(strategy)
+        for key in self.space["ranges"]:
+            if "." in key:
+                parent = key.split(".")[0]
+                child[parent] = dict(strategy[parent])
+        return child
+
+    def select(self, ranked):
+        """トーナメント選択（3個体から最良）"""
+        contestants = self.rng.sample(ranked, min(3, len(ranked)))
+        return max(contestants, key=lambda member: member["fitness"])
+
+    # --- 集団 ---
+
+    def initial_population(self, base):
+        """base 戦略とその変異で最初の集団を作る"""
+        base = self.clip(self.copy(base))
+        self.population = [{"strategy": base, "scores": []}]
+        while len(self.population) < self.population_size:
+            self.population.append({"strategy": self.mutate(base, self.mutation * 2), "scores": []})
+
+    def next_generation(self):
+        ranked = sorted(self.population, key=lambda member: member["fitness"], reverse=True)
+        population = [{"strategy": member["strategy"], "scores": member["scores"]}
+                      for member in ranked[:self.elite]]
+        while len(population) < self.population_size:
+            child = self.crossover(self.select(ranked)["strategy"], self.select(ranked)["strategy"])
+            population.append({"strategy": self.mutate(child), "scores": []})
+        self.population = population
+        self.generation += 1
+
+    def evaluate(self, runner):
+        """全個体を1エピソードずつ並列に評価"""
+        jobs = [{
+            "player": self.player,
+            "strategy": member["strategy"],
+            "duration": self.duration,
+            "lockstep": self.lockstep,
+            "page_seed": self.generation if self.lockstep else None,
+            "state_dir": os.path.join("strategy_search_states", f"g{self.generation}_c{i}")
+        } for i, member in enumerate(self.population)]
+
+        def progress(result):
+            if result["ok"]:
+                status = f"適応度 {result['result']['fitness']:.1f}"
+            else:
+                status = f"失敗 ({result['error']})"
+            print(f"  個体 {result['index'] + 1}/{len(jobs)}: {status} {result['elapsed']:.1f}秒")
+
+        report = runner.run(jobs, on_result=progress)
+        for member, result in zip(self.population, report["results"]):
+            if result["ok"]:
+                member["scores"].append(result["result"]["fitness"])
+            # 一度も評価できなかった個体は最下位
+            scores = member["scores"]
+            member["fitness"] = sum(scores) / len(scores) if scores else float("-inf")
+
+    def record_generation(self):
+        ranked = sorted(self.population, key=lambda member: member["fitness"], reverse=True)
+        leader = ranked[0]
+        evaluated = [member["fitness"] for member in ranked if member["scores"]]
+        summary = {
+            "generation": self.generation,
+            "best_fitness": leader["fitness"],
+            "mean_fitness": sum(evaluated) / len(evaluated) if evaluated else None,
+            "best_strategy": leader["strategy"]
+        }
+        self.history.append(summary)
+        if leader["scores"] and (self.best is None or leader["fitness"] > self.best["fitness"]):
+            self.best = {"generation": self.generation, "fitness": leader["fitness"],
+                         "strategy": leader["strategy"]}
+
+        if summary["mean_fitness"] is None:
+            print(f"\n世代 {self.generation}: 評価できた個体なし")
+            return
+        print(f"\n世代 {self.generation}: 最良 {leader['fitness']:.1f}, "
+              f"平均 {summary['mean_fitness']:.1f}")
+        for key in self.space["ranges"]:
+            print(f"  {key}: {get_value(leader['strategy'], key):.3f}")
+
+    # --- チェックポイント ---
+
+    def save(self):
+        save_checkpoint(self.checkpoint, {
+            "player": self.player,
+            "generation": self.generation,
+            "population": [{"strategy": m["strategy"], "scores": m["scores"]}
+                           for m in self.population],
+            "history": self.history,
+            "best": self.best
+        })
+
+    def load(self):
+        """チェックポイントがあれば続きから再開（あれば True）"""
+        data = load_checkpoint(self.checkpoint)
+        if not data or data["player"] != self.player:
+            return False
+        self.generation = data["generation"]
+        self.population = data["population"]
+        self.history = data["history"]
+        self.best = data["best"]
+        return True
+
+    def apply_best(self):
+        """最良の戦略をプレイヤーの戦略ファイルに書き込む（エピソード数などは残す）"""
+        if not self.best:
+            return None
+        player_class, _ = load_player_class(self.player)
+        player = player_class()
+        strategy = player.current_strategy
+        for key in self.space["ranges"]:
+            set_value(strategy, key, get_value(self.best["strategy"], key))
+        save_checkpoint(player.strategy_file, strategy)
+        return player.strategy_file
+
+    def run(self, generations, resume=False):
+        """generations 世代分探索して最良の個体を返す
+
+        チェックポイントには常に次に評価する世代の集団が入っている。
+        """
+        if not (resume and self.load()):
+            player_class, _ = load_player_class(self.player)
+            self.initial_population(player_class().current_strategy)
+
+        with ParallelRunner("strategy_search:evaluate_strategy_job", workers=self.workers,
+                            headless=self.headless) as runner:
+            for _ in range(generations):
+                print(f"\n=== 世代 {self.generation} ({len(self.population)}個体) ===")
+                self.evaluate(runner)
+                self.record_generation()
+                self.next_generation()
+                self.save()
+        return self.best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="学習型RPGプレイヤーの戦略探索")
+    parser.add_argument("player", choices=sorted(SEARCH_SPACES), help="探索するプレイヤー")
+    parser.add_argument("--generations", type=int, default=10, help="世代数")
+    parser.add_argument("--population", type=int, default=8, help="1世代の個体数")
+    parser.add_argument("--elite", type=int, default=2, help="そのまま残す上位の個体数")
+    parser.add_argument("--mutation", type=float, default=0.15, help="突然変異の大きさ")
+    parser.add_argument("--duration", type=int, default=45, help="1エピソードの秒数")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカー数（既定: CPUコア数）")
+    parser.add_argument("--seed", type=int, default=None, help="乱数シード")
+    parser.add_argument("--show", action="store_true", help="ヘッドレスにしない")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="フレーム単位で進めて実時間より速く、世代内は同じ条件で評価する")
+    parser.add_argument("--resume", action="store_true", help="チェックポイントから再開")
+    parser.add_argument("--apply", action="store_true", help="最良の戦略をプレイヤーに書き込む")
+    parser.add_argument("--checkpoint", default=None, help="チェックポイントの保存先")
+    args = parser.parse_args()
+
+    search = StrategySearch(args.player, population=args.population, elite=args.elite,
+                            mutation=args.mutation, duration=args.duration,
+                            workers=args.workers, headless=not args.show,
+                            checkpoint=args.checkpoint, seed=args.seed,
+                            lockstep=args.lockstep)
+    best = search.run(args.generations, resume=args.resume)
+
+    if not best:
+        print("\n評価できた個体がありませんでした")
+        return
+    print(f"\n最良の戦略（世代 {best['generation']}, 適応度 {best['fitness']:.1f}）")
+    for key in search.space["ranges"]:
+        print(f"  {key}: {get_value(best['strategy'], key):.3f}")
+    print(f"チェックポイント: {search.checkpoint}")
+    if args.apply:
+        print(f"戦略ファイルに書き込みました: {search.apply_best()}")
+
+
+if __name__ == "__main__":
+    main()